@@ -3,23 +3,24 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware  # 세션 미들웨어 추가
+from contextlib import asynccontextmanager
 from pathlib import Path
 import sys
-import os
-import google.generativeai as genai
+import threading
 from dotenv import load_dotenv
-from app.routers import analyze, predict, upload
+from app.routers import analyze, predict, upload, metrics, segment, health
+from app.config import MODEL_WARMUP
 from app.services.animal_data import animal_data_service
 from app.services.storage_service import TempStorageService
+from app.services.analysis_pipeline import analysis_pipeline
+from app.services.inference_executor import inference_executor
+from app.services.process_pool import process_pool
+from app.services.warmup import run_warmup
+from app.services.llm_client import llm_client
 
 # 환경 변수 로드
 load_dotenv()
 
-# Gemini API 설정
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
 # 프로젝트 루트 경로 설정
 ROOT_PATH = Path(__file__).parent.parent
 
@@ -27,8 +28,22 @@ ROOT_PATH = Path(__file__).parent.parent
 MOBILE_SAM_PATH = ROOT_PATH / 'external' / 'MobileSAM'
 sys.path.append(str(MOBILE_SAM_PATH))
 
+# 앱 수명 주기: 서버가 먼저 포트를 열고, 모델 로드/예열은 백그라운드 스레드에서 진행
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 추론 워커 프로세스는 각자 모델을 로드하며, 준비 여부는 예열 단계에서 기다림
+    process_pool.start()
+    if MODEL_WARMUP:
+        threading.Thread(
+            target=run_warmup, args=(analysis_pipeline,), name="model-warmup", daemon=True
+        ).start()
+    yield
+    inference_executor.shutdown(wait=False)
+    process_pool.shutdown()
+    await llm_client.aclose()
+
 # FastAPI 앱 초기화
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # 세션 미들웨어 추가
 app.add_middleware(
@@ -54,6 +69,9 @@ templates = Jinja2Templates(directory=str(ROOT_PATH / "app" / "templates"))
 app.include_router(analyze.router, prefix="/api")
 app.include_router(predict.router, prefix="/api")
 app.include_router(upload.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(segment.router, prefix="/api")
+app.include_router(health.router)
 
 # 임시 저장소 서비스 인스턴스 생성
 temp_storage = TempStorageService()  # 싱글톤 인스턴스 사용
@@ -87,10 +105,10 @@ def preprocess_animal_name(animal_class):
     cleaned_name = animal_class.lower().replace('a ', '').replace('the ', '').strip()
     return cleaned_name
 
-# Gemini AI를 사용하여 동물 소개 문구 생성
-def generate_animal_greeting(animal_class):
+# Gemini AI를 사용하여 동물 소개 문구 생성 (공유 비동기 클라이언트 사용)
+async def generate_animal_greeting(animal_class):
     try:
-        if not GEMINI_API_KEY:
+        if not llm_client.enabled:
             return f"{animal_class.replace('a ', '')} 사진이네요!"
             
         # 동물 이름 전처리
@@ -103,9 +121,6 @@ def generate_animal_greeting(animal_class):
         if not korean_name:
             korean_name = FAMILY_TRANSLATIONS.get(cleaned_name, cleaned_name)
             
-        # Gemini 모델 인스턴스 생성
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
         # 프롬프트 작성
         prompt = f"""
         다음 동물 종류에 대해 사진을 본 것처럼 자연스러운 한국어 인사말을 작성해주세요.
@@ -120,8 +135,10 @@ def generate_animal_greeting(animal_class):
         """
         
         # 응답 생성
-        response = model.generate_content(prompt)
-        greeting = response.text.strip()
+        response = await llm_client.generate(prompt)
+        greeting = response.strip()
+        if not greeting:
+            raise ValueError("빈 응답")
         
         # 응답이 너무 길면 적절히 자르기
         if len(greeting) > 30:
@@ -0,0 +1,261 @@
+# app/cli.py
+# FastAPI 서버 없이 이미지 디렉토리를 일괄 분류하는 명령행 도구
+#
+# 사용 예:
+#   python -m app.cli classify data/archive --output results.jsonl --batch-size 16 --workers 4
+
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from app.services.image_ingest import DecodedImage, decode_image
+from app.services.batch_analysis import analyze_batch, mask_bbox
+
+# 로거 설정
+logger = logging.getLogger("app.cli")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".gif", ".tif", ".tiff"}
+CSV_FIELDS = ["file", "class", "confidence", "top3", "bbox", "mask_score", "image_size", "error"]
+
+def _decode_file(path: str) -> Tuple[str, Optional[DecodedImage], Optional[str]]:
+    """
+    워커 프로세스에서 이미지 파일 디코딩 (내용 해시도 함께 계산)
+
+    Returns:
+        Tuple: (경로, 디코딩된 이미지 또는 None, 오류 메시지 또는 None)
+    """
+    try:
+        with open(path, "rb") as f:
+            decoded = decode_image(f.read())
+        decoded.content_hash
+        return path, decoded, None
+    except Exception as e:
+        return path, None, str(getattr(e, "message", e))
+
+def iter_images(directory: Path, recursive: bool = True) -> Iterator[Path]:
+    """디렉토리의 이미지 파일을 이름 순으로 나열"""
+    pattern = "**/*" if recursive else "*"
+    for path in sorted(directory.glob(pattern)):
+        if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+            yield path
+
+def load_done(output: Path) -> Set[str]:
+    """
+    이미 출력 파일에 성공 결과가 기록된 파일 목록 (이어서 실행할 때 건너뜀)
+
+    error가 기록된 행은 메모리 부족 같은 일시적 실패일 수 있으므로 다시 처리합니다.
+    (다시 처리한 결과는 같은 파일 이름의 새 행으로 추가됩니다.)
+    """
+    if not output.exists():
+        return set()
+    done = set()
+    with open(output, encoding="utf-8", newline="") as f:
+        if output.suffix.lower() == ".csv":
+            done = {row["file"] for row in csv.DictReader(f) if row.get("file") and not row.get("error")}
+        else:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if not record.get("error"):
+                        done.add(record["file"])
+                except (ValueError, KeyError, AttributeError):
+                    continue  # 중단 시 잘린 마지막 줄
+    return done
+
+class ResultWriter:
+    """결과를 CSV 또는 JSONL로 이어 쓰는 기록기 (배치마다 flush)"""
+
+    def __init__(self, output: Path):
+        self.is_csv = output.suffix.lower() == ".csv"
+        is_new = not output.exists() or output.stat().st_size == 0
+        output.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(output, "a", encoding="utf-8", newline="")
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if is_new:
+                self._csv.writeheader()
+
+    def write(self, record: Dict) -> None:
+        if self.is_csv:
+            row = {key: record.get(key) for key in CSV_FIELDS}
+            for key in ("top3", "bbox", "image_size"):
+                if row[key] is not None:
+                    row[key] = json.dumps(row[key], ensure_ascii=False)
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+def classify_batch(sam, classifier, batch: List[Tuple[str, DecodedImage]]) -> List[Dict]:
+    """
+    디코딩된 이미지 배치를 분석해 출력 레코드로 변환
+
+    Returns:
+        List[Dict]: 이미지별 결과 레코드
+    """
+    results = analyze_batch(sam, classifier, [decoded for _, decoded in batch])
+    records = []
+    for (name, decoded), (result, mask, score) in zip(batch, results):
+        records.append({
+            "file": name,
+            "class": result["class"],
+            "confidence": round(result["confidence"], 6),
+            "top3": [[label, round(prob, 6)] for label, prob in result["top3"]],
+            "bbox": mask_bbox(mask, decoded.original_size),
+            "mask_score": round(score, 6),
+            "image_size": list(decoded.original_size),
+        })
+    return records
+
+def _decoded_stream(paths: List[Path], workers: int) -> Iterator[Tuple[str, Optional[DecodedImage], Optional[str]]]:
+    """
+    프로세스 풀에서 디코딩한 결과를 입력 순서대로 반환
+
+    진행 중인 작업 수를 제한해 추론이 느려도 디코딩 결과가 메모리에 쌓이지 않게 합니다.
+    """
+    if workers <= 0:
+        for path in paths:
+            yield _decode_file(str(path))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        queue = iter(paths)
+        for path in queue:
+            in_flight.append(pool.submit(_decode_file, str(path)))
+            if len(in_flight) >= workers * 4:
+                break
+        while in_flight:
+            yield in_flight.popleft().result()
+            path = next(queue, None)
+            if path is not None:
+                in_flight.append(pool.submit(_decode_file, str(path)))
+
+def run_classify(args: argparse.Namespace) -> int:
+    """classify 명령 실행"""
+    # 모델 관련 모듈은 디코딩 워커 프로세스가 가져오지 않도록 여기서 import
+    import torch
+    from app.services.sam_service import SamService
+    from app.services.classifier_service import AnimalClassifier
+
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        logger.error(f"디렉토리를 찾을 수 없습니다: {directory}")
+        return 1
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+
+    output = Path(args.output)
+    done = load_done(output)
+    paths, skipped = [], 0
+    for path in iter_images(directory, args.recursive):
+        if str(path.relative_to(directory)) in done:
+            skipped += 1
+        else:
+            paths.append(path)
+        if args.limit and len(paths) >= args.limit:
+            break
+    logger.info(f"{len(paths)} images to classify, {skipped} already in {output}")
+
+    sam = SamService(backend=args.backend, precision=args.precision)
+    classifier = AnimalClassifier(backend=args.backend, precision=args.precision)
+    writer = ResultWriter(output)
+
+    started = time.perf_counter()
+    inference_sec = 0.0
+    processed = failed = 0
+    batch: List[Tuple[str, DecodedImage]] = []
+
+    def flush_batch():
+        nonlocal inference_sec, processed, failed
+        if not batch:
+            return
+        batch_started = time.perf_counter()
+        try:
+            records = classify_batch(sam, classifier, batch)
+        except Exception as e:
+            logger.error(f"Batch failed: {str(e)}")
+            records = [{"file": name, "error": str(e)} for name, _ in batch]
+            failed += len(batch)
+        else:
+            processed += len(records)
+        inference_sec += time.perf_counter() - batch_started
+        for record in records:
+            writer.write(record)
+        writer.flush()
+        batch.clear()
+
+    try:
+        for count, (path, decoded, error) in enumerate(_decoded_stream(paths, args.workers), 1):
+            name = str(Path(path).relative_to(directory))
+            if decoded is None:
+                writer.write({"file": name, "error": error})
+                failed += 1
+            else:
+                batch.append((name, decoded))
+                if len(batch) >= args.batch_size:
+                    flush_batch()
+            if count % args.log_every == 0:
+                elapsed = time.perf_counter() - started
+                logger.info(f"{count}/{len(paths)} images ({count / elapsed:.1f} img/s)")
+        flush_batch()
+    except KeyboardInterrupt:
+        logger.warning("중단되었습니다. 같은 명령으로 다시 실행하면 이어서 처리합니다.")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "processed": processed,
+        "failed": failed,
+        "skipped": skipped,
+        "elapsed_sec": round(elapsed, 2),
+        "images_per_sec": round(processed / elapsed, 2) if elapsed > 0 else None,
+        "inference_sec": round(inference_sec, 2),
+        "output": str(output),
+    }, ensure_ascii=False, indent=2))
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    메인 실행 함수
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="ZooBuddy 명령행 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    classify_parser = subparsers.add_parser("classify", help="이미지 디렉토리 일괄 분류")
+    classify_parser.add_argument("directory", type=str, help="분류할 이미지 디렉토리")
+    classify_parser.add_argument("--output", type=str, default="classify_results.jsonl",
+                                 help="결과 파일 (.jsonl 또는 .csv, 이미 있으면 기록된 파일은 건너뜀)")
+    classify_parser.add_argument("--batch-size", type=int, default=16, help="추론 배치 크기 (기본값: 16)")
+    classify_parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                                 help="디코딩 프로세스 수 (0이면 메인 프로세스에서 디코딩)")
+    classify_parser.add_argument("--threads", type=int, default=0, help="torch 연산 스레드 수 (기본값: 0, 자동)")
+    classify_parser.add_argument("--backend", type=str, default="torch", choices=["torch", "onnx"], help="추론 백엔드")
+    classify_parser.add_argument("--precision", type=str, default="fp32", choices=["fp32", "int8", "bf16"],
+                                 help="추론 정밀도 (torch 백엔드)")
+    classify_parser.add_argument("--no-recursive", dest="recursive", action="store_false", help="하위 디렉토리 제외")
+    classify_parser.add_argument("--limit", type=int, default=0, help="이번 실행에서 처리할 최대 이미지 수 (0: 전체)")
+    classify_parser.add_argument("--log-every", type=int, default=500, help="진행 상황 로그 간격 (이미지 수)")
+
+    args = parser.parse_args(argv)
+    if args.command == "classify":
+        return run_classify(args)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
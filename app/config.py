@@ -10,6 +10,10 @@ ROOT_PATH = Path(__file__).parent.parent
 MOBILE_SAM_PATH = ROOT_PATH / 'external' / 'MobileSAM'
 MOBILE_SAM_WEIGHTS = MOBILE_SAM_PATH / 'weights' / 'mobile_sam.pt'
 
+# 메모리 매핑 가중치 (scripts/convert_weights.py로 변환, 있으면 읽기 전용 매핑으로 로드해 워커 간 물리 페이지 공유)
+MODEL_WEIGHTS_DIR = Path(os.environ.get("MODEL_WEIGHTS_DIR", ROOT_PATH / 'external' / 'weights'))
+MODEL_MMAP_WEIGHTS = os.environ.get("MODEL_MMAP_WEIGHTS", "true").lower() == "true"
+
 # 세션 설정
 SECRET_KEY = os.environ.get("SECRET_KEY", secrets.token_hex(32))
 SESSION_MAX_AGE = 1800  # 30분
@@ -29,3 +33,98 @@ CORS_ORIGINS = [
 
 # 데이터베이스 설정
 DB_PATH = ROOT_PATH / 'data' / 'database' / 'animal_data.db'
+
+# 마이크로배칭 설정 (동시 요청을 모아 한 번에 추론)
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 8))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 10))
+
+# 추론 실행기 설정 (이벤트 루프와 분리된 전용 스레드 풀)
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 2))
+INFERENCE_MAX_QUEUE = int(os.environ.get("INFERENCE_MAX_QUEUE", 16))
+
+# /api/predict의 SamPredictor 컨텍스트 수 (추론 스레드 수만큼이면 요청끼리 기다리지 않음)
+SAM_PREDICTOR_POOL_SIZE = int(os.environ.get("SAM_PREDICTOR_POOL_SIZE", INFERENCE_WORKERS))
+
+# MobileSAM 이미지 임베딩 캐시 (이미지 내용 해시 기준 LRU)
+SAM_EMBEDDING_CACHE_MB = int(os.environ.get("SAM_EMBEDDING_CACHE_MB", 256))
+
+# 재프롬프트 세그멘테이션 세션 (이미지 임베딩 보관)
+SEGMENT_SESSION_MAX = int(os.environ.get("SEGMENT_SESSION_MAX", 32))
+SEGMENT_SESSION_TTL_SEC = int(os.environ.get("SEGMENT_SESSION_TTL_SEC", 600))
+
+# 업로드 이미지 디코딩 (긴 변 기준 최대 해상도, 하위 모델은 1024px 이상이 필요 없음)
+INGEST_MAX_SIDE = int(os.environ.get("INGEST_MAX_SIDE", 1024))
+
+# CLIP 입력 영역 설정 (마스크 바운딩 박스 여백 비율, 박스 내부 배경 제거 여부)
+CLIP_CROP_PADDING = float(os.environ.get("CLIP_CROP_PADDING", 0.1))
+CLIP_MASK_BACKGROUND = os.environ.get("CLIP_MASK_BACKGROUND", "true").lower() == "true"
+
+# 추론 백엔드 ("torch": eager PyTorch, "onnx": ONNX Runtime)
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch").lower()
+ONNX_MODEL_DIR = Path(os.environ.get("ONNX_MODEL_DIR", ROOT_PATH / 'external' / 'onnx'))
+ONNX_INTRA_OP_THREADS = int(os.environ.get("ONNX_INTRA_OP_THREADS", 0))  # 0이면 ONNX Runtime 기본값
+
+# 추론 정밀도 ("fp32", "int8": Linear 동적 양자화(CPU), "bf16": bfloat16 autocast)
+INFERENCE_PRECISION = os.environ.get("INFERENCE_PRECISION", "fp32").lower()
+
+# 모델 예열 (서버 시작 후 백그라운드에서 모델 로드 + 합성 입력 추론, 완료 전 /readyz는 503)
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "true").lower() == "true"
+WARMUP_ITERATIONS = int(os.environ.get("WARMUP_ITERATIONS", 2))
+
+# 전체 종 어휘 텍스트 임베딩 (scripts/build_species_embeddings.py로 생성, 없으면 기본 15개 클래스 사용)
+SPECIES_EMBEDDINGS_DIR = Path(os.environ.get("SPECIES_EMBEDDINGS_DIR", ROOT_PATH / 'data' / 'embeddings'))
+SPECIES_VOCABULARY = os.environ.get("SPECIES_VOCABULARY", "true").lower() == "true"
+
+# 종 어휘 탐색 인덱스 ("flat": 정확한 전수 탐색, "ivfpq": 빌드 시 학습한 근사 인덱스) 와 재점수화 후보 수
+SPECIES_INDEX = os.environ.get("SPECIES_INDEX", "flat").lower()
+SPECIES_INDEX_CANDIDATES = int(os.environ.get("SPECIES_INDEX_CANDIDATES", 64))
+
+# 2단계 분류 (과 프로토타입으로 후보를 좁힌 뒤 상위 과의 종만 점수화, 종 어휘 사용 시)
+CLASSIFIER_HIERARCHICAL = os.environ.get("CLASSIFIER_HIERARCHICAL", "false").lower() == "true"
+CLASSIFIER_TOP_FAMILIES = int(os.environ.get("CLASSIFIER_TOP_FAMILIES", 3))
+
+# 일괄 분석 (/api/analyze/batch: 여러 파일 또는 zip, 결과를 NDJSON으로 스트리밍)
+BATCH_ANALYZE_MAX_FILES = int(os.environ.get("BATCH_ANALYZE_MAX_FILES", 1000))
+BATCH_ANALYZE_MAX_MB = int(os.environ.get("BATCH_ANALYZE_MAX_MB", 512))  # 업로드/압축 해제 합계 상한
+BATCH_ANALYZE_CONCURRENCY = int(os.environ.get("BATCH_ANALYZE_CONCURRENCY", BATCH_MAX_SIZE * 2))
+
+# 조기 종료 캐스케이드 (전체 이미지 CLIP 결과가 확실하면 SAM 세그멘테이션 생략)
+ANALYZE_CASCADE = os.environ.get("ANALYZE_CASCADE", "false").lower() == "true"
+CASCADE_MIN_CONFIDENCE = float(os.environ.get("CASCADE_MIN_CONFIDENCE", 0.6))
+CASCADE_MIN_MARGIN = float(os.environ.get("CASCADE_MIN_MARGIN", 0.2))  # top-1과 top-2 확률 차이
+
+# 추론 워커 프로세스 (0이면 웹 프로세스의 스레드에서 추론, N이면 모델을 각자 로드한 N개 프로세스로 분산)
+INFERENCE_PROCESSES = int(os.environ.get("INFERENCE_PROCESSES", 0))
+INFERENCE_PROCESS_THREADS = int(os.environ.get("INFERENCE_PROCESS_THREADS", 0))  # 워커당 torch 연산 스레드 수 (0: 코어 수 / 워커 수)
+INFERENCE_PROCESS_BATCH = int(os.environ.get("INFERENCE_PROCESS_BATCH", 4))  # 워커가 한 번에 가져와 배치로 처리할 최대 이미지 수
+INFERENCE_PROCESS_TIMEOUT_SEC = float(os.environ.get("INFERENCE_PROCESS_TIMEOUT_SEC", 60))
+
+# SAM 프롬프트 점 ("center": 중앙점 하나, "grid": 격자 점, "saliency": 중앙점 + saliency 상위 지점)
+# 여러 점은 같은 임베딩에 대해 한 번의 배치 디코딩으로 처리하고 예측 IoU가 가장 높은 마스크 사용
+SAM_PROMPT_MODE = os.environ.get("SAM_PROMPT_MODE", "center").lower()
+SAM_PROMPT_GRID = int(os.environ.get("SAM_PROMPT_GRID", 3))  # grid 모드의 한 변 점 수
+SAM_PROMPT_POINTS = int(os.environ.get("SAM_PROMPT_POINTS", 5))  # saliency 모드의 점 수 (중앙점 포함)
+
+# CLIP 이미지 특징 저장소 (디코딩된 이미지 SHA-256 기준, 모든 워커가 공유하며 히트 시 SAM/CLIP 생략, 0이면 비활성화)
+FEATURE_STORE_DIR = Path(os.environ.get("FEATURE_STORE_DIR", ROOT_PATH / 'data' / 'features'))
+FEATURE_STORE_MB = int(os.environ.get("FEATURE_STORE_MB", 128))
+FEATURE_STORE_DIM = int(os.environ.get("FEATURE_STORE_DIM", 512))  # CLIP ViT-B/32 이미지 특징 차원
+
+# 분석 결과 캐시 (업로드 바이트 SHA-256 + 모델/설정 버전 기준 TTL + LRU, 동시 동일 요청은 한 번만 분석)
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", 512))  # 0이면 저장하지 않고 동시 요청 합치기만 수행
+RESULT_CACHE_TTL_SEC = float(os.environ.get("RESULT_CACHE_TTL_SEC", 3600))
+RESULT_CACHE_VERSION = os.environ.get("RESULT_CACHE_VERSION", "1")  # 모델 가중치나 DB를 바꾸면 올려서 무효화
+
+# 근사 중복 인덱스 (지각 해시 BK-tree, 크기 조정/재압축/회전된 같은 사진의 분석 결과 재사용, 0이면 비활성화)
+NEAR_DUP_HASH = os.environ.get("NEAR_DUP_HASH", "phash").lower()  # "phash" 또는 "dhash"
+NEAR_DUP_INDEX_SIZE = int(os.environ.get("NEAR_DUP_INDEX_SIZE", 4096))
+NEAR_DUP_MAX_DISTANCE = int(os.environ.get("NEAR_DUP_MAX_DISTANCE", 6))  # 64비트 해시 기준 최대 해밍 거리
+NEAR_DUP_VERIFY_RATE = float(os.environ.get("NEAR_DUP_VERIFY_RATE", 0.02))  # 적중 중 다시 분석해 품질을 확인할 비율
+
+# Gemini 클라이언트 (keep-alive 연결 풀을 공유하는 비동기 호출, 호출별 제한 시간과 동시 요청 수 제한)
+LLM_MODEL = os.environ.get("LLM_MODEL", "gemini-2.0-flash")
+LLM_TIMEOUT_SEC = float(os.environ.get("LLM_TIMEOUT_SEC", 15))  # 대기와 재시도를 포함한 호출 하나의 전체 제한 시간
+LLM_CONNECT_TIMEOUT_SEC = float(os.environ.get("LLM_CONNECT_TIMEOUT_SEC", 5))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 8))
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", 16))
+LLM_RETRIES = int(os.environ.get("LLM_RETRIES", 2))
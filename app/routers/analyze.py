@@ -1,18 +1,26 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Request
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Tuple, Optional
-from app.services.sam_service import sam_service
-from app.services.classifier_service import AnimalClassifier
+from typing import AsyncIterator, Callable, List, Tuple, Optional
+from app.config import BATCH_ANALYZE_MAX_FILES, BATCH_ANALYZE_MAX_MB, BATCH_ANALYZE_CONCURRENCY
+from app.services.analysis_pipeline import analysis_pipeline
+from app.services.inference_executor import InferenceQueueFullError
+from app.services.image_ingest import decode_image, ImageDecodeError
 from app.services.db_service import AnimalDatabase
 from app.services.chat_service import ChatBotService
 from app.services.animal_data import animal_data_service
 from app.services.storage_service import TempStorageService
-from PIL import Image
-import numpy as np
+from app.services.result_cache import result_cache
+from app.services.near_duplicate import near_duplicate_index
+from app.services.metrics import metrics
+import asyncio
 import io
+import json
 import logging
+import time
 import uuid
+import zipfile
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -32,16 +40,102 @@ class AnalysisResponse(BaseModel):
 router = APIRouter()
 
 # 서비스 인스턴스
-classifier = AnimalClassifier()
 db_service = AnimalDatabase()
 chatbot_service = ChatBotService()
 temp_storage = TempStorageService()  # 싱글톤 인스턴스 사용
 
+async def _analyze_upload(image_data: bytes) -> dict:
+    """
+    업로드 이미지 한 장의 전체 분석 (디코딩, 세그멘테이션 + 분류, DB 조회, 챗봇 응답)
+
+    지각 해시가 가까운 이미지(크기 조정, 재압축, 회전된 같은 사진)의 결과가 있으면 재사용하고,
+    그중 NEAR_DUP_VERIFY_RATE 비율은 다시 분석해 결과가 같은 동물인지 기록합니다.
+
+    Returns:
+        dict: 결과 페이지에 표시할 분석 결과 (결과 캐시에 저장됨)
+
+    Raises:
+        HTTPException: 이미지 처리 또는 분석 중 오류 발생 시
+    """
+    # 이미지 로드 (한 번만 디코딩하여 SAM/CLIP이 공유)
+    try:
+        image = await run_in_threadpool(decode_image, image_data)
+    except ImageDecodeError as e:
+        logger.error(f"Failed to open image: {e.details}")
+        raise HTTPException(status_code=400, detail="Failed to process image")
+
+    # 이미지 크기 검증 (원본 크기 기준)
+    if image.original_size[0] < 64 or image.original_size[1] < 64:
+        raise HTTPException(status_code=400, detail="Image too small")
+
+    # 근사 중복 조회
+    match = None
+    if near_duplicate_index.enabled:
+        perceptual_hash = await run_in_threadpool(lambda: image.perceptual_hash)
+        match = near_duplicate_index.lookup(perceptual_hash)
+        if match is not None and not near_duplicate_index.should_verify():
+            return match[0]
+
+    try:
+        # 세그멘테이션 및 동물 분류 (동시 요청과 배치로 묶여 실행)
+        classification_result = await analysis_pipeline.analyze(image)
+        
+        # 분류 결과 로깅 (디버깅용)
+        logger.info(f"CLIP 분류 결과: {classification_result['class']}")
+        logger.info(f"상위 3개 결과: {classification_result['top3']}")
+        
+        # 데이터베이스에서 정보 조회
+        animal_info = db_service.get_info(classification_result["class"])
+        if not animal_info:
+            logger.warning(f"No information found for {classification_result['class']}")
+            animal_info = {"message": "Additional information not available"}
+        
+        # 챗봇 응답 생성 (비동기 Gemini 호출, 기다리는 동안 다른 요청 처리)
+        friendly_message = await chatbot_service.generate_response(
+            classification_result["class"], 
+            animal_info
+        )
+        
+        # 번역된 동물 이름을 가져오기
+        cleaned_animal_name = classification_result["class"].replace("a ", "").strip()
+        korean_name = animal_data_service.translate_animal_name(
+            cleaned_animal_name, 
+            'en', 
+            'ko'
+        )
+
+        result = {
+            "animal": classification_result["class"],
+            "animal_greeting": f"{korean_name or cleaned_animal_name} 사진이네요!",
+            "friendly_message": friendly_message,
+            "img_path": ""
+        }
+
+    except InferenceQueueFullError as e:
+        logger.warning(f"Inference queue full: {e.details}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy. Please try again later.",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        logger.error(f"Analysis failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to analyze image")
+
+    if near_duplicate_index.enabled:
+        if match is not None:
+            near_duplicate_index.record_verification(match[0]["animal"] == result["animal"])
+        near_duplicate_index.add(perceptual_hash, result)
+    return result
+
 @router.post("/analyze/")
 async def analyze_animal(request: Request, file: UploadFile = File(...)):
     """
     동물 이미지를 분석하여 종류를 식별하고 관련 정보를 반환합니다.
     
+    같은 이미지 바이트의 결과가 캐시에 있으면 분석 없이 재사용하고,
+    같은 이미지가 동시에 올라오면 한 번만 분석해 결과를 함께 사용합니다.
+    
     Args:
         request (Request): FastAPI 요청 객체 (세션 접근용)
         file (UploadFile): 분석할 동물 이미지 파일
@@ -57,78 +151,182 @@ async def analyze_animal(request: Request, file: UploadFile = File(...)):
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="Invalid file type. Please upload an image.")
         
-        # 이미지 로드
         image_data = await file.read()
-        try:
-            image = Image.open(io.BytesIO(image_data)).convert("RGB")
-        except Exception as e:
-            logger.error(f"Failed to open image: {str(e)}")
-            raise HTTPException(status_code=400, detail="Failed to process image")
-
-        # 이미지 크기 검증
-        if image.size[0] < 64 or image.size[1] < 64:
-            raise HTTPException(status_code=400, detail="Image too small")
+        key = result_cache.make_key(image_data)
+        result, source = await result_cache.get_or_compute(key, lambda: _analyze_upload(image_data))
+        metrics.counter(f"analyze.{source}").inc()
 
-        # 중앙점 계산 (기본 포인트 대신)
-        input_point = (image.size[0] // 2, image.size[1] // 2)
+        # UUID 생성 및 임시 저장소에 분석 결과 저장 (캐시된 결과는 요청마다 복사)
+        result_id = str(uuid.uuid4())
+        temp_storage.store(result_id, dict(result))
         
-        try:
-            # 세그멘테이션 수행
-            _, mask, _ = sam_service.segment(
-                image_path=file.file, 
-                input_point=input_point
-            )
-            
-            # 동물 분류
-            classification_result = classifier.classify_animal(image, mask)
-            
-            # 분류 결과 로깅 (디버깅용)
-            logger.info(f"CLIP 분류 결과: {classification_result['class']}")
-            logger.info(f"상위 3개 결과: {classification_result['top3']}")
-            
-            # 데이터베이스에서 정보 조회
-            animal_info = db_service.get_info(classification_result["class"])
-            if not animal_info:
-                logger.warning(f"No information found for {classification_result['class']}")
-                animal_info = {"message": "Additional information not available"}
-            
-            # 챗봇 응답 생성
-            friendly_message = chatbot_service.generate_response(
-                classification_result["class"], 
-                animal_info
-            )
-            
-            # 번역된 동물 이름을 가져오기
-            cleaned_animal_name = classification_result["class"].replace("a ", "").strip()
-            korean_name = animal_data_service.translate_animal_name(
-                cleaned_animal_name, 
-                'en', 
-                'ko'
-            )
-
-            # UUID 생성 및 임시 저장소에 분석 결과 저장
-            result_id = str(uuid.uuid4())
-            temp_storage.store(result_id, {
-                "animal": classification_result["class"],
-                "animal_greeting": f"{korean_name or cleaned_animal_name} 사진이네요!",
-                "friendly_message": friendly_message,
-                "img_path": ""
-            })
-            
-            # 주기적으로 만료된 임시 데이터 정리
-            temp_storage.cleanup()
-            
-            # 결과 페이지로 리다이렉트
-            return RedirectResponse(f"/result?id={result_id}", status_code=303)
-
-        except Exception as e:
-            logger.error(f"Analysis failed: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to analyze image")
+        # 주기적으로 만료된 임시 데이터 정리
+        temp_storage.cleanup()
+        
+        # 결과 페이지로 리다이렉트
+        return RedirectResponse(f"/result?id={result_id}", status_code=303)
 
     finally:
         # 파일 핸들러 정리
         await file.close()
 
+# 일괄 분석에서 처리하는 이미지 확장자
+BATCH_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".gif", ".tif", ".tiff")
+
+def _is_zip(file: UploadFile) -> bool:
+    return file.content_type in ("application/zip", "application/x-zip-compressed") or \
+        (file.filename or "").lower().endswith(".zip")
+
+def _expand_uploads(uploads: List[Tuple[str, bytes]]) -> List[Tuple[str, Callable[[], bytes]]]:
+    """
+    업로드 파일과 zip 안의 이미지를 (이름, 바이트 로더) 목록으로 펼침
+
+    zip 항목은 실제로 분석할 때 압축을 풀어 메모리에 한꺼번에 올리지 않습니다.
+
+    Raises:
+        HTTPException: 파일 수나 압축 해제 크기가 상한을 넘거나 zip이 손상된 경우
+    """
+    entries = []
+    total_bytes = 0
+    for name, data in uploads:
+        if not zipfile.is_zipfile(io.BytesIO(data)):
+            entries.append((name, lambda data=data: data))
+            total_bytes += len(data)
+            continue
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(data))
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail=f"Invalid zip archive: {name}")
+        for info in archive.infolist():
+            member = info.filename
+            if info.is_dir() or member.startswith("__MACOSX/") or not member.lower().endswith(BATCH_IMAGE_EXTENSIONS):
+                continue
+            total_bytes += info.file_size
+            entries.append((f"{name}/{member}", lambda archive=archive, info=info: archive.read(info)))
+
+    if len(entries) > BATCH_ANALYZE_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"Too many images (max {BATCH_ANALYZE_MAX_FILES})")
+    if total_bytes > BATCH_ANALYZE_MAX_MB * 1024 ** 2:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {BATCH_ANALYZE_MAX_MB}MB)")
+    return entries
+
+async def _analyze_entry(index: int, name: str, load: Callable[[], bytes]) -> dict:
+    """
+    일괄 분석의 이미지 한 장 처리 (실패해도 예외 대신 error 필드로 반환)
+
+    추론 대기열이 가득 차면 잠시 기다렸다가 다시 시도합니다.
+    """
+    started = time.perf_counter()
+    try:
+        image = await run_in_threadpool(lambda: decode_image(load()))
+        if image.original_size[0] < 64 or image.original_size[1] < 64:
+            return {"index": index, "file": name, "error": "Image too small"}
+
+        for attempt in range(5):
+            try:
+                result = await analysis_pipeline.analyze(image)
+                break
+            except InferenceQueueFullError:
+                if attempt == 4:
+                    raise
+                await asyncio.sleep(0.1 * (attempt + 1))
+
+        cleaned_animal_name = result["class"].replace("a ", "", 1).strip()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.histogram("analyze_batch.image_ms").observe(elapsed_ms)
+        return {
+            "index": index,
+            "file": name,
+            "animal": result["class"],
+            "korean_name": animal_data_service.translate_animal_name(cleaned_animal_name, 'en', 'ko'),
+            "confidence": result["confidence"],
+            "top3": result["top3"],
+            "path": result.get("path", "segmented"),
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+    except ImageDecodeError:
+        return {"index": index, "file": name, "error": "Failed to process image"}
+    except InferenceQueueFullError:
+        return {"index": index, "file": name, "error": "Server is busy"}
+    except Exception as e:
+        logger.error(f"Batch analysis failed for {name}: {str(e)}")
+        return {"index": index, "file": name, "error": "Failed to analyze image"}
+
+async def _stream_batch(entries: List[Tuple[str, Callable[[], bytes]]]) -> AsyncIterator[str]:
+    """
+    이미지를 동시에 BATCH_ANALYZE_CONCURRENCY장까지 분석하며 끝나는 순서대로 NDJSON 한 줄씩 반환
+
+    동시에 여러 장이 파이프라인에 들어가므로 SAM/CLIP 마이크로배치가 채워진 채로 실행되며,
+    클라이언트 연결이 끊기면 남은 작업을 취소합니다. 마지막 줄은 요약입니다.
+    """
+    started = time.perf_counter()
+    queue = iter(enumerate(entries))
+    pending = set()
+    succeeded = failed = 0
+    try:
+        while True:
+            for index, (name, load) in queue:
+                pending.add(asyncio.ensure_future(_analyze_entry(index, name, load)))
+                if len(pending) >= BATCH_ANALYZE_CONCURRENCY:
+                    break
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                line = task.result()
+                if "error" in line:
+                    failed += 1
+                else:
+                    succeeded += 1
+                metrics.counter("analyze_batch.images").inc()
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+
+        yield json.dumps({"summary": {
+            "total": len(entries),
+            "succeeded": succeeded,
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }}) + "\n"
+    finally:
+        for task in pending:
+            task.cancel()
+
+@router.post("/analyze/batch")
+async def analyze_batch(files: List[UploadFile] = File(...)):
+    """
+    여러 이미지 또는 zip 압축 파일을 한 번에 분석하여 결과를 NDJSON으로 스트리밍합니다.
+    
+    이미지마다 분석이 끝나는 대로 한 줄씩 전송하며, 단건 분석과 달리
+    챗봇 응답 생성과 결과 페이지 리다이렉트는 하지 않습니다.
+    
+    Args:
+        files (List[UploadFile]): 이미지 파일들 또는 이미지가 담긴 zip 파일
+    
+    Returns:
+        StreamingResponse: application/x-ndjson 스트림
+            {"index", "file", "animal", "korean_name", "confidence", "top3", "path", "elapsed_ms"}
+            또는 {"index", "file", "error"}, 마지막 줄은 {"summary": {...}}
+    
+    Raises:
+        HTTPException: 이미지가 없거나 상한을 넘는 경우
+    """
+    # 업로드 파일은 응답 스트리밍 중 닫힐 수 있으므로 먼저 읽어 둠
+    uploads = []
+    try:
+        for file in files:
+            if not (file.content_type or "").startswith("image/") and not _is_zip(file):
+                continue
+            uploads.append((file.filename or "upload", await file.read()))
+    finally:
+        for file in files:
+            await file.close()
+
+    entries = await run_in_threadpool(_expand_uploads, uploads)
+    if not entries:
+        raise HTTPException(status_code=400, detail="No images found. Please upload images or a zip archive.")
+
+    return StreamingResponse(_stream_batch(entries), media_type="application/x-ndjson")
+
 # 결과 조회 엔드포인트
 @router.get("/results/{result_id}")
 async def get_analysis_results(result_id: str):
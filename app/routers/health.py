@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services.warmup import warmup_state
+
+router = APIRouter()
+
+@router.get("/healthz")
+async def healthz():
+    """
+    프로세스 생존 여부를 반환합니다.
+    
+    Returns:
+        JSONResponse: 항상 200 (이벤트 루프가 응답할 수 있으면 정상)
+    """
+    return JSONResponse(content={"status": "ok"})
+
+@router.get("/readyz")
+async def readyz():
+    """
+    모델 로드와 예열이 끝나 트래픽을 받을 준비가 되었는지 반환합니다.
+    
+    Returns:
+        JSONResponse: 준비 완료 시 200, 로드/예열 중이거나 실패 시 503
+    """
+    state = warmup_state.snapshot()
+    return JSONResponse(content=state, status_code=200 if warmup_state.ready else 503)
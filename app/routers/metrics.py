@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services.metrics import metrics
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    추론 파이프라인 성능 지표를 반환합니다.
+    
+    Returns:
+        JSONResponse: 카운터, 히스토그램(배치 크기, 대기 시간 등) 스냅샷
+    """
+    return JSONResponse(content=metrics.snapshot())
@@ -1,14 +1,15 @@
 # 업로드 + 예측 처리
 # Upload + Predict 샘플
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.services.model import segment_animal
+from app.services.inference_executor import inference_executor, InferenceQueueFullError
+from app.services.image_ingest import decode_image, ImageDecodeError
 import logging
-from PIL import Image
-import io
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -21,12 +22,17 @@ class SegmentationResponse(BaseModel):
 router = APIRouter()
 
 @router.post("/predict", response_model=SegmentationResponse)
-async def predict_animal(file: UploadFile = File(...)) -> SegmentationResponse:
+async def predict_animal(
+    file: UploadFile = File(...),
+    mask_format: Optional[str] = Query(None, pattern="^(rle|bits)$")
+) -> SegmentationResponse:
     """
     업로드된 이미지에서 동물을 segmentation하여 결과를 반환합니다.
     
     Args:
         file (UploadFile): 분석할 동물 이미지 파일
+        mask_format (str, optional): 마스크를 함께 반환할 인코딩
+            ("rle": COCO 압축 RLE, "bits": 비트 패킹 + base64, 기본값: 반환하지 않음)
     
     Returns:
         SegmentationResponse: segmentation 결과를 포함하는 응답 객체
@@ -46,24 +52,24 @@ async def predict_animal(file: UploadFile = File(...)) -> SegmentationResponse:
         # 이미지 데이터 읽기
         contents = await file.read()
 
-        # 이미지 검증
+        # 이미지 디코딩 및 검증 (한 번만 디코딩하여 세그멘테이션에 재사용)
         try:
-            image = Image.open(io.BytesIO(contents))
-            if image.size[0] < 64 or image.size[1] < 64:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="Image too small. Minimum size is 64x64 pixels."
-                )
-        except Exception as e:
-            logger.error(f"Failed to process image: {str(e)}")
+            image = await run_in_threadpool(decode_image, contents)
+        except ImageDecodeError as e:
+            logger.error(f"Failed to process image: {e.details}")
             raise HTTPException(
                 status_code=400, 
                 detail="Failed to process image. Please check the image file."
             )
+        if image.original_size[0] < 64 or image.original_size[1] < 64:
+            raise HTTPException(
+                status_code=400, 
+                detail="Image too small. Minimum size is 64x64 pixels."
+            )
 
         # Segmentation 수행
         try:
-            segmented_image_info = segment_animal(contents)
+            segmented_image_info = await inference_executor.run(segment_animal, image, mask_format)
             logger.info("Successfully segmented animal in image")
             
             return SegmentationResponse(
@@ -71,6 +77,13 @@ async def predict_animal(file: UploadFile = File(...)) -> SegmentationResponse:
                 message="Segmentation completed successfully"
             )
 
+        except InferenceQueueFullError as e:
+            logger.warning(f"Inference queue full: {e.details}")
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy. Please try again later.",
+                headers={"Retry-After": "1"}
+            )
         except Exception as e:
             logger.error(f"Segmentation failed: {str(e)}")
             raise HTTPException(
@@ -0,0 +1,186 @@
+# 재프롬프트 세그멘테이션
+# 이미지를 한 번 인코딩한 뒤 점/박스 프롬프트만 바꿔 마스크를 다시 계산
+
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import List, Tuple, Optional
+from app.services.analysis_pipeline import analysis_pipeline
+from app.services.inference_executor import inference_executor, InferenceQueueFullError
+from app.services.segment_session import segment_sessions
+from app.services.image_ingest import decode_image, ImageDecodeError
+from PIL import Image
+import numpy as np
+import base64
+import io
+import time
+import logging
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 요청/응답 모델 정의
+class EncodeResponse(BaseModel):
+    image_id: str
+    width: int
+    height: int
+    expires_in: int
+
+class PromptRequest(BaseModel):
+    points: List[Tuple[float, float]] = []
+    labels: List[int] = []
+    box: Optional[Tuple[float, float, float, float]] = None
+    multimask_output: bool = False
+
+class PromptResponse(BaseModel):
+    image_id: str
+    score: float
+    area: int
+    box: List[int]
+    mask_png: str
+    elapsed_ms: float
+
+router = APIRouter()
+
+def _mask_to_png_data_url(mask: np.ndarray) -> str:
+    """bool 마스크를 1비트 PNG data URL로 변환"""
+    buffer = io.BytesIO()
+    Image.fromarray(mask).convert("1").save(buffer, format="PNG", optimize=True)
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+def _mask_box(mask: np.ndarray) -> List[int]:
+    """마스크의 바운딩 박스 [x_min, y_min, x_max, y_max] 계산"""
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0:
+        return [0, 0, mask.shape[1], mask.shape[0]]
+    return [int(cols[0]), int(rows[0]), int(cols[-1]), int(rows[-1])]
+
+@router.post("/segment/encode", response_model=EncodeResponse)
+async def encode_image(file: UploadFile = File(...)) -> EncodeResponse:
+    """
+    이미지를 한 번 인코딩하고 재프롬프트에 사용할 image_id를 반환합니다.
+    
+    반환되는 width/height는 디코딩된(최대 INGEST_MAX_SIDE) 이미지 크기이며,
+    프롬프트 좌표와 마스크도 이 좌표계를 사용합니다.
+    
+    Args:
+        file (UploadFile): 세그멘테이션할 이미지 파일
+    
+    Returns:
+        EncodeResponse: image_id와 원본 이미지 크기
+    
+    Raises:
+        HTTPException: 이미지 처리 또는 인코딩 중 오류 발생 시
+    """
+    try:
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="Invalid file type. Please upload an image.")
+
+        contents = await file.read()
+        try:
+            image = await run_in_threadpool(decode_image, contents)
+        except ImageDecodeError as e:
+            logger.error(f"Failed to open image: {e.details}")
+            raise HTTPException(status_code=400, detail="Failed to process image")
+
+        if image.original_size[0] < 64 or image.original_size[1] < 64:
+            raise HTTPException(status_code=400, detail="Image too small")
+
+        try:
+            # 배치 스케줄러와 임베딩 캐시를 거쳐 인코딩
+            embedding = await analysis_pipeline.sam_scheduler.submit(image)
+        except InferenceQueueFullError as e:
+            logger.warning(f"Inference queue full: {e.details}")
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy. Please try again later.",
+                headers={"Retry-After": "1"}
+            )
+        except Exception as e:
+            logger.error(f"Image encoding failed: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to encode image")
+
+        session = segment_sessions.create(embedding, image.size)
+        return EncodeResponse(
+            image_id=session.image_id,
+            width=image.size[0],
+            height=image.size[1],
+            expires_in=segment_sessions.ttl_seconds
+        )
+
+    finally:
+        await file.close()
+
+@router.post("/segment/{image_id}/prompt", response_model=PromptResponse)
+async def prompt_segment(image_id: str, prompt: PromptRequest) -> PromptResponse:
+    """
+    인코딩된 이미지에 새 점/박스 프롬프트를 적용해 마스크를 계산합니다.
+    
+    prompt_encoder와 mask_decoder만 실행하므로 image_encoder 비용이 들지 않습니다.
+    
+    Args:
+        image_id (str): /segment/encode에서 받은 이미지 ID
+        prompt (PromptRequest): 점 좌표, 레이블, 박스 (원본 이미지 좌표계)
+    
+    Returns:
+        PromptResponse: 가장 점수가 높은 마스크와 점수, 바운딩 박스
+    
+    Raises:
+        HTTPException: 세션이 없거나 프롬프트가 잘못된 경우
+    """
+    if not prompt.points and prompt.box is None:
+        raise HTTPException(status_code=400, detail="At least one point or a box is required")
+    if len(prompt.points) != len(prompt.labels):
+        raise HTTPException(status_code=400, detail="points and labels must have the same length")
+    if any(label not in (0, 1) for label in prompt.labels):
+        raise HTTPException(status_code=400, detail="labels must be 0 (background) or 1 (foreground)")
+
+    session = segment_sessions.get(image_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Image not found or expired")
+
+    started = time.perf_counter()
+    try:
+        masks, scores = await inference_executor.run(
+            analysis_pipeline.sam.predict_masks,
+            session.embedding,
+            session.image_size,
+            prompt.points or None,
+            prompt.labels or None,
+            prompt.box,
+            prompt.multimask_output
+        )
+    except InferenceQueueFullError as e:
+        logger.warning(f"Inference queue full: {e.details}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy. Please try again later.",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        logger.error(f"Prompt segmentation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to segment image")
+
+    best = int(np.argmax(scores))
+    mask = masks[best]
+    return PromptResponse(
+        image_id=image_id,
+        score=float(scores[best]),
+        area=int(mask.sum()),
+        box=_mask_box(mask),
+        mask_png=_mask_to_png_data_url(mask),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2)
+    )
+
+@router.delete("/segment/{image_id}")
+async def delete_segment(image_id: str):
+    """
+    재프롬프트 세션을 삭제합니다.
+    
+    Args:
+        image_id (str): 삭제할 이미지 ID
+    """
+    if not segment_sessions.delete(image_id):
+        raise HTTPException(status_code=404, detail="Image not found or expired")
+    return {"deleted": image_id}
@@ -0,0 +1,211 @@
+# app/services/analysis_pipeline.py
+# MobileSAM 세그멘테이션과 CLIP 분류를 마이크로배칭으로 묶어 실행하는 분석 파이프라인
+
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import torch
+from PIL import Image
+from app.config import (
+    BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS,
+    ANALYZE_CASCADE, CASCADE_MIN_CONFIDENCE, CASCADE_MIN_MARGIN
+)
+from app.services.batch_scheduler import MicroBatchScheduler
+from app.services.inference_executor import InferenceExecutor, inference_executor
+from app.services.sam_service import SamService, sam_service
+from app.services.classifier_service import AnimalClassifier
+from app.services.image_ingest import DecodedImage
+from app.services.process_pool import ProcessInferencePool, process_pool
+from app.services.feature_store import FeatureStore, feature_store
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+class AnalysisPipeline:
+    """
+    동시 요청의 이미지 인코딩을 배치로 묶어 처리하는 분석 파이프라인
+
+    MobileSAM image_encoder와 CLIP encode_image는 요청 간에 배치로 실행하고,
+    요청별로 달라지는 마스크 디코딩과 분류 점수 계산은 각 요청에서 수행합니다.
+    """
+
+    def __init__(self, sam: SamService, classifier: AnimalClassifier,
+                 executor: InferenceExecutor,
+                 max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS,
+                 cascade: bool = ANALYZE_CASCADE,
+                 min_confidence: float = CASCADE_MIN_CONFIDENCE,
+                 min_margin: float = CASCADE_MIN_MARGIN,
+                 process_pool: Optional[ProcessInferencePool] = None,
+                 feature_store: Optional[FeatureStore] = None):
+        """
+        파이프라인 초기화
+
+        Args:
+            sam: 세그멘테이션 서비스
+            classifier: CLIP 분류기
+            executor: 동기 추론 코드를 실행할 추론 실행기
+            max_batch_size: 배치 최대 크기
+            max_wait_ms: 배치를 모으는 최대 대기 시간 (밀리초)
+            cascade: 전체 이미지 CLIP 결과가 확실하면 세그멘테이션을 생략할지 여부
+            min_confidence: 조기 종료에 필요한 최소 top-1 확률
+            min_margin: 조기 종료에 필요한 최소 top-1/top-2 확률 차이
+            process_pool: 세그멘테이션 경로를 맡길 추론 워커 프로세스 풀 (시작된 경우에만 사용)
+            feature_store: 이미지 내용 해시 기준 CLIP 특징 저장소 (히트 시 SAM/CLIP 생략)
+        """
+        self.sam = sam
+        self.classifier = classifier
+        self.executor = executor
+        self.cascade = cascade
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.process_pool = process_pool
+        self.feature_store = feature_store
+        self.sam_scheduler = MicroBatchScheduler(
+            "sam_encoder", self._encode_sam_batch, max_batch_size, max_wait_ms, executor
+        )
+        self.clip_scheduler = MicroBatchScheduler(
+            "clip_encoder", self._encode_clip_batch, max_batch_size, max_wait_ms, executor
+        )
+
+    def _encode_sam_batch(self, images: List[DecodedImage]) -> List[torch.Tensor]:
+        """SAM 이미지 임베딩 배치 계산 후 요청별로 분리"""
+        embeddings = self.sam.encode_images(
+            [decoded.image for decoded in images],
+            [decoded.content_hash for decoded in images]
+        )
+        return [embedding.unsqueeze(0) for embedding in embeddings]
+
+    def _encode_clip_batch(self, images: List[Image.Image]) -> List[torch.Tensor]:
+        """CLIP 이미지 특징 배치 계산 후 요청별로 분리"""
+        return list(self.classifier.encode_images(images))
+
+    async def segment(self, image: DecodedImage,
+                      input_point: Tuple[int, int]) -> Tuple[np.ndarray, float]:
+        """
+        배치 인코딩을 거쳐 이미지 세그멘테이션 수행
+
+        Args:
+            image: 디코딩된 업로드 이미지
+            input_point: 세그멘테이션 기준점 (x, y)
+
+        Returns:
+            Tuple[np.ndarray, float]: (256x256 저해상도 bool 마스크, IoU 점수)
+        """
+        embedding = await self.sam_scheduler.submit(image)
+        masks, scores = await self.executor.run(
+            self.sam.predict_low_res_masks, embedding, image.size, [input_point], [1]
+        )
+        return masks[0], float(scores[0])
+
+    async def segment_auto(self, image: DecodedImage) -> Tuple[np.ndarray, float]:
+        """
+        배치 인코딩을 거쳐 SAM_PROMPT_MODE의 후보 점으로 세그멘테이션 (후보 점은 한 번에 배치 디코딩)
+
+        Returns:
+            Tuple[np.ndarray, float]: (256x256 저해상도 bool 마스크, IoU 점수)
+        """
+        embedding = await self.sam_scheduler.submit(image)
+        return await self.executor.run(self.sam.segment_low_res, embedding, image.image)
+
+    async def classify(self, image: Image.Image, mask: np.ndarray) -> Dict:
+        """
+        배치 인코딩을 거쳐 마스크 영역의 동물 분류
+
+        Args:
+            image: RGB 이미지
+            mask: 세그멘테이션 마스크 (저해상도 마스크 가능)
+
+        Returns:
+            Dict: AnimalClassifier.classify_animal과 동일한 형식의 분류 결과
+        """
+        cropped = await self.executor.run(self.classifier.crop_animal_region, image, mask)
+        features = await self.clip_scheduler.submit(cropped)
+        return self.classifier.classify_features(features)
+
+    def is_confident(self, result: Dict) -> bool:
+        """분류 결과가 조기 종료 기준(top-1 확률과 top-1/top-2 차이)을 모두 넘는지 여부"""
+        probs = [prob for _, prob in result["top3"]]
+        margin = probs[0] - probs[1] if len(probs) > 1 else probs[0]
+        return probs[0] >= self.min_confidence and margin >= self.min_margin
+
+    async def _stored_features(self, image: DecodedImage, variant: str) -> Tuple[str, Optional[torch.Tensor]]:
+        """특징 저장소 조회 (저장소가 없으면 키 없이 미스)"""
+        if self.feature_store is None:
+            return "", None
+        if variant == "segmented":
+            variant = FeatureStore.segmented_variant(self.sam.model_name)
+        key = FeatureStore.make_key(image.content_hash, variant, self.classifier.model_name)
+        stored = await self.executor.run(self.feature_store.get, key)
+        return key, None if stored is None else torch.from_numpy(stored)
+
+    async def _store_features(self, key: str, features: torch.Tensor, started: float) -> None:
+        """미스 경로에서 계산한 특징 저장 (계산 시간은 히트 시 절약 시간 추정에 사용)"""
+        if self.feature_store is None:
+            return
+        compute_ms = (time.perf_counter() - started) * 1000
+        await self.executor.run(self.feature_store.put, key, features.float().cpu().numpy(), compute_ms)
+
+    async def analyze_segmented(self, image: DecodedImage) -> Dict:
+        """
+        SAM_PROMPT_MODE의 프롬프트 점(기본값: 중앙점)으로 세그멘테이션 후 마스크 영역 분류
+
+        한 번 디코딩된 이미지를 SAM과 CLIP이 함께 사용합니다.
+        같은 이미지의 마스크 영역 특징이 저장소에 있으면 SAM과 CLIP을 모두 생략합니다.
+        추론 워커 프로세스 풀이 실행 중이면 전체 경로를 워커에 맡깁니다.
+        """
+        key, stored = await self._stored_features(image, "segmented")
+        if stored is not None:
+            return self.classifier.classify_features(stored)
+
+        if self.process_pool is not None and self.process_pool.running:
+            result, _, _ = await self.process_pool.analyze(image)
+            return result
+
+        started = time.perf_counter()
+        mask, _ = await self.segment_auto(image)
+        cropped = await self.executor.run(self.classifier.crop_animal_region, image.image, mask)
+        features = await self.clip_scheduler.submit(cropped)
+        await self._store_features(key, features, started)
+        return self.classifier.classify_features(features)
+
+    async def analyze(self, image: DecodedImage) -> Dict:
+        """
+        이미지 분석
+
+        캐스케이드 모드에서는 전체 이미지를 먼저 CLIP으로 분류하고, 결과가 확실하지 않을 때만
+        SAM 세그멘테이션과 마스크 영역 재분류를 실행합니다. 결과의 "path"에 거친 경로를 기록합니다.
+
+        Args:
+            image: 디코딩된 업로드 이미지
+
+        Returns:
+            Dict: 분류 결과
+        """
+        if not self.cascade:
+            return await self.analyze_segmented(image)
+
+        started = time.perf_counter()
+        key, features = await self._stored_features(image, "full")
+        if features is None:
+            features = await self.clip_scheduler.submit(image.image)
+            await self._store_features(key, features, started)
+        result = self.classifier.classify_features(features)
+        if self.is_confident(result):
+            path = "early_exit"
+        else:
+            result = await self.analyze_segmented(image)
+            path = "segmented"
+
+        metrics.counter(f"cascade.{path}").inc()
+        metrics.histogram(f"cascade.{path}_ms").observe((time.perf_counter() - started) * 1000)
+        result["path"] = path
+        return result
+
+# 전역 인스턴스 생성
+analysis_pipeline = AnalysisPipeline(
+    sam_service, AnimalClassifier(), inference_executor,
+    process_pool=process_pool, feature_store=feature_store
+)
@@ -0,0 +1,58 @@
+# app/services/batch_analysis.py
+# 디코딩된 이미지 여러 장을 한 번에 세그멘테이션 + 분류하는 동기 배치 분석 (CLI, 추론 워커 프로세스에서 공유)
+
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.services.image_ingest import DecodedImage
+
+def mask_bbox(mask: np.ndarray, original_size: Tuple[int, int]) -> Optional[List[int]]:
+    """저해상도 마스크의 바운딩 박스를 원본 이미지 좌표 [x0, y0, x1, y1]로 변환"""
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0:
+        return None
+    scale_x = original_size[0] / mask.shape[1]
+    scale_y = original_size[1] / mask.shape[0]
+    return [
+        int(cols[0] * scale_x), int(rows[0] * scale_y),
+        int(round((cols[-1] + 1) * scale_x)), int(round((rows[-1] + 1) * scale_y)),
+    ]
+
+def analyze_batch(sam, classifier, images: List[DecodedImage],
+                  feature_store=None) -> List[Tuple[Dict, np.ndarray, float]]:
+    """
+    SAM_PROMPT_MODE의 프롬프트 점으로 세그멘테이션 후 마스크 영역 분류 (SAM/CLIP 인코딩은 배치로 한 번씩 실행)
+
+    마스크도 결과로 돌려주어야 하므로 특징 저장소는 조회하지 않고, 계산한 마스크 영역 특징만 기록합니다.
+
+    Args:
+        sam: SamService 인스턴스
+        classifier: AnimalClassifier 인스턴스
+        images: 디코딩된 이미지 목록
+        feature_store: 마스크 영역 특징을 기록할 FeatureStore (None이면 기록하지 않음)
+
+    Returns:
+        List[Tuple[Dict, np.ndarray, float]]: 이미지별 (분류 결과, 256x256 bool 마스크, IoU 점수)
+    """
+    started = time.perf_counter()
+    embeddings = sam.encode_images([d.image for d in images], [d.content_hash for d in images])
+
+    crops, masks, scores = [], [], []
+    for decoded, embedding in zip(images, embeddings):
+        mask, score = sam.segment_low_res(embedding.unsqueeze(0), decoded.image)
+        masks.append(mask)
+        scores.append(score)
+        crops.append(classifier.crop_animal_region(decoded.image, mask))
+
+    features = classifier.encode_images(crops)
+    if feature_store is not None:
+        compute_ms = (time.perf_counter() - started) * 1000 / len(images)
+        variant = feature_store.segmented_variant(sam.model_name)
+        for decoded, feature in zip(images, features):
+            key = feature_store.make_key(decoded.content_hash, variant, classifier.model_name)
+            feature_store.put(key, feature.float().cpu().numpy(), compute_ms)
+    return [
+        (classifier.classify_features(feature), mask, score)
+        for mask, score, feature in zip(masks, scores, features)
+    ]
@@ -0,0 +1,170 @@
+# app/services/batch_scheduler.py
+# 동시 요청을 짧은 시간 동안 모아 한 번의 배치 추론으로 처리하는 스케줄러
+
+import asyncio
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from app.services.metrics import metrics
+from app.services.inference_executor import InferenceQueueFullError
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 배치 크기 히스토그램 구간
+BATCH_SIZE_BUCKETS: Sequence[float] = (1, 2, 4, 8, 16, 32, 64)
+
+@dataclass
+class BatchSchedulerError(Exception):
+    """배치 스케줄링 과정에서 발생하는 예외를 처리하는 클래스"""
+    message: str
+    details: Optional[dict] = None
+
+class MicroBatchScheduler:
+    """
+    동적 마이크로배칭 스케줄러
+
+    첫 요청이 도착하면 최대 max_wait_ms 동안(또는 max_batch_size개가 찰 때까지)
+    추가 요청을 모은 뒤 batch_fn을 한 번 호출하고, 결과를 각 요청에 돌려줍니다.
+    batch_fn은 입력 리스트와 같은 길이의 결과 시퀀스를 반환해야 합니다.
+
+    배치 워커는 한 번에 한 배치만 실행해 추론 실행기의 슬롯을 하나만 차지하므로,
+    과부하는 스케줄러 대기열 길이로 제한합니다. 대기열이 가득 차면 즉시 InferenceQueueFullError를 발생시킵니다.
+    """
+
+    def __init__(self, name: str,
+                 batch_fn: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0,
+                 executor: Optional[Any] = None,
+                 max_queue: Optional[int] = None):
+        """
+        스케줄러 초기화
+
+        Args:
+            name: 지표 이름 접두어
+            batch_fn: 입력 리스트를 받아 결과 리스트를 반환하는 동기 함수
+            max_batch_size: 한 배치의 최대 크기
+            max_wait_ms: 배치를 채우기 위해 기다리는 최대 시간 (밀리초)
+            executor: batch_fn을 실행할 InferenceExecutor (없으면 기본 스레드 풀)
+            max_queue: 배치를 기다릴 수 있는 최대 항목 수
+                (기본값: 실행기 대기열 길이만큼의 배치, max_batch_size x executor.max_queue)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size는 1 이상이어야 합니다.")
+
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.executor = executor
+        if max_queue is None:
+            max_queue = max_batch_size * max(1, getattr(executor, "max_queue", 1))
+        self.max_queue = max(1, max_queue)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 지표 등록
+        self.batch_size_hist = metrics.histogram(f"{name}.batch_size", BATCH_SIZE_BUCKETS)
+        self.queue_time_hist = metrics.histogram(f"{name}.queue_time_ms")
+        self.run_time_hist = metrics.histogram(f"{name}.batch_run_ms")
+        self.rejected = metrics.counter(f"{name}.rejected")
+
+    def _ensure_worker(self) -> None:
+        """현재 이벤트 루프에 배치 워커가 없으면 생성"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = loop.create_task(self._run())
+            logger.debug(f"Batch worker started: {self.name}")
+
+    async def submit(self, item: Any) -> Any:
+        """
+        항목을 배치 대기열에 넣고 결과를 기다림
+
+        Args:
+            item: batch_fn에 전달될 단일 입력
+
+        Returns:
+            Any: 해당 입력에 대한 batch_fn 결과
+
+        Raises:
+            InferenceQueueFullError: 배치 대기열이 가득 찬 경우
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected.inc()
+            raise InferenceQueueFullError(
+                "배치 대기열이 가득 찼습니다",
+                {"scheduler": self.name, "queued": self._queue.qsize(), "capacity": self.max_queue}
+            )
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        """첫 요청 이후 대기 시간 안에 도착한 요청들을 모아 배치 구성"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # 대기 시간이 끝났어도 이미 도착한 요청은 함께 처리
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+    async def _run(self) -> None:
+        """배치 워커 루프"""
+        while True:
+            batch = await self._collect()
+
+            # 이미 취소된 요청은 제외
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.queue_time_hist.observe((started - enqueued) * 1000)
+            self.batch_size_hist.observe(len(batch))
+
+            items = [item for item, _, _ in batch]
+            try:
+                results = await self._execute(items)
+                if len(results) != len(items):
+                    raise BatchSchedulerError(
+                        "배치 결과 개수 불일치",
+                        {"expected": len(items), "received": len(results)}
+                    )
+            except Exception as e:
+                logger.error(f"Batch execution failed ({self.name}): {str(e)}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.run_time_hist.observe((time.perf_counter() - started) * 1000)
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _execute(self, items: List[Any]) -> Sequence[Any]:
+        """이벤트 루프를 막지 않도록 batch_fn을 별도 스레드에서 실행"""
+        if self.executor is not None:
+            return await self.executor.run(self.batch_fn, items)
+        return await self._loop.run_in_executor(None, self.batch_fn, items)
@@ -1,11 +1,9 @@
 # services/chat_service.py
 from typing import Dict, Optional
-import os
-from dotenv import load_dotenv
 import logging
-import google.generativeai as genai
 from dataclasses import dataclass
 from app.services.animal_data import animal_data_service
+from app.services.llm_client import GeminiClient, llm_client
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -17,29 +15,26 @@ class ChatError(Exception):
     details: Optional[Dict] = None
 
 class ChatBotService:
-    def __init__(self):
-        """Gemini API 서비스 초기화"""
+    def __init__(self, client: GeminiClient = llm_client):
+        """Gemini API 서비스 초기화 (공유 비동기 클라이언트 사용)"""
         try:
-            # .env 파일 로드
-            load_dotenv()
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
+            if not client.enabled:
                 logger.error("GEMINI_API_KEY not found in environment variables")
                 raise ChatError("API 키를 찾을 수 없습니다.")
 
-            # Gemini API 초기화
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
+            self.client = client
             logger.info("ChatBotService initialized successfully")
 
         except Exception as e:
             logger.error(f"Failed to initialize ChatBotService: {str(e)}")
             raise ChatError(f"서비스 초기화 실패: {str(e)}")
 
-    def generate_response(self, animal_name: str, animal_info: Dict[str, str]) -> str:
+    async def generate_response(self, animal_name: str, animal_info: Dict[str, str]) -> str:
         """
         동물 정보를 기반으로 친근한 응답을 생성합니다.
         
+        응답을 기다리는 동안 이벤트 루프를 막지 않으며, LLM_TIMEOUT_SEC를 넘기면 실패로 처리합니다.
+        
         Args:
             animal_name: 동물 이름 (영문)
             animal_info: 동물 정보 딕셔너리
@@ -76,22 +71,22 @@ class ChatBotService:
 **응답**:"""
 
             # 응답 생성
-            response = self.model.generate_content(
+            text = await self.client.generate(
                 prompt,
                 generation_config={
                     "temperature": 0.7,
-                    "top_k": 40,
-                    "top_p": 0.95,
-                    "max_output_tokens": 1024,
+                    "topK": 40,
+                    "topP": 0.95,
+                    "maxOutputTokens": 1024,
                 }
             )
 
-            if not response.text:
+            if not text:
                 logger.warning(f"Empty response received for {korean_name}")
                 return "죄송해요, 지금은 답변을 생성하기 어려워요."
 
             logger.info(f"Successfully generated response for {korean_name}")
-            return response.text
+            return text
 
         except Exception as e:
             error_msg = f"Error generating response for {animal_name}: {str(e)}"
@@ -2,9 +2,21 @@ import torch
 import clip
 import numpy as np
 from PIL import Image
+import time
 import logging
+import threading
 from typing import Tuple, Dict, List, Optional
 from dataclasses import dataclass
+from app.config import (
+    CLIP_CROP_PADDING, CLIP_MASK_BACKGROUND, INFERENCE_BACKEND, INFERENCE_PRECISION,
+    CLASSIFIER_HIERARCHICAL
+)
+from app.services.model_registry import model_registry
+from app.services.inference_backend import get_backend
+from app.services.species_vocabulary import SpeciesVocabulary, load_species_vocabulary
+from app.services.hierarchical_classifier import HierarchicalVocabulary
+from app.services.image_hashing import image_content_hash
+from app.services.feature_store import FeatureStore, feature_store
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -18,15 +30,30 @@ class ClassificationError(Exception):
 class AnimalClassifier:
     """CLIP 모델을 사용하여 동물을 분류하는 클래스"""
     
-    def __init__(self):
-        """CLIP 모델과 동물 클래스 초기화"""
+    def __init__(self, model_name: Optional[str] = None, backend: str = INFERENCE_BACKEND,
+                 precision: str = INFERENCE_PRECISION,
+                 vocabulary: Optional[SpeciesVocabulary] = None,
+                 hierarchical: bool = CLASSIFIER_HIERARCHICAL):
+        """
+        CLIP 모델과 동물 클래스 초기화
+        
+        CLIP 모델은 model_registry가 처음 사용할 때 한 번만 로드합니다.
+        미리 계산된 전체 종 어휘 파일이 있으면 그 행렬로 분류하고,
+        없으면 기본 클래스의 텍스트 특징을 첫 분류 시점에 계산합니다.
+        hierarchical이면 과 프로토타입으로 후보를 좁힌 뒤 상위 과의 종만 점수화합니다.
+        
+        Args:
+            model_name (str): model_registry에 등록된 모델 이름 (기본값: 백엔드/정밀도에 맞는 CLIP)
+            backend (str): 이미지 인코더 추론 백엔드 ("torch" 또는 "onnx")
+            precision (str): 추론 정밀도 ("fp32", "int8" 또는 "bf16")
+            vocabulary (SpeciesVocabulary): 분류할 종 어휘 (기본값: 디스크의 어휘 파일)
+            hierarchical (bool): 종 어휘 사용 시 2단계(과 -> 종) 분류 여부
+        """
         try:
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            logger.info(f"Using device: {self.device}")
-            
-            # CLIP 모델 로드
-            self.model, self.preprocess = clip.load("ViT-B/32", device=self.device)
-            self.model.eval()  # 추론 모드로 설정
+            self.backend = get_backend(backend, precision)
+            self.model_name = model_name or self.backend.clip_model_name
+            self.device = self.backend.device
+            logger.info(f"Using device: {self.device}, backend: {self.backend.name}/{self.backend.precision}")
             
             # 동물 클래스 정의
             self.ANIMAL_CLASSES: List[str] = [
@@ -35,23 +62,60 @@ class AnimalClassifier:
                 "a wolf", "a monkey", "a elephant", "a giraffe", "a zebra"
             ]
             
-            # 텍스트 임베딩 미리 계산 및 캐시
-            self._cache_text_features()
-            logger.info("AnimalClassifier initialized successfully")
+            self._text_features: Optional[torch.Tensor] = None
+            self._text_lock = threading.Lock()
+            
+            # 전체 종 어휘 (메모리 매핑된 텍스트 임베딩 행렬)
+            self.vocabulary = vocabulary if vocabulary is not None else load_species_vocabulary()
+            self.labels = self.vocabulary.labels if self.vocabulary else self.ANIMAL_CLASSES
+            self.scorer = (
+                HierarchicalVocabulary(self.vocabulary)
+                if self.vocabulary is not None and hierarchical else self.vocabulary
+            )
+            logger.info(f"AnimalClassifier initialized successfully ({len(self.labels)} classes)")
             
         except Exception as e:
             logger.error(f"Failed to initialize AnimalClassifier: {str(e)}")
             raise ClassificationError("모델 초기화 실패")
 
+    @property
+    def model(self):
+        """공유 CLIP 모델 (처음 접근 시 로드)"""
+        return model_registry.get(self.model_name)[0]
+
+    @property
+    def required_models(self) -> List[str]:
+        """분류에 필요한 model_registry 항목 (예열 대상, 종 어휘가 없을 때만 텍스트 특징용 CLIP 포함)"""
+        names = list(self.backend.clip_models)
+        if self.scorer is None and self.model_name not in names:
+            names.append(self.model_name)
+        return names
+
+    @property
+    def preprocess(self):
+        """CLIP 이미지 전처리 함수"""
+        return self.backend.clip_preprocess
+
+    @property
+    def text_features(self) -> torch.Tensor:
+        """클래스별 텍스트 특징 (처음 접근 시 계산)"""
+        if self._text_features is None:
+            with self._text_lock:
+                if self._text_features is None:
+                    self._cache_text_features()
+        return self._text_features
+
     def _cache_text_features(self) -> None:
         """텍스트 특징을 미리 계산하여 캐시"""
         try:
+            # 텍스트 모델은 백엔드와 다른 장치에 있을 수 있으므로(onnx) 모델 장치에서 계산 후 백엔드 장치로 이동
+            model = self.model
             self.text_inputs = clip.tokenize(
                 [f"a photo of {cls}" for cls in self.ANIMAL_CLASSES]
-            ).to(self.device)
+            ).to(model.token_embedding.weight.device)
             
             with torch.no_grad():
-                self.text_features = self.model.encode_text(self.text_inputs)
+                self._text_features = model.encode_text(self.text_inputs).to(self.device)
                 
             logger.debug("Text features cached successfully")
             
@@ -59,38 +123,66 @@ class AnimalClassifier:
             logger.error(f"Text feature caching failed: {str(e)}")
             raise ClassificationError("텍스트 특징 캐시 실패")
 
-    def crop_animal_region(self, image: Image.Image, mask: np.ndarray) -> Image.Image:
+    def crop_animal_region(self, image: Image.Image, mask: np.ndarray,
+                           padding: float = CLIP_CROP_PADDING) -> Image.Image:
         """
-        세그멘테이션 마스크를 이용해 동물 영역만 잘라냄
+        세그멘테이션 마스크의 바운딩 박스로 동물 영역만 잘라냄
+        
+        마스크는 이미지와 해상도가 달라도 되며(예: SAM 256x256 저해상도 마스크),
+        바운딩 박스만 이미지 좌표로 변환해 잘라낸 뒤 그 영역의 마스크만 업샘플합니다.
+        전체 해상도 이미지/마스크 복사 없이 CLIP 입력에 동물 픽셀을 더 많이 담습니다.
         
         Args:
             image (Image.Image): 원본 이미지
-            mask (np.ndarray): 세그멘테이션 마스크
+            mask (np.ndarray): 세그멘테이션 마스크 (bool 또는 로짓)
+            padding (float): 바운딩 박스 크기 대비 여백 비율
             
         Returns:
-            Image.Image: 마스크가 적용된 이미지
+            Image.Image: 잘라낸 동물 영역 이미지 (마스크가 비어 있으면 원본 이미지)
             
         Raises:
             ClassificationError: 이미지 처리 실패 시
         """
         try:
-            # 이미지와 마스크 크기 검증
+            # 이미지와 마스크 타입 검증
             if not isinstance(image, Image.Image):
                 raise ValueError("Invalid image type")
             if not isinstance(mask, np.ndarray):
                 raise ValueError("Invalid mask type")
             
-            # 크기 조정
-            if image.size != (mask.shape[1], mask.shape[0]):
-                mask = Image.fromarray(mask).resize(image.size, Image.NEAREST)
-                mask = np.array(mask)
+            # 로짓 마스크는 SAM 임계값(0) 기준으로 이진화
+            if mask.dtype != bool:
+                mask = mask > 0
+            
+            # 마스크 좌표계에서 바운딩 박스 계산 (행/열 단위 벡터 연산)
+            rows = np.flatnonzero(mask.any(axis=1))
+            cols = np.flatnonzero(mask.any(axis=0))
+            if rows.size == 0:
+                return image
             
-            # 마스크 적용
-            np_img = np.array(image)
-            mask = mask.astype(bool)
-            np_img[~mask] = 0  # 배경 제거
+            # 이미지 좌표로 변환 후 여백 추가
+            width, height = image.size
+            scale_x = width / mask.shape[1]
+            scale_y = height / mask.shape[0]
+            x0, x1 = cols[0] * scale_x, (cols[-1] + 1) * scale_x
+            y0, y1 = rows[0] * scale_y, (rows[-1] + 1) * scale_y
+            pad_x, pad_y = (x1 - x0) * padding, (y1 - y0) * padding
+            box = (
+                max(0, int(x0 - pad_x)), max(0, int(y0 - pad_y)),
+                min(width, int(np.ceil(x1 + pad_x))), min(height, int(np.ceil(y1 + pad_y)))
+            )
+            cropped = image.crop(box)
             
-            return Image.fromarray(np_img)
+            if not CLIP_MASK_BACKGROUND:
+                return cropped
+            
+            # 잘라낸 영역에 해당하는 마스크만 업샘플하여 배경 제거
+            region_mask = Image.fromarray(mask.astype(np.uint8) * 255).resize(
+                cropped.size, Image.NEAREST,
+                box=(box[0] / scale_x, box[1] / scale_y, box[2] / scale_x, box[3] / scale_y)
+            )
+            background = Image.new("RGB", cropped.size)
+            return Image.composite(cropped, background, region_mask)
             
         except Exception as e:
             logger.error(f"Failed to crop animal region: {str(e)}")
@@ -115,26 +207,80 @@ class AnimalClassifier:
             ClassificationError: 분류 실패 시
         """
         try:
-            # 이미지 전처리
+            # 이미지 전처리 및 특징 추출 (같은 영역의 특징이 저장소에 있으면 CLIP 생략)
             cropped_img = self.crop_animal_region(image, mask)
-            image_input = self.preprocess(cropped_img).unsqueeze(0).to(self.device)
+            key = None
+            if feature_store is not None:
+                key = FeatureStore.make_key(image_content_hash(cropped_img), "crop", self.model_name)
+                stored = feature_store.get(key)
+                if stored is not None:
+                    return self.classify_features(torch.from_numpy(stored))
 
-            # 추론
-            with torch.no_grad():
-                image_features = self.model.encode_image(image_input)
-                logits_per_image = image_features @ self.text_features.T
-                probs = logits_per_image.softmax(dim=-1).cpu().numpy()[0]
-
-            # Top 3 예측 결과 추출
-            top3_idx = np.argsort(probs)[-3:][::-1]
-            top3_results = [
-                (self.ANIMAL_CLASSES[idx], float(probs[idx])) 
-                for idx in top3_idx
-            ]
+            started = time.perf_counter()
+            image_features = self.encode_images([cropped_img])
+            if key is not None:
+                compute_ms = (time.perf_counter() - started) * 1000
+                feature_store.put(key, image_features[0].float().cpu().numpy(), compute_ms)
+            return self.classify_features(image_features[0])
+
+        except ClassificationError:
+            raise
+        except Exception as e:
+            logger.error(f"Classification failed: {str(e)}")
+            raise ClassificationError("동물 분류 실패")
+
+    def encode_images(self, images: List[Image.Image]) -> torch.Tensor:
+        """
+        여러 이미지를 하나의 배치로 묶어 CLIP 이미지 특징 계산
+        
+        Args:
+            images (List[Image.Image]): 전처리 전 이미지 리스트
+            
+        Returns:
+            torch.Tensor: (B, D) 형태의 이미지 특징
+            
+        Raises:
+            ClassificationError: 특징 추출 실패 시
+        """
+        try:
+            image_input = torch.stack([self.preprocess(img) for img in images]).to(self.device)
+            return self.backend.clip_encode(image_input)
+        except Exception as e:
+            logger.error(f"Image encoding failed: {str(e)}")
+            raise ClassificationError("이미지 특징 추출 실패")
+
+    def classify_features(self, image_features: torch.Tensor) -> Dict[str, float]:
+        """
+        미리 계산된 이미지 특징으로 동물 클래스 분류
+        
+        Args:
+            image_features (torch.Tensor): (D,) 형태의 단일 이미지 특징
+            
+        Returns:
+            Dict: classify_animal과 동일한 형식의 분류 결과
+        """
+        try:
+            if self.scorer is not None:
+                # 전체 어휘(또는 상위 과의 종)에 대해 행렬 곱 + top-k
+                top3_results = self.scorer.top_k(image_features.float().cpu().numpy(), k=3)
+            else:
+                with torch.no_grad():
+                    # 특징 저장소에서 읽은 특징은 CPU fp32이므로 텍스트 특징의 장치/정밀도로 맞춤
+                    text_features = self.text_features
+                    image_features = image_features.to(text_features.device, text_features.dtype)
+                    logits_per_image = image_features.unsqueeze(0) @ text_features.T
+                    probs = logits_per_image.softmax(dim=-1).cpu().numpy()[0]
+
+                # Top 3 예측 결과 추출
+                top3_idx = np.argsort(probs)[-3:][::-1]
+                top3_results = [
+                    (self.ANIMAL_CLASSES[idx], float(probs[idx])) 
+                    for idx in top3_idx
+                ]
 
             result = {
-                "class": self.ANIMAL_CLASSES[top3_idx[0]],
-                "confidence": float(probs[top3_idx[0]]),
+                "class": top3_results[0][0],
+                "confidence": top3_results[0][1],
                 "top3": top3_results
             }
             
@@ -146,12 +292,10 @@ class AnimalClassifier:
             raise ClassificationError("동물 분류 실패")
             
     def __del__(self):
-        """리소스 정리"""
+        """리소스 정리 (공유 모델은 model_registry가 관리)"""
         try:
-            if hasattr(self, 'model'):
-                del self.model
-            if hasattr(self, 'text_features'):
-                del self.text_features
+            if hasattr(self, '_text_features'):
+                del self._text_features
             torch.cuda.empty_cache()
         except Exception as e:
             logger.error(f"Cleanup failed: {str(e)}")
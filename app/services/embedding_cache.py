@@ -0,0 +1,107 @@
+# app/services/embedding_cache.py
+# 이미지 내용 해시를 키로 하는 바이트 예산 기반 LRU 임베딩 캐시
+
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import torch
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """
+    텐서 임베딩을 저장하는 LRU 캐시
+
+    저장된 텐서의 전체 바이트 수가 max_bytes를 넘으면
+    가장 오래 사용되지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, max_bytes: int, name: str = "embedding_cache"):
+        """
+        캐시 초기화
+
+        Args:
+            max_bytes: 캐시가 사용할 최대 바이트 수 (0이면 캐시 비활성화)
+            name: 지표 이름 접두어
+        """
+        self.max_bytes = max(0, max_bytes)
+        self.name = name
+        self._entries: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+        # 지표 등록
+        self.hits = metrics.counter(f"{name}.hits")
+        self.misses = metrics.counter(f"{name}.misses")
+        self.evictions = metrics.counter(f"{name}.evictions")
+        metrics.register_collector(name, self.stats)
+
+    @staticmethod
+    def _nbytes(tensor: torch.Tensor) -> int:
+        return tensor.numel() * tensor.element_size()
+
+    def get(self, key: str) -> Optional[torch.Tensor]:
+        """
+        캐시된 임베딩 조회
+
+        Args:
+            key: 이미지 내용 해시
+
+        Returns:
+            Optional[torch.Tensor]: 캐시된 임베딩 (없으면 None)
+        """
+        with self._lock:
+            tensor = self._entries.get(key)
+            if tensor is None:
+                self.misses.inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits.inc()
+            return tensor
+
+    def put(self, key: str, tensor: torch.Tensor) -> None:
+        """
+        임베딩 저장 (예산 초과 시 LRU 항목 제거)
+
+        Args:
+            key: 이미지 내용 해시
+            tensor: 저장할 임베딩
+        """
+        size = self._nbytes(tensor)
+        if size > self.max_bytes:
+            return
+
+        # 배치 텐서의 행 뷰를 그대로 저장하면 배치 전체 저장 공간이 남으므로 항목별로 복사
+        tensor = tensor.detach().contiguous().clone()
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= self._nbytes(previous)
+
+            while self._entries and self._current_bytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._current_bytes -= self._nbytes(evicted)
+                self.evictions.inc()
+
+            self._entries[key] = tensor
+            self._current_bytes += size
+
+    def clear(self) -> None:
+        """캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 상태 반환"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "evictions": self.evictions.value,
+        }
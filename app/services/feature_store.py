@@ -0,0 +1,250 @@
+# app/services/feature_store.py
+# 이미지 내용 해시를 키로 CLIP 이미지 특징을 디스크에 보관해 여러 워커 프로세스가 공유하는 특징 저장소
+
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+import numpy as np
+from app.config import (
+    FEATURE_STORE_DIR, FEATURE_STORE_MB, FEATURE_STORE_DIM,
+    SAM_PROMPT_MODE, SAM_PROMPT_GRID, SAM_PROMPT_POINTS, CLIP_CROP_PADDING, CLIP_MASK_BACKGROUND
+)
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 저장소 파일
+VECTORS_FILE = "features_fp16.mmap"
+TAGS_FILE = "tags.mmap"
+INDEX_FILE = "index.sqlite"
+
+# 마지막 접근 시각 갱신 간격 (초) - 조회마다 쓰기 트랜잭션이 생기지 않도록
+TOUCH_INTERVAL_SEC = 60.0
+
+class FeatureStore:
+    """
+    메모리 매핑된 fp16 특징 행렬 (capacity, dim) + sqlite 인덱스 (키 -> 슬롯, 마지막 접근 시각)
+
+    모든 워커가 같은 파일을 매핑해 읽고, 쓰기는 sqlite 쓰기 잠금(BEGIN IMMEDIATE)으로 직렬화합니다.
+    용량이 차면 가장 오래 접근하지 않은 슬롯을 재사용합니다. 슬롯마다 키 다이제스트 태그를
+    벡터 뒤에 기록하므로, 다른 프로세스가 재사용 중인 슬롯을 읽으면 태그가 맞지 않아 미스로 처리됩니다.
+    """
+
+    def __init__(self, directory: Path = FEATURE_STORE_DIR, max_mb: int = FEATURE_STORE_MB,
+                 dim: int = FEATURE_STORE_DIM, name: str = "feature_store"):
+        """
+        저장소 초기화 (파일은 처음 get/put할 때 열고, 없으면 생성)
+
+        Args:
+            directory: 저장 디렉토리
+            max_mb: 특징 행렬 최대 크기 (MB)
+            dim: 특징 차원
+            name: 지표 이름 접두어
+        """
+        self.directory = Path(directory)
+        self.dim = dim
+        self.capacity = max(1, max_mb * 1024 ** 2 // (dim * 2))
+
+        self._local = threading.local()
+        self._open_lock = threading.Lock()
+        self._opened = False
+        self._failed = False
+
+        # 지표 등록
+        self.hits = metrics.counter(f"{name}.hits")
+        self.misses = metrics.counter(f"{name}.misses")
+        self.evictions = metrics.counter(f"{name}.evictions")
+        self.saved_ms = metrics.counter(f"{name}.saved_ms")
+        self.lookup_time_hist = metrics.histogram(f"{name}.lookup_ms")
+        self.compute_time_hist = metrics.histogram(f"{name}.miss_compute_ms")
+        self._compute_ms_total = 0.0
+        self._compute_count = 0
+        metrics.register_collector(name, self.stats)
+
+    def _ensure_open(self) -> bool:
+        """처음 사용할 때 파일 열기 (import만으로 디스크에 파일이 생기지 않도록, 실패하면 저장소 비활성화)"""
+        if self._opened:
+            return True
+        if self._failed:
+            return False
+        with self._open_lock:
+            if not self._opened and not self._failed:
+                try:
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    self._open_files()
+                    self._opened = True
+                    logger.info(f"FeatureStore opened: {self.directory} ({self.capacity} slots x {self.dim})")
+                except Exception as e:
+                    self._failed = True
+                    logger.error(f"Failed to open feature store: {str(e)}")
+        return self._opened
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 sqlite 연결"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.directory / INDEX_FILE), timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _open_files(self) -> None:
+        """
+        인덱스 테이블 생성 후 특징/태그 파일 매핑 (차원이나 용량이 바뀌면 기존 항목 삭제)
+
+        여러 워커가 동시에 열어도 초기화는 한 번만 일어나도록 쓰기 잠금 안에서 수행합니다.
+        """
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS features ("
+            "key TEXT PRIMARY KEY, slot INTEGER UNIQUE NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS features_last_access ON features (last_access)")
+
+        vectors_path, tags_path = self.directory / VECTORS_FILE, self.directory / TAGS_FILE
+        layout = f"{self.dim}x{self.capacity}"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+            if row is None or row[0] != layout:
+                conn.execute("DELETE FROM features")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('layout', ?)", (layout,))
+                vectors_path.unlink(missing_ok=True)
+                tags_path.unlink(missing_ok=True)
+            mode = "r+" if vectors_path.exists() and tags_path.exists() else "w+"
+            self._vectors = np.memmap(vectors_path, dtype=np.float16, mode=mode, shape=(self.capacity, self.dim))
+            self._tags = np.memmap(tags_path, dtype=np.uint8, mode=mode, shape=(self.capacity, 32))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def make_key(content_hash: str, variant: str, model: str) -> str:
+        """이미지 내용 해시 + 특징 종류(전체 이미지/마스크 영역 등) + 모델 이름으로 저장소 키 생성"""
+        return hashlib.sha256(f"{content_hash}:{variant}:{model}".encode()).hexdigest()
+
+    @staticmethod
+    def segmented_variant(sam_model: str, mode: str = SAM_PROMPT_MODE) -> str:
+        """
+        마스크 영역 특징의 종류 이름
+
+        저장소는 재시작 후에도 남으므로, 마스크와 CLIP 입력 영역을 바꾸는 설정(프롬프트 모드/점 수,
+        SAM 모델, 크롭 여백, 배경 제거)을 모두 포함해 설정이 바뀌면 새로 계산합니다.
+        """
+        return (
+            f"segmented:{mode}:g{SAM_PROMPT_GRID}:p{SAM_PROMPT_POINTS}:{sam_model}:"
+            f"pad{CLIP_CROP_PADDING}:bg{int(CLIP_MASK_BACKGROUND)}"
+        )
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        저장된 특징 조회
+
+        Args:
+            key: make_key로 만든 키
+
+        Returns:
+            Optional[np.ndarray]: (dim,) fp32 특징 (없으면 None)
+        """
+        if not self._ensure_open():
+            return None
+        started = time.perf_counter()
+        conn = self._connection()
+        row = conn.execute("SELECT slot, last_access FROM features WHERE key = ?", (key,)).fetchone()
+        vector = None
+        if row is not None:
+            slot, last_access = row
+            vector = np.array(self._vectors[slot], dtype=np.float32)
+            if bytes(self._tags[slot]) != bytes.fromhex(key):
+                vector = None  # 다른 프로세스가 재사용 중인 슬롯
+            else:
+                now = time.time()
+                if now - last_access > TOUCH_INTERVAL_SEC:
+                    try:
+                        conn.execute("UPDATE features SET last_access = ? WHERE key = ?", (now, key))
+                    except sqlite3.OperationalError:
+                        pass  # 다른 프로세스가 쓰는 중이면 다음 조회 때 갱신
+        self.lookup_time_hist.observe((time.perf_counter() - started) * 1000)
+
+        if vector is None:
+            self.misses.inc()
+            return None
+        self.hits.inc()
+        if self._compute_count:
+            self.saved_ms.inc(int(self._compute_ms_total / self._compute_count))
+        return vector
+
+    def put(self, key: str, features: np.ndarray, compute_ms: Optional[float] = None) -> None:
+        """
+        특징 저장 (용량이 차면 LRU 슬롯 재사용)
+
+        Args:
+            key: make_key로 만든 키
+            features: (dim,) 특징
+            compute_ms: 이 특징을 계산하는 데 걸린 시간 (히트 시 절약한 시간 추정에 사용)
+        """
+        if not self._ensure_open():
+            return
+        vector = np.asarray(features, dtype=np.float16).reshape(-1)
+        if vector.shape[0] != self.dim:
+            logger.warning(f"FeatureStore dim mismatch: {vector.shape[0]} != {self.dim}")
+            return
+        if compute_ms is not None:
+            self.compute_time_hist.observe(compute_ms)
+            self._compute_ms_total += compute_ms
+            self._compute_count += 1
+
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM features WHERE key = ?", (key,)).fetchone():
+                conn.execute("COMMIT")
+                return
+            count = conn.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+            if count < self.capacity:
+                # 항목은 제거와 동시에 같은 슬롯으로 교체되므로 사용 중인 슬롯은 항상 0..count-1
+                slot = count
+            else:
+                evicted_key, slot = conn.execute(
+                    "SELECT key, slot FROM features ORDER BY last_access LIMIT 1"
+                ).fetchone()
+                conn.execute("DELETE FROM features WHERE key = ?", (evicted_key,))
+                self.evictions.inc()
+
+            # 태그를 먼저 지우고 벡터를 쓴 뒤 새 태그를 기록 (읽는 쪽은 태그로 일관성 확인)
+            self._tags[slot] = 0
+            self._vectors[slot] = vector
+            self._tags[slot] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+            conn.execute(
+                "INSERT INTO features (key, slot, last_access) VALUES (?, ?, ?)", (key, slot, time.time())
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning(f"FeatureStore put failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """저장소 상태 반환"""
+        hits, misses = self.hits.value, self.misses.value
+        return {
+            "open": self._opened,
+            "entries": self._connection().execute("SELECT COUNT(*) FROM features").fetchone()[0] if self._opened else 0,
+            "capacity": self.capacity,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "saved_ms": self.saved_ms.value,
+            "evictions": self.evictions.value,
+        }
+
+# 전역 인스턴스 생성 (FEATURE_STORE_MB가 0이면 비활성화, 파일은 처음 사용할 때 열림)
+feature_store = FeatureStore() if FEATURE_STORE_MB > 0 else None
@@ -0,0 +1,86 @@
+# app/services/hierarchical_classifier.py
+# 과(Family) 프로토타입으로 후보를 좁힌 뒤 해당 과의 종만 점수화하는 2단계 분류
+
+import logging
+from typing import Dict, List, Tuple
+import numpy as np
+from app.config import CLASSIFIER_TOP_FAMILIES
+from app.services.species_vocabulary import SpeciesVocabulary, LOGIT_SCALE
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+def family_name(name_en: str) -> str:
+    """
+    종 영문명에서 과 수준 이름 추출
+
+    utils/generate_family_translations.py와 같은 규칙으로 마지막 단어를 사용합니다.
+    (예: "sika deer" -> "deer", "dog" -> "dog")
+    """
+    return name_en.lower().split()[-1]
+
+class HierarchicalVocabulary:
+    """
+    SpeciesVocabulary 위의 coarse-to-fine 분류기
+
+    1단계에서 과별 프로토타입(소속 종 임베딩의 평균)을 점수화하고,
+    2단계에서 상위 과에 속한 종만 점수화합니다. 과 수가 F, 상위 과의 종 수가 S이면
+    이미지당 행렬 곱이 V에서 F + S로 줄어듭니다. top_k는 SpeciesVocabulary와 같은 형식입니다.
+    """
+
+    def __init__(self, vocabulary: SpeciesVocabulary, top_families: int = CLASSIFIER_TOP_FAMILIES):
+        """
+        Args:
+            vocabulary: 전체 종 어휘
+            top_families: 2단계에서 펼칠 상위 과 수
+        """
+        self.vocabulary = vocabulary
+        self.labels = vocabulary.labels
+        self.top_families = max(1, top_families)
+
+        members: Dict[str, List[int]] = {}
+        for idx, species in enumerate(vocabulary.species):
+            members.setdefault(family_name(species.name_en), []).append(idx)
+        self.families = list(members)
+        self.members = [np.array(rows) for rows in members.values()]
+        self._family_index = {name: i for i, name in enumerate(self.families)}
+
+        # 과 프로토타입 (F, D), 정규화된 평균 임베딩
+        prototypes = np.stack([
+            np.asarray(vocabulary.embeddings[rows], dtype=np.float32).mean(axis=0)
+            for rows in self.members
+        ])
+        self.prototypes = prototypes / np.linalg.norm(prototypes, axis=-1, keepdims=True)
+        logger.info(f"Hierarchical vocabulary: {len(self.families)} families, {len(vocabulary)} species")
+
+    def top_families_for(self, image_features: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        1단계: 상위 과와 로짓
+
+        Returns:
+            List[Tuple[str, float]]: [(family, logit), ...] 로짓 내림차순
+        """
+        features = np.asarray(image_features, dtype=np.float32).reshape(-1)
+        features = features / np.linalg.norm(features)
+        logits = LOGIT_SCALE * (self.prototypes @ features)
+        k = min(self.top_families, len(self.families))
+        top = np.argpartition(-logits, k - 1)[:k]
+        top = top[np.argsort(-logits[top])]
+        return [(self.families[i], float(logits[i])) for i in top]
+
+    def top_k(self, image_features: np.ndarray, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        2단계: 상위 과에 속한 종만으로 상위 k개 종과 확률 계산
+
+        확률은 후보 종에 대한 softmax이므로 전체 어휘 softmax보다 다소 높게 나옵니다.
+        """
+        rows = np.concatenate([
+            self.members[self._family_index[name]] for name, _ in self.top_families_for(image_features)
+        ])
+        logits = self.vocabulary.logits(image_features, rows)[0]
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        k = min(k, len(rows))
+        top = np.argpartition(-probs, k - 1)[:k]
+        top = top[np.argsort(-probs[top])]
+        return [(self.labels[rows[i]], float(probs[i])) for i in top]
@@ -0,0 +1,81 @@
+# app/services/image_hashing.py
+# 디코딩된 이미지 내용 기반 해시 계산 유틸리티 (정확한 SHA-256, 재인코딩에 강한 지각 해시)
+
+import hashlib
+from functools import lru_cache
+import numpy as np
+from PIL import Image
+
+# pHash 계산 해상도와 사용할 저주파 DCT 계수 범위
+PHASH_SIDE = 32
+PHASH_LOW_FREQ = 8
+
+def image_content_hash(image: Image.Image) -> str:
+    """
+    디코딩된 이미지 픽셀 기준 SHA-256 해시 계산
+    
+    파일 형식이나 메타데이터가 달라도 픽셀이 같으면 같은 해시를 반환합니다.
+    
+    Args:
+        image (Image.Image): PIL 이미지
+        
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+@lru_cache(maxsize=1)
+def _dct_matrix(size: int) -> np.ndarray:
+    """정규화된 DCT-II 변환 행렬 (size x size)"""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2.0 / size)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    """bool 배열을 정수 해시로 변환"""
+    return int.from_bytes(np.packbits(bits.reshape(-1)).tobytes(), "big")
+
+def phash(image: Image.Image) -> int:
+    """
+    64비트 DCT 지각 해시 (pHash)
+
+    32x32 흑백으로 줄인 이미지의 저주파 8x8 DCT 계수가 중앙값보다 큰지를 비트로 기록합니다.
+    크기 조정, 재압축, 약한 색 보정에도 해밍 거리가 작게 유지됩니다.
+    """
+    gray = np.asarray(image.convert("L").resize((PHASH_SIDE, PHASH_SIDE), Image.BILINEAR), dtype=np.float32)
+    dct = _dct_matrix(PHASH_SIDE)
+    coefficients = (dct @ gray @ dct.T)[:PHASH_LOW_FREQ, :PHASH_LOW_FREQ]
+    median = np.median(coefficients.reshape(-1)[1:])  # DC 성분은 밝기 평균이라 제외
+    return _bits_to_int(coefficients > median)
+
+def dhash(image: Image.Image) -> int:
+    """
+    64비트 차분 지각 해시 (dHash)
+
+    9x8 흑백으로 줄인 이미지에서 가로로 이웃한 픽셀의 밝기 증감을 비트로 기록합니다.
+    pHash보다 가볍지만 대비 변화에는 조금 더 민감합니다.
+    """
+    gray = np.asarray(image.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    return _bits_to_int(gray[:, 1:] > gray[:, :-1])
+
+def perceptual_hash(image: Image.Image, method: str = "phash") -> int:
+    """
+    지각 해시 계산
+
+    Args:
+        image (Image.Image): PIL 이미지 (EXIF 회전이 반영된 디코딩 결과)
+        method (str): "phash" 또는 "dhash"
+
+    Returns:
+        int: 64비트 해시
+    """
+    return dhash(image) if method == "dhash" else phash(image)
+
+def hamming_distance(a: int, b: int) -> int:
+    """두 해시의 해밍 거리"""
+    return bin(a ^ b).count("1")
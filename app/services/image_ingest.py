@@ -0,0 +1,111 @@
+# app/services/image_ingest.py
+# 업로드 이미지를 한 번만 디코딩해 SAM/CLIP이 함께 사용하는 이미지 입력 단계
+
+import io
+import time
+import logging
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Optional, Tuple
+import numpy as np
+from PIL import Image, ImageOps
+from app.config import INGEST_MAX_SIDE, NEAR_DUP_HASH
+from app.services.image_hashing import image_content_hash, perceptual_hash
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 가로/세로가 바뀌는 EXIF Orientation 값
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+# 지표 등록
+decode_time_hist = metrics.histogram("image_ingest.decode_ms")
+draft_decodes = metrics.counter("image_ingest.draft_decodes")
+
+@dataclass
+class ImageDecodeError(Exception):
+    """이미지 디코딩 과정에서 발생하는 예외를 처리하는 클래스"""
+    message: str
+    details: Optional[dict] = None
+
+@dataclass
+class DecodedImage:
+    """한 번 디코딩된 업로드 이미지"""
+    image: Image.Image                 # RGB, 긴 변 <= max_side
+    original_size: Tuple[int, int]     # 파일에 기록된 원본 크기 (width, height)
+    _content_hash: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.image.size
+
+    @property
+    def scale(self) -> Tuple[float, float]:
+        """디코딩 좌표를 원본 좌표로 바꾸는 배율 (x, y)"""
+        return (self.original_size[0] / self.image.size[0],
+                self.original_size[1] / self.image.size[1])
+
+    @cached_property
+    def array(self) -> np.ndarray:
+        """(H, W, 3) uint8 RGB 배열 (처음 접근 시 한 번만 생성)"""
+        return np.asarray(self.image)
+
+    @property
+    def content_hash(self) -> str:
+        """디코딩된 픽셀 기준 SHA-256 (처음 접근 시 한 번만 계산)"""
+        if self._content_hash is None:
+            self._content_hash = image_content_hash(self.image)
+        return self._content_hash
+
+    @cached_property
+    def perceptual_hash(self) -> int:
+        """NEAR_DUP_HASH 방식의 64비트 지각 해시 (처음 접근 시 한 번만 계산)"""
+        return perceptual_hash(self.image, NEAR_DUP_HASH)
+
+def decode_image(data: bytes, max_side: int = INGEST_MAX_SIDE) -> DecodedImage:
+    """
+    이미지 바이트를 RGB로 한 번 디코딩
+    
+    JPEG은 Pillow의 draft 모드로 DCT 단계에서 1/2, 1/4, 1/8 축소 디코딩하여
+    큰 사진도 max_side에 가까운 해상도로만 디코딩합니다.
+    EXIF 회전 정보를 반영하고, 긴 변이 max_side를 넘으면 축소합니다.
+    
+    Args:
+        data (bytes): 인코딩된 이미지 데이터
+        max_side (int): 디코딩 결과의 긴 변 최대 길이
+        
+    Returns:
+        DecodedImage: 디코딩된 이미지
+        
+    Raises:
+        ImageDecodeError: 디코딩 실패 시
+    """
+    started = time.perf_counter()
+    try:
+        image = Image.open(io.BytesIO(data))
+        original_size = image.size
+        # EXIF 회전으로 가로/세로가 바뀌는 경우 원본 크기도 같은 방향으로 맞춤
+        if image.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS:
+            original_size = (original_size[1], original_size[0])
+        
+        # JPEG 축소 디코딩 (결과 크기는 요청 크기 이상으로 유지됨)
+        if image.format == "JPEG" and max(image.size) > max_side:
+            image.draft("RGB", (max_side, max_side))
+            draft_decodes.inc()
+        
+        # EXIF 회전 반영 후 RGB 변환
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        
+        if max(image.size) > max_side:
+            image.thumbnail((max_side, max_side), Image.BILINEAR)
+        
+        return DecodedImage(image=image, original_size=original_size)
+        
+    except Exception as e:
+        logger.error(f"Failed to decode image: {str(e)}")
+        raise ImageDecodeError("이미지 디코딩 실패", {"error": str(e)})
+    finally:
+        decode_time_hist.observe((time.perf_counter() - started) * 1000)
@@ -0,0 +1,243 @@
+# app/services/inference_backend.py
+# MobileSAM / CLIP 이미지 인코더 실행 백엔드 (eager PyTorch 또는 ONNX Runtime)
+
+import logging
+import threading
+import contextlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import torch
+from clip.clip import _transform as clip_transform
+from app.config import INFERENCE_BACKEND, INFERENCE_PRECISION, ONNX_MODEL_DIR, ONNX_INTRA_OP_THREADS
+from app.services.model_registry import model_registry, DEVICE
+
+try:
+    import onnxruntime as ort
+except ImportError:  # ONNX 백엔드를 사용하지 않는 환경
+    ort = None
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# ONNX 모델 파일 이름
+SAM_ENCODER_ONNX = "mobile_sam_encoder.onnx"
+SAM_DECODER_ONNX = "mobile_sam_decoder.onnx"
+CLIP_VISUAL_ONNX = "clip_vit_b32_visual.onnx"
+
+# 지원하는 추론 정밀도
+PRECISIONS = ("fp32", "int8", "bf16")
+
+@dataclass
+class BackendError(Exception):
+    """추론 백엔드 설정/실행 과정에서 발생하는 예외를 처리하는 클래스"""
+    message: str
+    details: Optional[dict] = None
+
+class TorchBackend:
+    """
+    model_registry의 eager PyTorch 모델로 추론하는 백엔드
+
+    precision에 따라 fp32 모델, Linear 동적 int8 양자화 모델(CPU),
+    또는 fp32 모델 + bfloat16 autocast로 실행합니다. 출력은 항상 fp32입니다.
+    """
+
+    name = "torch"
+
+    def __init__(self, precision: str = "fp32"):
+        self.precision = precision
+        suffix = "_int8" if precision == "int8" else ""
+        self.sam_model_name = f"mobile_sam{suffix}"
+        self.clip_model_name = f"clip{suffix}"
+        # 양자화 모델은 CPU에서만 실행 가능
+        self.device = "cpu" if precision == "int8" else DEVICE
+        # 세그멘테이션/이미지 인코딩에 실제로 로드하는 model_registry 항목
+        self.sam_models: List[str] = [self.sam_model_name]
+        self.clip_models: List[str] = [self.clip_model_name]
+
+    @property
+    def sam(self) -> torch.nn.Module:
+        return model_registry.get(self.sam_model_name)
+
+    @property
+    def clip_preprocess(self) -> Callable:
+        return model_registry.get(self.clip_model_name)[1]
+
+    def autocast(self):
+        """bf16 모드에서만 autocast 적용"""
+        if self.precision == "bf16":
+            return torch.autocast(device_type=torch.device(self.device).type, dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
+    def sam_encode(self, batch: torch.Tensor) -> torch.Tensor:
+        """(B, 3, 1024, 1024) 정규화 이미지 -> (B, 256, 64, 64) 임베딩"""
+        with torch.no_grad(), self.autocast():
+            return self.sam.image_encoder(batch).float()
+
+    def sam_decode(self, image_embedding: torch.Tensor,
+                   point_coords: Optional[torch.Tensor],
+                   point_labels: Optional[torch.Tensor],
+                   boxes: Optional[torch.Tensor],
+                   multimask_output: bool) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        프롬프트 인코딩 + 마스크 디코딩
+
+        Args:
+            image_embedding: (1, 256, 64, 64) 이미지 임베딩
+            point_coords: (B, N, 2) 1024 입력 좌표계의 점 (없으면 None)
+            point_labels: (B, N) 점 레이블
+            boxes: (B, 4) 1024 입력 좌표계의 박스 (없으면 None)
+            multimask_output: 후보 마스크 3개 반환 여부
+
+        Returns:
+            Tuple[torch.Tensor, torch.Tensor]: (저해상도 마스크 로짓 (B, K, 256, 256), IoU 점수 (B, K))
+        """
+        sam = self.sam
+        points = (point_coords, point_labels) if point_coords is not None else None
+        with torch.no_grad(), self.autocast():
+            sparse_embeddings, dense_embeddings = sam.prompt_encoder(
+                points=points,
+                boxes=boxes,
+                masks=None,
+            )
+            low_res_masks, iou_predictions = sam.mask_decoder(
+                image_embeddings=image_embedding,
+                image_pe=sam.prompt_encoder.get_dense_pe(),
+                sparse_prompt_embeddings=sparse_embeddings,
+                dense_prompt_embeddings=dense_embeddings,
+                multimask_output=multimask_output,
+            )
+        return low_res_masks.float(), iou_predictions.float()
+
+    def clip_encode(self, batch: torch.Tensor) -> torch.Tensor:
+        """(B, 3, 224, 224) 전처리 이미지 -> (B, 512) 이미지 특징"""
+        with torch.no_grad(), self.autocast():
+            return model_registry.get(self.clip_model_name)[0].encode_image(batch).float()
+
+class OnnxBackend:
+    """
+    scripts/export_onnx.py로 내보낸 ONNX 모델을 ONNX Runtime(CPU)으로 추론하는 백엔드
+
+    마스크 디코더는 SAM 공식 ONNX 규약(SamOnnxModel)을 따르므로
+    박스는 레이블 2/3의 모서리 점으로, 박스가 없으면 레이블 -1의 패딩 점을 덧붙입니다.
+    """
+
+    name = "onnx"
+
+    # 특징 저장소 키 등에 쓰는 모델 이름 (CLIP 텍스트 특징은 ONNX로 내보내지 않았으므로 fp32 PyTorch 모델 사용)
+    sam_model_name = "mobile_sam"
+    clip_model_name = "clip"
+    # 세그멘테이션/이미지 인코딩에 실제로 로드하는 model_registry 항목 (PyTorch 모델은 로드하지 않음)
+    sam_models = ["mobile_sam_encoder_onnx", "mobile_sam_decoder_onnx"]
+    clip_models = ["clip_visual_onnx"]
+
+    def __init__(self, precision: str = "fp32"):
+        if ort is None:
+            raise BackendError("onnxruntime이 설치되지 않았습니다", {"backend": self.name})
+        if precision != "fp32":
+            raise BackendError("onnx 백엔드는 fp32만 지원합니다", {"precision": precision})
+        self.precision = precision
+        # 세션은 CPUExecutionProvider로 실행되어 CPU 텐서를 반환
+        self.device = "cpu"
+        self._clip_preprocess = clip_transform(224)
+
+    @property
+    def clip_preprocess(self) -> Callable:
+        return self._clip_preprocess
+
+    @staticmethod
+    def _run(model_name: str, inputs: Dict[str, np.ndarray]) -> list:
+        session = model_registry.get(model_name)
+        return session.run(None, inputs)
+
+    def sam_encode(self, batch: torch.Tensor) -> torch.Tensor:
+        (embeddings,) = self._run("mobile_sam_encoder_onnx", {"images": batch.cpu().numpy()})
+        return torch.from_numpy(embeddings)
+
+    def sam_decode(self, image_embedding: torch.Tensor,
+                   point_coords: Optional[torch.Tensor],
+                   point_labels: Optional[torch.Tensor],
+                   boxes: Optional[torch.Tensor],
+                   multimask_output: bool) -> Tuple[torch.Tensor, torch.Tensor]:
+        """TorchBackend.sam_decode와 같은 입출력 규약"""
+        if point_coords is None:
+            batch_size = boxes.shape[0]
+            coords = np.zeros((batch_size, 0, 2), dtype=np.float32)
+            labels = np.zeros((batch_size, 0), dtype=np.float32)
+        else:
+            coords = point_coords.cpu().numpy().astype(np.float32)
+            labels = point_labels.cpu().numpy().astype(np.float32)
+            batch_size = coords.shape[0]
+
+        if boxes is not None:
+            corners = boxes.cpu().numpy().astype(np.float32).reshape(batch_size, 2, 2)
+            coords = np.concatenate([coords, corners], axis=1)
+            labels = np.concatenate([labels, np.tile([[2, 3]], (batch_size, 1)).astype(np.float32)], axis=1)
+        else:
+            coords = np.concatenate([coords, np.zeros((batch_size, 1, 2), dtype=np.float32)], axis=1)
+            labels = np.concatenate([labels, -np.ones((batch_size, 1), dtype=np.float32)], axis=1)
+
+        _, scores, low_res_masks = self._run("mobile_sam_decoder_onnx", {
+            "image_embeddings": image_embedding.cpu().numpy(),
+            "point_coords": coords,
+            "point_labels": labels,
+            "mask_input": np.zeros((1, 1, 256, 256), dtype=np.float32),
+            "has_mask_input": np.zeros(1, dtype=np.float32),
+            "orig_im_size": np.array([1024, 1024], dtype=np.float32),
+        })
+
+        # mask_decoder와 같은 방식으로 단일/다중 마스크 선택
+        selected = slice(1, None) if multimask_output else slice(0, 1)
+        return torch.from_numpy(low_res_masks[:, selected]), torch.from_numpy(scores[:, selected])
+
+    def clip_encode(self, batch: torch.Tensor) -> torch.Tensor:
+        (features,) = self._run("clip_visual_onnx", {"images": batch.cpu().numpy()})
+        return torch.from_numpy(features)
+
+def _onnx_session_loader(filename: str) -> Callable:
+    """ONNX Runtime 세션 로더 생성"""
+    def load():
+        if ort is None:
+            raise BackendError("onnxruntime이 설치되지 않았습니다", {"model": filename})
+        path = ONNX_MODEL_DIR / filename
+        if not path.exists():
+            raise FileNotFoundError(
+                f"ONNX 모델을 찾을 수 없습니다: {path} (python scripts/export_onnx.py export 실행 필요)"
+            )
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_INTRA_OP_THREADS > 0:
+            options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+        return ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+    return load
+
+# ONNX 세션도 모델 레지스트리에서 한 번만 로드
+model_registry.register("mobile_sam_encoder_onnx", _onnx_session_loader(SAM_ENCODER_ONNX))
+model_registry.register("mobile_sam_decoder_onnx", _onnx_session_loader(SAM_DECODER_ONNX))
+model_registry.register("clip_visual_onnx", _onnx_session_loader(CLIP_VISUAL_ONNX))
+
+_BACKENDS = {"torch": TorchBackend, "onnx": OnnxBackend}
+_instances: Dict[Tuple[str, str], object] = {}
+_lock = threading.Lock()
+
+def get_backend(name: str = INFERENCE_BACKEND, precision: str = INFERENCE_PRECISION):
+    """
+    이름과 정밀도에 해당하는 추론 백엔드 반환
+
+    Args:
+        name: "torch" 또는 "onnx"
+        precision: "fp32", "int8" 또는 "bf16"
+
+    Raises:
+        BackendError: 지원하지 않는 백엔드/정밀도인 경우
+    """
+    if name not in _BACKENDS:
+        raise BackendError("지원하지 않는 추론 백엔드입니다", {"backend": name, "available": list(_BACKENDS)})
+    if precision not in PRECISIONS:
+        raise BackendError("지원하지 않는 추론 정밀도입니다", {"precision": precision, "available": list(PRECISIONS)})
+    key = (name, precision)
+    with _lock:
+        if key not in _instances:
+            _instances[key] = _BACKENDS[name](precision)
+            logger.info(f"Inference backend selected: {name}/{precision} (device: {_instances[key].device})")
+        return _instances[key]
@@ -0,0 +1,123 @@
+# app/services/inference_executor.py
+# 동기 PyTorch 추론을 이벤트 루프 밖의 전용 스레드 풀에서 실행하는 실행기
+
+import asyncio
+import functools
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from app.config import INFERENCE_WORKERS, INFERENCE_MAX_QUEUE
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+@dataclass
+class InferenceQueueFullError(Exception):
+    """추론 대기열이 가득 차 작업을 받을 수 없을 때 발생하는 예외"""
+    message: str
+    details: Optional[dict] = None
+
+class InferenceExecutor:
+    """
+    작업 수가 제한된 추론 전용 실행기
+
+    실행 중인 작업과 대기 중인 작업의 합이 max_workers + max_queue를 넘으면
+    대기열에 넣지 않고 즉시 InferenceQueueFullError를 발생시킵니다.
+    """
+
+    def __init__(self, max_workers: int = INFERENCE_WORKERS,
+                 max_queue: int = INFERENCE_MAX_QUEUE):
+        """
+        실행기 초기화
+
+        Args:
+            max_workers: 추론 스레드 수
+            max_queue: 실행 대기 가능한 최대 작업 수
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="inference"
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        # 지표 등록
+        self.rejected = metrics.counter("inference_executor.rejected")
+        self.wait_time_hist = metrics.histogram("inference_executor.wait_ms")
+        self.run_time_hist = metrics.histogram("inference_executor.run_ms")
+        metrics.register_collector("inference_executor", self.stats)
+
+        logger.info(f"InferenceExecutor initialized with {self.max_workers} workers, queue {self.max_queue}")
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _acquire(self) -> None:
+        """작업 슬롯 확보 (가득 찬 경우 예외)"""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected.inc()
+                raise InferenceQueueFullError(
+                    "추론 대기열이 가득 찼습니다",
+                    {"pending": self._pending, "capacity": self.capacity}
+                )
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _timed(self, fn: Callable[..., Any], enqueued: float) -> Any:
+        """대기 시간과 실행 시간을 기록하며 작업 실행"""
+        started = time.perf_counter()
+        self.wait_time_hist.observe((started - enqueued) * 1000)
+        try:
+            return fn()
+        finally:
+            self.run_time_hist.observe((time.perf_counter() - started) * 1000)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        동기 함수를 추론 스레드에서 실행하고 결과를 기다림
+
+        Args:
+            fn: 실행할 동기 함수
+            *args, **kwargs: 함수 인자
+
+        Returns:
+            Any: 함수 실행 결과
+
+        Raises:
+            InferenceQueueFullError: 대기열이 가득 찬 경우
+        """
+        self._acquire()
+        try:
+            call = functools.partial(fn, *args, **kwargs)
+            future = self._executor.submit(self._timed, call, time.perf_counter())
+        except BaseException:
+            self._release()
+            raise
+        # 기다리던 코루틴이 취소되어도 스레드의 작업은 계속 실행되므로, 슬롯은 작업이 끝날 때 반환
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        """현재 실행기 상태 반환"""
+        return {
+            "workers": self.max_workers,
+            "capacity": self.capacity,
+            "pending": self._pending,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """스레드 풀 종료"""
+        self._executor.shutdown(wait=wait)
+
+# 전역 인스턴스 생성
+inference_executor = InferenceExecutor()
@@ -0,0 +1,229 @@
+# app/services/llm_client.py
+# 연결을 재사용하는 비동기 Gemini REST 클라이언트 (호출별 제한 시간, 동시 요청 수 제한)
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import httpx
+from dotenv import load_dotenv
+from app.config import (
+    LLM_MODEL, LLM_TIMEOUT_SEC, LLM_CONNECT_TIMEOUT_SEC,
+    LLM_MAX_CONCURRENCY, LLM_MAX_CONNECTIONS, LLM_RETRIES
+)
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# Gemini REST API 주소
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+# 다시 시도할 응답 상태 코드
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+@dataclass
+class LLMError(Exception):
+    """LLM 호출 과정에서 발생하는 예외를 처리하는 클래스"""
+    message: str
+    details: Optional[Dict] = None
+
+class GeminiClient:
+    """
+    Gemini generateContent 비동기 클라이언트
+
+    하나의 httpx.AsyncClient로 keep-alive 연결을 재사용하고, 세마포어로 동시에 보내는 요청 수를 제한합니다.
+    둘 다 처음 호출하는 이벤트 루프에서 만들고 aclose()에서 버리므로, 앱을 다시 시작해도 새로 만들어집니다.
+    제한 시간은 세마포어 대기와 재시도를 포함한 호출 전체에 적용되므로, 느린 응답이 요청 처리를
+    제한 시간 이상 붙잡지 않으며 그동안 이벤트 루프는 다른 요청을 처리합니다.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = LLM_MODEL,
+                 timeout: float = LLM_TIMEOUT_SEC,
+                 connect_timeout: float = LLM_CONNECT_TIMEOUT_SEC,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 max_connections: int = LLM_MAX_CONNECTIONS,
+                 retries: int = LLM_RETRIES):
+        """
+        클라이언트 초기화 (HTTP 연결 풀과 세마포어는 처음 호출할 때 생성)
+
+        Args:
+            api_key: Gemini API 키 (기본값: 환경 변수 GEMINI_API_KEY)
+            model: 기본 모델 이름
+            timeout: 호출 하나의 전체 제한 시간 (초)
+            connect_timeout: 연결 수립 제한 시간 (초)
+            max_concurrency: 동시에 진행할 최대 요청 수
+            max_connections: 연결 풀 최대 연결 수
+            retries: 429/5xx 응답과 연결 오류의 최대 재시도 횟수
+        """
+        if api_key is None:
+            load_dotenv()
+            api_key = os.getenv("GEMINI_API_KEY")
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.retries = retries
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight = 0
+        self._waiting = 0
+
+        # 지표 등록
+        self.requests = metrics.counter("llm.requests")
+        self.errors = metrics.counter("llm.errors")
+        self.timeouts = metrics.counter("llm.timeouts")
+        self.retried = metrics.counter("llm.retries")
+        self.latency_hist = metrics.histogram("llm.latency_ms")
+        self.wait_hist = metrics.histogram("llm.queue_wait_ms")
+        metrics.register_collector("llm", self.stats)
+
+        if not self.api_key:
+            logger.warning("GEMINI_API_KEY not found in environment variables")
+
+    @property
+    def enabled(self) -> bool:
+        """API 키가 설정되어 있는지 여부"""
+        return bool(self.api_key)
+
+    def _bind_loop(self) -> None:
+        """현재 이벤트 루프가 바뀌었으면 이전 루프의 세마포어와 HTTP 클라이언트를 버림"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = None
+            self._client = None
+
+    def _limiter(self) -> asyncio.Semaphore:
+        """동시 요청 수 제한 세마포어 (현재 이벤트 루프에서 생성)"""
+        self._bind_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _http(self) -> httpx.AsyncClient:
+        """공유 HTTP 클라이언트 (keep-alive 연결 풀, 현재 이벤트 루프에서 생성)"""
+        self._bind_loop()
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=GEMINI_API_BASE,
+                headers={"x-goog-api-key": self.api_key or "", "Content-Type": "application/json"},
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """요청 전송 (429/5xx 응답과 연결 오류는 짧게 기다린 뒤 재시도)"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._http().post(path, json=body)
+                if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            self.retried.inc()
+            await asyncio.sleep(0.5 * (2 ** attempt))
+
+    async def generate(self, prompt: str, model: Optional[str] = None,
+                       generation_config: Optional[Dict[str, Any]] = None,
+                       timeout: Optional[float] = None) -> str:
+        """
+        프롬프트로 텍스트 생성
+
+        Args:
+            prompt: 프롬프트
+            model: 모델 이름 (기본값: 클라이언트 기본 모델)
+            generation_config: Gemini generationConfig (temperature, topK, topP, maxOutputTokens 등)
+            timeout: 이번 호출의 전체 제한 시간 (기본값: 클라이언트 제한 시간)
+
+        Returns:
+            str: 생성된 텍스트 (후보가 없으면 빈 문자열)
+
+        Raises:
+            LLMError: API 키가 없거나, 제한 시간을 넘기거나, 요청이 실패한 경우
+        """
+        if not self.enabled:
+            raise LLMError("API 키를 찾을 수 없습니다.")
+
+        body: Dict[str, Any] = {"contents": [{"parts": [{"text": prompt}]}]}
+        if generation_config:
+            body["generationConfig"] = generation_config
+        path = f"/models/{model or self.model}:generateContent"
+
+        self.requests.inc()
+        started = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(self._limited_post(path, body, started), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts.inc()
+            logger.warning(f"LLM request timed out after {timeout or self.timeout}s")
+            raise LLMError("LLM 응답 시간 초과", {"timeout": timeout or self.timeout})
+        except httpx.HTTPStatusError as e:
+            self.errors.inc()
+            logger.error(f"LLM request failed: {e.response.status_code} {e.response.text[:200]}")
+            raise LLMError("LLM 요청 실패", {"status": e.response.status_code})
+        except (httpx.HTTPError, ValueError) as e:
+            self.errors.inc()
+            logger.error(f"LLM request failed: {str(e)}")
+            raise LLMError("LLM 요청 실패", {"error": str(e)})
+        finally:
+            self.latency_hist.observe((time.perf_counter() - started) * 1000)
+
+        candidates = data.get("candidates") or []
+        if not candidates:
+            logger.warning("No response candidates from Gemini API")
+            return ""
+        parts = candidates[0].get("content", {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+
+    async def _limited_post(self, path: str, body: Dict[str, Any], started: float) -> Dict[str, Any]:
+        """세마포어로 동시 요청 수를 제한해 전송"""
+        semaphore = self._limiter()
+        self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self.wait_hist.observe((time.perf_counter() - started) * 1000)
+        self._inflight += 1
+        try:
+            return await self._post(path, body)
+        finally:
+            self._inflight -= 1
+            semaphore.release()
+
+    async def aclose(self) -> None:
+        """연결 풀 닫기 (다음 호출에서 세마포어와 연결 풀을 새로 생성)"""
+        client = self._client
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """클라이언트 상태 반환"""
+        return {
+            "model": self.model,
+            "enabled": self.enabled,
+            "inflight": self._inflight,
+            "waiting": self._waiting,
+            "requests": self.requests.value,
+            "errors": self.errors.value,
+            "timeouts": self.timeouts.value,
+            "retries": self.retried.value,
+        }
+
+# 전역 인스턴스 생성
+llm_client = GeminiClient()
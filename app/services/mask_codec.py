@@ -0,0 +1,196 @@
+# app/services/mask_codec.py
+# 세그멘테이션 마스크를 COCO 형식 RLE 또는 비트 패킹 배열로 압축하는 코덱
+
+import json
+import base64
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 지원하는 인코딩 ("rle": COCO 압축 RLE 문자열, "bits": np.packbits + base64)
+MASK_FORMATS = ("rle", "bits")
+
+# 파일 확장자별 저장 형식
+RLE_SUFFIX = ".rle.json"
+BITS_SUFFIX = ".bits.npz"
+
+# 지표 등록
+encoded_bytes_hist = metrics.histogram("mask_codec.encoded_bytes")
+
+@dataclass
+class MaskCodecError(Exception):
+    """마스크 인코딩/디코딩 과정에서 발생하는 예외를 처리하는 클래스"""
+    message: str
+    details: Optional[dict] = None
+
+def rle_counts(mask: np.ndarray) -> np.ndarray:
+    """
+    마스크의 run 길이 (열 우선 순서, 첫 run은 항상 0의 길이 - COCO RLE 규칙)
+
+    값이 바뀌는 위치만 찾아 차분하므로 픽셀 수에 대해 한 번의 벡터 연산으로 끝납니다.
+    """
+    flat = np.asarray(mask, dtype=bool).ravel(order="F")
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    counts = np.diff(np.concatenate(([0], changes, [flat.size])))
+    if flat.size and flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts.astype(np.int64)
+
+def _compress_counts(counts: np.ndarray) -> str:
+    """run 길이를 COCO 압축 문자열로 변환 (pycocotools rleToString과 같은 형식)"""
+    chars = []
+    counts = counts.tolist()
+    for i, x in enumerate(counts):
+        if i > 2:
+            x -= counts[i - 2]
+        more = True
+        while more:
+            c = x & 0x1f
+            x >>= 5
+            more = x != -1 if c & 0x10 else x != 0
+            if more:
+                c |= 0x20
+            chars.append(chr(c + 48))
+    return "".join(chars)
+
+def _decompress_counts(text: str) -> np.ndarray:
+    """COCO 압축 문자열을 run 길이로 복원 (pycocotools rleFrString과 같은 형식)"""
+    counts: List[int] = []
+    p = 0
+    while p < len(text):
+        x = k = 0
+        more = True
+        while more:
+            c = ord(text[p]) - 48
+            x |= (c & 0x1f) << (5 * k)
+            more = bool(c & 0x20)
+            p += 1
+            k += 1
+            if not more and c & 0x10:
+                x |= -1 << (5 * k)
+        if len(counts) > 2:
+            x += counts[-2]
+        counts.append(x)
+    return np.asarray(counts, dtype=np.int64)
+
+def encode_rle(mask: np.ndarray) -> Dict[str, Any]:
+    """
+    마스크를 COCO RLE로 인코딩
+
+    Returns:
+        Dict: {"size": [h, w], "counts": 압축 문자열} (pycocotools.mask.decode로 바로 디코딩 가능)
+    """
+    mask = np.asarray(mask)
+    if mask.ndim != 2:
+        raise MaskCodecError("2차원 마스크만 인코딩할 수 있습니다", {"shape": list(mask.shape)})
+    return {"size": [int(mask.shape[0]), int(mask.shape[1])], "counts": _compress_counts(rle_counts(mask))}
+
+def decode_rle(rle: Dict[str, Any]) -> np.ndarray:
+    """COCO RLE(압축 문자열 또는 정수 목록)를 (h, w) bool 마스크로 디코딩"""
+    height, width = rle["size"]
+    counts = rle["counts"]
+    counts = _decompress_counts(counts) if isinstance(counts, str) else np.asarray(counts, dtype=np.int64)
+    if counts.sum() != height * width:
+        raise MaskCodecError("RLE 길이가 마스크 크기와 다릅니다", {"size": [height, width], "total": int(counts.sum())})
+    values = np.zeros(len(counts), dtype=bool)
+    values[1::2] = True
+    return np.repeat(values, counts).reshape((height, width), order="F")
+
+def rle_area(rle: Dict[str, Any]) -> int:
+    """디코딩 없이 RLE의 전경 픽셀 수 계산"""
+    counts = rle["counts"]
+    counts = _decompress_counts(counts) if isinstance(counts, str) else np.asarray(counts, dtype=np.int64)
+    return int(counts[1::2].sum())
+
+def encode_bits(mask: np.ndarray) -> Dict[str, Any]:
+    """
+    마스크를 비트 패킹 (픽셀당 1비트, 행 우선) 후 base64로 인코딩
+
+    Returns:
+        Dict: {"size": [h, w], "bits": base64 문자열}
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.ndim != 2:
+        raise MaskCodecError("2차원 마스크만 인코딩할 수 있습니다", {"shape": list(mask.shape)})
+    return {
+        "size": [int(mask.shape[0]), int(mask.shape[1])],
+        "bits": base64.b64encode(np.packbits(mask, axis=None).tobytes()).decode("ascii"),
+    }
+
+def decode_bits(packed: Dict[str, Any]) -> np.ndarray:
+    """비트 패킹된 마스크를 (h, w) bool 마스크로 디코딩"""
+    height, width = packed["size"]
+    data = np.frombuffer(base64.b64decode(packed["bits"]), dtype=np.uint8)
+    return np.unpackbits(data, count=height * width).reshape(height, width).astype(bool)
+
+def encode_mask(mask: np.ndarray, mask_format: str = "rle") -> Dict[str, Any]:
+    """
+    지정한 형식으로 마스크 인코딩 (응답 페이로드용)
+
+    Args:
+        mask: (h, w) 마스크
+        mask_format: "rle" 또는 "bits"
+
+    Returns:
+        Dict: {"format", "size", "counts" 또는 "bits"}
+    """
+    if mask_format == "rle":
+        encoded = encode_rle(mask)
+    elif mask_format == "bits":
+        encoded = encode_bits(mask)
+    else:
+        raise MaskCodecError("지원하지 않는 마스크 형식입니다", {"format": mask_format, "supported": list(MASK_FORMATS)})
+    encoded = {"format": mask_format, **encoded}
+    encoded_bytes_hist.observe(len(encoded.get("counts") or encoded.get("bits")))
+    return encoded
+
+def decode_mask(encoded: Dict[str, Any]) -> np.ndarray:
+    """encode_mask 결과를 bool 마스크로 디코딩 (format이 없으면 counts/bits 키로 판단)"""
+    mask_format = encoded.get("format") or ("rle" if "counts" in encoded else "bits")
+    if mask_format == "rle":
+        return decode_rle(encoded)
+    if mask_format == "bits":
+        return decode_bits(encoded)
+    raise MaskCodecError("지원하지 않는 마스크 형식입니다", {"format": mask_format})
+
+def save_mask_file(mask: np.ndarray, path: Union[str, Path]) -> Path:
+    """
+    마스크를 확장자에 맞는 압축 형식으로 저장
+
+    .rle.json: COCO RLE JSON (경계가 단순한 마스크에 유리)
+    .bits.npz: 비트 패킹 후 zlib 압축한 배열
+    """
+    path = Path(path)
+    mask = np.asarray(mask, dtype=bool)
+    if path.name.endswith(RLE_SUFFIX):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(encode_rle(mask), f)
+    elif path.name.endswith(BITS_SUFFIX):
+        np.savez_compressed(path, shape=np.asarray(mask.shape), bits=np.packbits(mask, axis=None))
+    else:
+        raise MaskCodecError("지원하지 않는 마스크 파일 확장자입니다",
+                             {"path": str(path), "supported": [RLE_SUFFIX, BITS_SUFFIX]})
+    return path
+
+def load_mask_file(path: Union[str, Path]) -> np.ndarray:
+    """save_mask_file로 저장한 마스크 (또는 기존 .npy/.png 마스크) 로드"""
+    path = Path(path)
+    if path.name.endswith(RLE_SUFFIX):
+        with open(path, encoding="utf-8") as f:
+            return decode_rle(json.load(f))
+    if path.name.endswith(BITS_SUFFIX):
+        with np.load(path) as data:
+            height, width = data["shape"]
+            return np.unpackbits(data["bits"], count=int(height * width)).reshape(height, width).astype(bool)
+    if path.suffix == ".npy":
+        return np.load(path).astype(bool)
+    if path.suffix == ".png":
+        from PIL import Image
+        return np.asarray(Image.open(path).convert("L")) > 127
+    raise MaskCodecError("지원하지 않는 마스크 파일 확장자입니다", {"path": str(path)})
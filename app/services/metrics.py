@@ -0,0 +1,117 @@
+# app/services/metrics.py
+# 추론 파이프라인 성능 지표(카운터, 히스토그램) 수집 모듈
+
+import threading
+import bisect
+from typing import Callable, Dict, List, Optional, Sequence, Any
+
+# 기본 히스토그램 구간 (밀리초 단위 지연 시간용)
+DEFAULT_LATENCY_BUCKETS_MS: Sequence[float] = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000
+)
+
+class Counter:
+    """단조 증가하는 카운터"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        """카운터 값 증가"""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> int:
+        return self._value
+
+class Histogram:
+    """누적 구간(bucket) 방식의 히스토그램"""
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.name = name
+        self.buckets: List[float] = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """관측값 기록"""
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 히스토그램 상태를 딕셔너리로 반환"""
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = cumulative + self._counts[-1]
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 3),
+                "avg": round(self._sum / self._count, 3) if self._count else 0.0,
+                "buckets": buckets,
+            }
+
+class MetricsRegistry:
+    """서비스 전반의 지표를 이름으로 관리하는 레지스트리"""
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._collectors: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        """이름에 해당하는 카운터 반환 (없으면 생성)"""
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter(name)
+            return self._counters[name]
+
+    def histogram(self, name: str, buckets: Optional[Sequence[float]] = None) -> Histogram:
+        """이름에 해당하는 히스토그램 반환 (없으면 생성)"""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, buckets or DEFAULT_LATENCY_BUCKETS_MS)
+            return self._histograms[name]
+
+    def register_collector(self, name: str, collector: Callable[[], Any]) -> None:
+        """스냅샷 시점에 값을 계산하는 수집 함수 등록"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        """전체 지표 스냅샷 반환"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+            collectors = dict(self._collectors)
+
+        collected = {}
+        for name, collector in collectors.items():
+            try:
+                collected[name] = collector()
+            except Exception as e:
+                collected[name] = {"error": str(e)}
+
+        return {
+            "counters": {name: c.snapshot() for name, c in counters.items()},
+            "histograms": {name: h.snapshot() for name, h in histograms.items()},
+            "collectors": collected,
+        }
+
+# 전역 인스턴스 생성
+metrics = MetricsRegistry()
@@ -0,0 +1,87 @@
+# app/services/mmap_weights.py
+# 모델 가중치를 메모리 매핑 가능한 체크포인트로 변환하고, 복사 없이 매핑한 텐서를 모델에 연결
+
+import os
+import logging
+import warnings
+from pathlib import Path
+from typing import Dict, Optional
+import torch
+import clip
+from clip.model import build_model
+from mobile_sam import sam_model_registry
+from app.config import MODEL_WEIGHTS_DIR
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 변환된 체크포인트 파일 (scripts/convert_weights.py로 생성)
+SAM_MMAP_WEIGHTS = MODEL_WEIGHTS_DIR / "mobile_sam_vit_t.mmap.pt"
+CLIP_MMAP_WEIGHTS = MODEL_WEIGHTS_DIR / "clip_vit_b32.mmap.pt"
+
+def save_mmap_checkpoint(module: torch.nn.Module, path: Path, model_name: str) -> Path:
+    """
+    모듈 가중치를 fp32 연속 텐서로 저장 (torch.load(mmap=True)로 열 수 있는 zip 형식)
+
+    로드 후 dtype 변환이나 복사가 일어나면 페이지를 공유할 수 없으므로
+    CPU 추론에 쓰는 형태(fp32, contiguous) 그대로 저장합니다.
+    """
+    state_dict = {
+        name: tensor.detach().cpu().float().contiguous() if tensor.is_floating_point()
+        else tensor.detach().cpu().contiguous()
+        for name, tensor in module.state_dict().items()
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    torch.save({"model": model_name, "state_dict": state_dict}, tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved mmap checkpoint: {path} ({path.stat().st_size / 1024 ** 2:.1f}MB)")
+    return path
+
+def load_mmap_checkpoint(path: Path) -> Dict[str, torch.Tensor]:
+    """
+    체크포인트를 메모리 매핑으로 열어 state_dict 반환
+
+    텐서 저장소는 파일에 대한 copy-on-write 매핑이므로 같은 파일을 연 프로세스들은
+    쓰기 전까지 페이지 캐시의 물리 페이지를 공유하고, 실제로 읽는 페이지만 메모리에 올라갑니다.
+    """
+    checkpoint = torch.load(str(path), map_location="cpu", mmap=True, weights_only=True)
+    return checkpoint["state_dict"]
+
+def load_mobile_sam_mmap(path: Path = SAM_MMAP_WEIGHTS) -> torch.nn.Module:
+    """
+    MobileSAM(vit_t)을 만들고 매핑한 가중치를 그대로 연결 (load_state_dict(assign=True))
+
+    모델 구조에 persistent=False 버퍼가 있어 CPU에서 생성하지만, 모델이 작아 초기화 비용은 작고
+    초기화된 가중치는 연결 직후 해제됩니다.
+    """
+    model = sam_model_registry["vit_t"]()
+    model.load_state_dict(load_mmap_checkpoint(path), assign=True)
+    return model
+
+def load_clip_mmap(path: Path = CLIP_MMAP_WEIGHTS):
+    """
+    CLIP을 meta 장치에 만든 뒤 매핑한 가중치를 연결 (무작위 초기화와 fp32 변환 생략)
+
+    Returns:
+        Tuple: (CLIP 모델, 전처리 함수) - clip.load()와 같은 형식
+    """
+    state_dict = load_mmap_checkpoint(path)
+    # build_model 내부의 load_state_dict는 meta 파라미터에 대해 아무것도 복사하지 않음 (경고만 발생)
+    with torch.device("meta"), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model = build_model(dict(state_dict))
+    model.load_state_dict(state_dict, assign=True)
+
+    # 텍스트 인코더의 인과 마스크는 버퍼가 아닌 속성이라 meta로 남아 있으므로 다시 생성
+    attn_mask = model.build_attention_mask()
+    for block in model.transformer.resblocks:
+        block.attn_mask = attn_mask
+    return model, clip.clip._transform(model.visual.input_resolution)
+
+def find_meta_tensor(module: torch.nn.Module) -> Optional[str]:
+    """가중치가 연결되지 않은 (meta) 파라미터/버퍼 이름 (없으면 None)"""
+    for name, tensor in list(module.named_parameters()) + list(module.named_buffers()):
+        if tensor.is_meta:
+            return name
+    return None
@@ -1,68 +1,185 @@
 # app/services/model.py
-import torch
+import time
+import queue
+import threading
 import numpy as np
-from mobile_sam import SamPredictor, sam_model_registry
-from torchvision.transforms import ToTensor
-from PIL import Image
-import io
+import torch
+from contextlib import contextmanager
+from dataclasses import dataclass
+from mobile_sam import SamPredictor
+from typing import Iterator, Optional, Sequence, Tuple, Union
 import logging
-from pathlib import Path
+from app.config import SAM_PREDICTOR_POOL_SIZE
+from app.services.metrics import metrics
+from app.services.model_registry import model_registry
+from app.services.inference_backend import BackendError
+from app.services.sam_service import sam_service
+from app.services.image_ingest import DecodedImage, decode_image
+from app.services.mask_codec import encode_mask
+from app.services.prompt_points import candidate_points, select_best_mask
 
 # 로거 설정
 logger = logging.getLogger(__name__)
 
-# 모델 경로 설정
-MODEL_PATH = Path(__file__).parent.parent.parent / 'external' / 'MobileSAM' / 'weights' / 'mobile_sam.pt'
-
-# 장치 설정
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-logger.info(f"Using device: {DEVICE}")
-
-# 모델 로드 (global 변수로)
-try:
-    sam = sam_model_registry["vit_t"](checkpoint=str(MODEL_PATH))
-    sam.to(device=DEVICE)
-    sam.eval()
-    predictor = SamPredictor(sam)
-    logger.info("Successfully loaded Mobile SAM model")
-except Exception as e:
-    logger.error(f"Failed to load Mobile SAM model: {str(e)}")
-    raise
-
-def segment_animal(image_bytes):
+@dataclass(frozen=True)
+class EmbeddingHandle:
+    """
+    이미지 한 장의 SAM 임베딩과 좌표 변환 정보
+
+    SamPredictor가 set_image 후 객체에 보관하던 이미지별 상태를 요청 쪽이 들고 다니므로,
+    여러 요청이 프리딕터를 번갈아 써도 서로의 임베딩을 덮어쓰지 않습니다.
+    """
+    features: torch.Tensor           # (1, 256, 64, 64) 이미지 임베딩
+    original_size: Tuple[int, int]   # 임베딩한 배열 크기 (H, W)
+    input_size: Tuple[int, int]      # 긴 변 1024로 줄인 모델 입력 크기 (H, W)
+
+class PredictorPool:
+    """
+    공유 MobileSAM 모델로 만든 SamPredictor 컨텍스트 풀
+
+    프리딕터는 가중치를 공유하는 가벼운 객체이므로 추론 스레드 수만큼 만들어 두고,
+    요청은 풀에서 하나를 빌려 핸들의 상태를 연결한 뒤 사용하고 돌려줍니다.
+    세그멘테이션 경로와 같은 모델(sam_service.backend.sam_model_name)을 쓰며,
+    SamPredictor는 PyTorch 모듈이 필요하므로 torch 백엔드에서만 사용할 수 있습니다.
     """
-    이미지 바이트 데이터에서 동물을 세그멘테이션합니다.
+
+    def __init__(self, size: int = SAM_PREDICTOR_POOL_SIZE):
+        self.size = max(1, size)
+        self._pool: "queue.Queue[SamPredictor]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+        # 지표 등록
+        self.wait_time_hist = metrics.histogram("sam_predictor_pool.wait_ms")
+        metrics.register_collector("sam_predictor_pool", self.stats)
+
+    @contextmanager
+    def acquire(self, handle: Optional[EmbeddingHandle] = None) -> Iterator[SamPredictor]:
+        """
+        프리딕터를 빌려 사용 (handle이 있으면 그 임베딩을 연결하고, 반환 시 상태를 초기화)
+        """
+        started = time.perf_counter()
+        predictor = self._get()
+        self.wait_time_hist.observe((time.perf_counter() - started) * 1000)
+        try:
+            if handle is not None:
+                predictor.features = handle.features
+                predictor.original_size = handle.original_size
+                predictor.input_size = handle.input_size
+                predictor.is_image_set = True
+            yield predictor
+        finally:
+            predictor.reset_image()
+            self._pool.put(predictor)
+
+    def _get(self) -> SamPredictor:
+        """남은 프리딕터가 없으면 최대 size개까지 만들고, 그 이상은 반환될 때까지 대기"""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        backend = sam_service.backend
+        if backend.name != "torch":
+            raise BackendError("SamPredictor는 torch 백엔드에서만 사용할 수 있습니다", {"backend": backend.name})
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                logger.info(f"Creating SAM predictor {self._created}/{self.size} from {backend.sam_model_name}")
+                return SamPredictor(model_registry.get(backend.sam_model_name))
+        return self._pool.get()
+
+    def stats(self) -> dict:
+        """현재 풀 상태 반환"""
+        return {"size": self.size, "created": self._created, "idle": self._pool.qsize()}
+
+# 전역 프리딕터 풀
+predictor_pool = PredictorPool()
+
+def embed_image(image: Union[bytes, DecodedImage]) -> EmbeddingHandle:
+    """
+    이미지를 인코딩해 프리딕터와 분리된 임베딩 핸들 반환
+
+    Args:
+        image: 이미지 바이트 데이터 또는 이미 디코딩된 이미지
+
+    Returns:
+        EmbeddingHandle: predict_best_mask에 넘길 임베딩 핸들
+    """
+    if not isinstance(image, DecodedImage):
+        image = decode_image(image)
+    with predictor_pool.acquire() as predictor, sam_service.backend.autocast():
+        predictor.set_image(image.array)
+        # bf16 autocast에서도 임베딩은 백엔드 출력처럼 fp32로 보관
+        return EmbeddingHandle(predictor.features.float(), predictor.original_size, predictor.input_size)
+
+def predict_best_mask(handle: EmbeddingHandle, points: Sequence[Tuple[float, float]],
+                      multimask_output: bool = True) -> Tuple[np.ndarray, float, int]:
+    """
+    임베딩 핸들과 점 목록으로 마스크 디코딩 후 예측 IoU가 가장 높은 마스크 하나만 원본 크기로 복원
+
+    점마다 독립 프롬프트로 한 번의 배치 디코딩을 하고, 후보 선택은 저해상도 로짓과 예측 IoU로 합니다.
+    (predict_torch처럼 P x K개 후보를 모두 배열 크기로 업샘플하지 않으므로 점 수가 늘어도 후처리 비용이 같습니다.)
+
+    Args:
+        handle: embed_image가 반환한 임베딩 핸들
+        points: 임베딩한 배열 좌표계의 점 [(x, y), ...]
+        multimask_output: 점마다 후보 마스크 3개를 디코딩할지 여부
+
+    Returns:
+        Tuple[np.ndarray, float, int]: (배열 크기의 bool 마스크 (H, W), 예측 IoU, 선택된 점 인덱스)
+    """
+    with predictor_pool.acquire(handle) as predictor:
+        model = predictor.model
+        coords = predictor.transform.apply_coords(np.array(points, dtype=np.float32), handle.original_size)
+        coords = torch.as_tensor(coords, dtype=torch.float, device=predictor.device)[:, None]
+        labels = torch.ones(coords.shape[:2], dtype=torch.int, device=predictor.device)
+        with torch.no_grad(), sam_service.backend.autocast():
+            sparse_embeddings, dense_embeddings = model.prompt_encoder(points=(coords, labels), boxes=None, masks=None)
+            low_res_masks, iou_predictions = model.mask_decoder(
+                image_embeddings=handle.features,
+                image_pe=model.prompt_encoder.get_dense_pe(),
+                sparse_prompt_embeddings=sparse_embeddings,
+                dense_prompt_embeddings=dense_embeddings,
+                multimask_output=multimask_output,
+            )
+            low_res_masks, iou_predictions = low_res_masks.float(), iou_predictions.float()
+
+            # 저해상도 마스크 중 1024 정사각형 패딩을 뺀 실제 이미지 영역만으로 면적 비율 계산
+            valid_h, valid_w = (int(np.ceil(side / 4)) for side in handle.input_size)
+            candidates = (low_res_masks[..., :valid_h, :valid_w] > model.mask_threshold).cpu().numpy()
+            scores = iou_predictions.cpu().numpy()
+            point_idx, mask_idx = select_best_mask(candidates, scores)
+
+            best = model.postprocess_masks(
+                low_res_masks[point_idx, mask_idx][None, None], handle.input_size, handle.original_size
+            )[0, 0] > model.mask_threshold
+    return best.cpu().numpy(), float(scores[point_idx, mask_idx]), point_idx
+
+def segment_animal(image: Union[bytes, DecodedImage], mask_format: Optional[str] = None):
+    """
+    이미지에서 동물을 세그멘테이션합니다.
+    
+    프리딕터에 이미지별 상태를 남기지 않으므로 여러 추론 스레드에서 동시에 호출할 수 있습니다.
     
     Args:
-        image_bytes: 이미지 바이트 데이터
+        image: 이미지 바이트 데이터 또는 이미 디코딩된 이미지
+        mask_format: 결과에 마스크를 포함할 인코딩 ("rle" 또는 "bits", 기본값: 포함하지 않음)
         
     Returns:
-        dict: 세그멘테이션 결과 정보
+        dict: 세그멘테이션 결과 정보 (box, mask_area, image_size는 원본 이미지 기준,
+            mask는 디코딩된 이미지 크기인 mask_shape 기준)
     """
     try:
-        # 이미지 로드 및 변환
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-        image_array = np.array(image)
-        
-        # 이미지 설정
-        predictor.set_image(image_array)
+        # 이미지 로드 및 변환 (이미 디코딩된 경우 재사용)
+        if not isinstance(image, DecodedImage):
+            image = decode_image(image)
+        h, w = image.array.shape[:2]
         
-        # 이미지 중앙에 포인트 설정 (기본 위치)
-        h, w = image_array.shape[:2]
-        input_point = np.array([[w // 2, h // 2]])
-        input_label = np.array([1])  # 1은 foreground
+        # 이미지 인코딩 (임베딩은 핸들로 받아 프리딕터와 분리)
+        handle = embed_image(image)
         
-        # 세그멘테이션 수행
-        masks, scores, _ = predictor.predict(
-            point_coords=input_point,
-            point_labels=input_label,
-            multimask_output=True,
-        )
-        
-        # 최고 점수의 마스크 선택
-        best_mask_idx = np.argmax(scores)
-        best_mask = masks[best_mask_idx]
-        best_score = float(scores[best_mask_idx])
+        # 후보 포인트(기본값: 이미지 중앙 한 점)를 배치 디코딩 후 예측 IoU가 가장 높은 마스크 선택
+        best_mask, best_score, _ = predict_best_mask(handle, candidate_points(image.image))
         
         # 마스크 영역에서 바운딩 박스 계산
         y_indices, x_indices = np.where(best_mask)
@@ -73,15 +190,26 @@ def segment_animal(image_bytes):
         else:
             box = [0, 0, w, h]  # 마스크가 없으면 전체 이미지 사용
         
+        # 축소 디코딩된 좌표를 원본 이미지 좌표로 변환
+        scale_x, scale_y = image.scale
+        box = [
+            int(round(box[0] * scale_x)), int(round(box[1] * scale_y)),
+            int(round(box[2] * scale_x)), int(round(box[3] * scale_y))
+        ]
+        original_w, original_h = image.original_size
+        
         logger.info(f"Segmentation completed with score: {best_score:.4f}")
         
-        return {
+        result = {
             "mask_shape": best_mask.shape,
-            "mask_area": int(np.sum(best_mask)),
+            "mask_area": int(round(np.sum(best_mask) * scale_x * scale_y)),
             "score": best_score,
             "box": box,
-            "image_size": (h, w)
+            "image_size": (original_h, original_w)
         }
+        if mask_format:
+            result["mask"] = encode_mask(best_mask, mask_format)
+        return result
     
     except Exception as e:
         logger.error(f"Segmentation failed: {str(e)}")
@@ -0,0 +1,192 @@
+# app/services/model_registry.py
+# 모델을 프로세스당 한 번만 로드하여 여러 서비스가 같은 인스턴스를 공유하도록 관리하는 레지스트리
+
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+import torch
+import clip
+from mobile_sam import sam_model_registry
+from app.config import MOBILE_SAM_WEIGHTS, MODEL_MMAP_WEIGHTS
+from app.services.mmap_weights import (
+    SAM_MMAP_WEIGHTS, CLIP_MMAP_WEIGHTS, load_mobile_sam_mmap, load_clip_mmap, find_meta_tensor
+)
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 장치 설정
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+@dataclass
+class ModelLoadError(Exception):
+    """모델 로드 과정에서 발생하는 예외를 처리하는 클래스"""
+    message: str
+    details: Optional[dict] = None
+
+@dataclass
+class LoadedModel:
+    """로드된 모델과 로드 정보"""
+    name: str
+    model: Any
+    load_time_sec: float
+    memory_bytes: int
+
+def _module_memory_bytes(module: torch.nn.Module) -> int:
+    """
+    모듈의 가중치와 버퍼가 차지하는 메모리 크기 계산
+
+    동적 양자화된 Linear는 가중치를 parameters()가 아닌 packed params로 보관하므로
+    state_dict 기준으로 셉니다.
+    """
+    total = 0
+    for value in module.state_dict().values():
+        tensors = value if isinstance(value, (tuple, list)) else (value,)
+        total += sum(t.numel() * t.element_size() for t in tensors if isinstance(t, torch.Tensor))
+    return total
+
+class ModelRegistry:
+    """
+    이름으로 모델 로더를 등록하고, 처음 사용할 때(또는 warmup 시) 한 번만 로드하는 레지스트리
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, LoadedModel] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """
+        모델 로더 등록
+
+        Args:
+            name: 모델 이름
+            loader: 인자 없이 호출되어 모델(또는 모델을 포함한 튜플)을 반환하는 함수
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        """
+        모델 인스턴스 반환 (로드되지 않았다면 로드)
+
+        Args:
+            name: 모델 이름
+
+        Returns:
+            Any: 로더가 반환한 모델 객체
+
+        Raises:
+            ModelLoadError: 등록되지 않았거나 로드에 실패한 경우
+        """
+        loaded = self._models.get(name)
+        if loaded is not None:
+            return loaded.model
+
+        if name not in self._loaders:
+            raise ModelLoadError("등록되지 않은 모델입니다", {"name": name})
+
+        # 같은 모델을 동시에 두 번 로드하지 않도록 모델별 잠금 사용
+        with self._locks[name]:
+            loaded = self._models.get(name)
+            if loaded is not None:
+                return loaded.model
+
+            try:
+                started = time.perf_counter()
+                model = self._loaders[name]()
+                load_time = time.perf_counter() - started
+            except Exception as e:
+                logger.error(f"Failed to load model {name}: {str(e)}")
+                raise ModelLoadError("모델 로드 실패", {"name": name, "error": str(e)})
+
+            module = model[0] if isinstance(model, tuple) else model
+            memory = _module_memory_bytes(module) if isinstance(module, torch.nn.Module) else 0
+            self._models[name] = LoadedModel(name, model, load_time, memory)
+            logger.info(f"Model loaded: {name} ({load_time:.2f}s, {memory / 1024 ** 2:.1f}MB)")
+            return model
+
+    def warmup(self, names: Optional[List[str]] = None) -> None:
+        """
+        등록된 모델을 미리 로드
+
+        Args:
+            names: 로드할 모델 이름 목록 (기본값: 등록된 전체 모델)
+        """
+        for name in names or list(self._loaders):
+            self.get(name)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """모델별 로드 여부, 로드 시간, 메모리 사용량 반환"""
+        result = {}
+        for name in self._loaders:
+            loaded = self._models.get(name)
+            result[name] = {
+                "loaded": loaded is not None,
+                "load_time_sec": round(loaded.load_time_sec, 3) if loaded else None,
+                "memory_mb": round(loaded.memory_bytes / 1024 ** 2, 2) if loaded else None,
+            }
+        return result
+
+def _check_assigned(module: torch.nn.Module, path) -> None:
+    """매핑한 체크포인트에 빠진 가중치가 없는지 확인"""
+    missing = find_meta_tensor(module)
+    if missing is not None:
+        raise ModelLoadError("메모리 매핑 체크포인트에 없는 가중치가 있습니다", {"path": str(path), "tensor": missing})
+
+def _load_mobile_sam() -> torch.nn.Module:
+    """MobileSAM(vit_t) 모델 로드 (변환된 mmap 체크포인트가 있으면 복사 없이 매핑)"""
+    if MODEL_MMAP_WEIGHTS and SAM_MMAP_WEIGHTS.exists():
+        model = load_mobile_sam_mmap(SAM_MMAP_WEIGHTS)
+        _check_assigned(model, SAM_MMAP_WEIGHTS)
+    else:
+        if not MOBILE_SAM_WEIGHTS.exists():
+            raise FileNotFoundError(f"모델 가중치를 찾을 수 없습니다: {MOBILE_SAM_WEIGHTS}")
+        model = sam_model_registry["vit_t"](checkpoint=str(MOBILE_SAM_WEIGHTS))
+    model.to(device=DEVICE)
+    model.eval()
+    return model
+
+def _load_clip():
+    """CLIP ViT-B/32 모델과 전처리 함수 로드 (변환된 mmap 체크포인트가 있으면 복사 없이 매핑)"""
+    if MODEL_MMAP_WEIGHTS and CLIP_MMAP_WEIGHTS.exists():
+        model, preprocess = load_clip_mmap(CLIP_MMAP_WEIGHTS)
+        _check_assigned(model, CLIP_MMAP_WEIGHTS)
+        model.to(device=DEVICE)
+    else:
+        model, preprocess = clip.load("ViT-B/32", device=DEVICE)
+    model.eval()
+    return model, preprocess
+
+def _quantized_int8(loader: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Linear 레이어를 동적 int8 양자화한 모델 로더 생성
+
+    양자화 커널은 CPU 전용이므로 fp32로 CPU에 올린 뒤 변환합니다.
+    원본 모델과 별도 인스턴스이므로 fp32 모델은 필요할 때만 따로 로드됩니다.
+    """
+    def load():
+        loaded = loader()
+        module = loaded[0] if isinstance(loaded, tuple) else loaded
+        quantized = torch.ao.quantization.quantize_dynamic(
+            module.cpu().float(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+        quantized.eval()
+        return (quantized,) + loaded[1:] if isinstance(loaded, tuple) else quantized
+    return load
+
+# 전역 인스턴스 생성 및 기본 모델 등록
+model_registry = ModelRegistry()
+model_registry.register("mobile_sam", _load_mobile_sam)
+model_registry.register("clip", _load_clip)
+model_registry.register("mobile_sam_int8", _quantized_int8(_load_mobile_sam))
+model_registry.register("clip_int8", _quantized_int8(_load_clip))
+metrics.register_collector("models", model_registry.stats)
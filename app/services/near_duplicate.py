@@ -0,0 +1,198 @@
+# app/services/near_duplicate.py
+# 지각 해시 BK-tree로 크기 조정/재압축/회전된 같은 사진을 찾아 이전 분석 결과를 재사용하는 근사 중복 인덱스
+
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import (
+    NEAR_DUP_INDEX_SIZE, NEAR_DUP_MAX_DISTANCE, NEAR_DUP_VERIFY_RATE, RESULT_CACHE_TTL_SEC
+)
+from app.services.image_hashing import hamming_distance
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+class BKTree:
+    """
+    해밍 거리 기준 BK-tree
+
+    각 노드의 자식은 부모와의 거리로 구분되므로, 삼각 부등식에 따라
+    |d - 거리| <= 임계값인 자식만 내려가 전체 항목의 일부만 비교합니다.
+    """
+
+    def __init__(self):
+        self._root: Optional[Tuple[int, Dict[int, Any]]] = None
+        self.size = 0
+
+    def add(self, value: int) -> None:
+        """해시 추가 (이미 있으면 무시)"""
+        if self._root is None:
+            self._root = (value, {})
+            self.size = 1
+            return
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (value, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        거리 max_distance 이내의 해시 검색
+
+        Returns:
+            List[Tuple[int, int]]: [(거리, 해시), ...] 거리 오름차순
+        """
+        if self._root is None:
+            return []
+        matches = []
+        stack = [self._root]
+        while stack:
+            node_value, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= max_distance:
+                matches.append((distance, node_value))
+            for child_distance in range(max(1, distance - max_distance), distance + max_distance + 1):
+                child = children.get(child_distance)
+                if child is not None:
+                    stack.append(child)
+        matches.sort()
+        return matches
+
+class NearDuplicateIndex:
+    """
+    지각 해시 -> 분석 결과 인덱스
+
+    항목은 ttl_seconds 동안 유효하고, max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    BK-tree는 항목 제거를 지원하지 않으므로 제거된 해시는 조회 시 건너뛰고,
+    죽은 노드가 살아 있는 항목 수만큼 쌓이면 트리를 다시 만듭니다.
+    """
+
+    def __init__(self, max_entries: int = NEAR_DUP_INDEX_SIZE,
+                 max_distance: int = NEAR_DUP_MAX_DISTANCE,
+                 verify_rate: float = NEAR_DUP_VERIFY_RATE,
+                 ttl_seconds: float = RESULT_CACHE_TTL_SEC,
+                 name: str = "near_duplicate"):
+        """
+        인덱스 초기화
+
+        Args:
+            max_entries: 최대 항목 수 (0이면 비활성화)
+            max_distance: 같은 사진으로 볼 최대 해밍 거리 (64비트 해시 기준)
+            verify_rate: 적중 중 실제로 다시 분석해 결과 일치 여부를 확인할 비율 (적중 품질 지표)
+            ttl_seconds: 항목 유효 시간 (초)
+            name: 지표 이름 접두어
+        """
+        self.max_entries = max(0, max_entries)
+        self.max_distance = max_distance
+        self.verify_rate = verify_rate
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Any]]" = OrderedDict()
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+
+        # 지표 등록
+        self.hits = metrics.counter(f"{name}.hits")
+        self.misses = metrics.counter(f"{name}.misses")
+        self.verified = metrics.counter(f"{name}.verified")
+        self.verified_agree = metrics.counter(f"{name}.verified_agree")
+        self.lookup_time_hist = metrics.histogram(f"{name}.lookup_ms")
+        self.distance_hist = metrics.histogram(f"{name}.hit_distance")
+        metrics.register_collector(name, self.stats)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _rebuild_locked(self) -> None:
+        """살아 있는 항목만으로 BK-tree 재생성"""
+        self._tree = BKTree()
+        for value in self._entries:
+            self._tree.add(value)
+
+    def lookup(self, value: int) -> Optional[Tuple[Any, int]]:
+        """
+        가장 가까운 유효 항목 조회
+
+        Args:
+            value: 지각 해시
+
+        Returns:
+            Optional[Tuple[Any, int]]: (저장된 결과, 해밍 거리), 없으면 None
+        """
+        if not self.enabled:
+            return None
+        started = time.perf_counter()
+        found = None
+        with self._lock:
+            now = time.monotonic()
+            for distance, match in self._tree.search(value, self.max_distance):
+                entry = self._entries.get(match)
+                if entry is None:
+                    continue  # 제거된 항목
+                if now > entry[0]:
+                    del self._entries[match]
+                    continue
+                self._entries.move_to_end(match)
+                found = (entry[1], distance)
+                break
+        self.lookup_time_hist.observe((time.perf_counter() - started) * 1000)
+
+        if found is None:
+            self.misses.inc()
+            return None
+        self.hits.inc()
+        self.distance_hist.observe(found[1])
+        return found
+
+    def add(self, value: int, result: Any) -> None:
+        """분석 결과 저장 (항목 수 초과 시 LRU 항목 제거)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries.pop(value, None)
+            self._entries[value] = (time.monotonic() + self.ttl_seconds, result)
+            self._tree.add(value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._tree.size > 2 * len(self._entries):
+                self._rebuild_locked()
+
+    def should_verify(self) -> bool:
+        """이번 적중을 다시 분석해 품질을 확인할지 여부 (verify_rate 비율로 표본 추출)"""
+        return self.verify_rate > 0 and random.random() < self.verify_rate
+
+    def record_verification(self, agree: bool) -> None:
+        """표본 재분석 결과가 적중 결과와 같은 클래스였는지 기록"""
+        self.verified.inc()
+        if agree:
+            self.verified_agree.inc()
+
+    def stats(self) -> Dict[str, Any]:
+        """인덱스 상태 반환"""
+        hits, misses = self.hits.value, self.misses.value
+        verified = self.verified.value
+        return {
+            "entries": len(self._entries),
+            "tree_nodes": self._tree.size,
+            "max_entries": self.max_entries,
+            "max_distance": self.max_distance,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "verified": verified,
+            "hit_precision": round(self.verified_agree.value / verified, 4) if verified else None,
+        }
+
+# 전역 인스턴스 생성
+near_duplicate_index = NearDuplicateIndex()
@@ -0,0 +1,409 @@
+# app/services/process_pool.py
+# 모델을 각자 로드한 추론 워커 프로세스 풀 (이미지와 마스크는 multiprocessing.shared_memory로 전달)
+
+import os
+import time
+import queue
+import asyncio
+import itertools
+import logging
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+import numpy as np
+from PIL import Image
+from app.config import (
+    INFERENCE_PROCESSES, INFERENCE_PROCESS_THREADS, INFERENCE_PROCESS_BATCH,
+    INFERENCE_PROCESS_TIMEOUT_SEC, INFERENCE_MAX_QUEUE, INFERENCE_BACKEND, INFERENCE_PRECISION
+)
+from app.services.image_ingest import DecodedImage
+from app.services.inference_executor import InferenceQueueFullError
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 공유 메모리 블록 뒤쪽에 워커가 기록하는 저해상도 마스크 영역 (256x256 uint8)
+MASK_SIDE = 256
+MASK_BYTES = MASK_SIDE * MASK_SIDE
+
+# 워커 생존 확인 간격 (초)과 워커별 최대 재시작 횟수
+WORKER_CHECK_SEC = 1.0
+MAX_WORKER_RESTARTS = 3
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """웹 프로세스가 만든 공유 메모리 블록 열기 (정리는 생성한 쪽에서 담당)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    """공유 메모리 블록 닫고 삭제"""
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+def _worker_main(worker_id: int, tasks, results, backend: str, precision: str,
+                 threads: int, max_batch: int) -> None:
+    """
+    워커 프로세스 본체: 모델 로드/예열 후 대기열의 이미지를 배치로 분석
+
+    작업은 (task_id, 공유 메모리 이름, (H, W), 원본 크기, 내용 해시)이며, 픽셀은 공유 메모리에서 읽고
+    마스크는 같은 블록의 픽셀 뒤쪽에 기록한 뒤 분류 결과만 결과 대기열로 보냅니다.
+    """
+    # 모델 관련 모듈은 워커에서만 import (웹 프로세스의 전역 서비스를 만들지 않음)
+    import torch
+    from app.services.sam_service import SamService
+    from app.services.classifier_service import AnimalClassifier
+    from app.services.batch_analysis import analyze_batch
+    from app.services.feature_store import feature_store
+
+    torch.set_num_threads(threads)
+    try:
+        sam = SamService(backend=backend, precision=precision)
+        classifier = AnimalClassifier(backend=backend, precision=precision)
+        warm = Image.fromarray(np.random.default_rng(worker_id).integers(0, 256, (480, 640, 3), dtype=np.uint8))
+        analyze_batch(sam, classifier, [DecodedImage(warm, warm.size)])
+    except Exception as e:
+        results.put(("failed", worker_id, str(e)))
+        return
+    results.put(("ready", worker_id, os.getpid()))
+
+    stopping = False
+    while not stopping:
+        batch = [tasks.get()]
+        if batch[0] is None:
+            break
+        while len(batch) < max_batch:
+            try:
+                task = tasks.get_nowait()
+            except queue.Empty:
+                break
+            if task is None:
+                stopping = True
+                break
+            batch.append(task)
+
+        # 꺼낸 작업을 바로 알림 (공유 메모리 연결/복사 중에 워커가 죽어도 웹 프로세스가 해당 작업을 바로 실패 처리)
+        results.put(("taken", worker_id, [task[0] for task in batch]))
+
+        handles, images = [], []
+        for task_id, name, shape, original_size, content_hash in batch:
+            try:
+                shm = _attach(name)
+            except FileNotFoundError:
+                # 웹 프로세스에서 시간 초과로 이미 정리된 작업 (처리 중 목록에서만 제거되도록 완료 알림)
+                results.put(("result", worker_id, task_id, None, 0.0, "task expired"))
+                continue
+            offset = shape[0] * shape[1] * 3
+            # 워커 메모리로 한 번 복사해 두어야 분석 중에도 블록을 닫을 수 있음
+            pixels = np.frombuffer(shm.buf, dtype=np.uint8, count=offset).reshape(shape[0], shape[1], 3).copy()
+            handles.append((task_id, shm, offset))
+            images.append(DecodedImage(Image.fromarray(pixels), tuple(original_size), content_hash))
+        if not handles:
+            continue
+
+        try:
+            outputs = analyze_batch(sam, classifier, images, feature_store)
+        except Exception as e:
+            for task_id, shm, _ in handles:
+                shm.close()
+                results.put(("result", worker_id, task_id, None, 0.0, str(e)))
+            continue
+
+        for (task_id, shm, offset), (result, mask, score) in zip(handles, outputs):
+            shm.buf[offset:offset + MASK_BYTES] = np.ascontiguousarray(mask, dtype=np.uint8).tobytes()
+            shm.close()
+            results.put(("result", worker_id, task_id, result, score, None))
+
+class ProcessInferencePool:
+    """
+    세그멘테이션 + 분류를 별도 프로세스에서 실행하는 추론 워커 풀
+
+    전처리/후처리가 GIL에 묶이지 않도록 워커마다 모델을 따로 로드하고 torch 연산 스레드 수를
+    고정합니다. 디코딩된 픽셀과 결과 마스크는 작업마다 만든 공유 메모리 블록으로 주고받아
+    피클 직렬화 없이 전달하며, 대기열에는 블록 이름과 크기만 들어갑니다.
+
+    준비를 마친 뒤 죽은 워커(세그폴트, OOM 종료 등)는 결과 수신 스레드가 감지해 처리 중이던 작업을
+    바로 실패시키고 MAX_WORKER_RESTARTS번까지 다시 띄웁니다. 준비된 워커가 하나도 없는 동안에는
+    running이 False가 되어 분석 파이프라인이 웹 프로세스 안의 경로를 사용합니다.
+    """
+
+    def __init__(self, workers: int = INFERENCE_PROCESSES,
+                 threads: int = INFERENCE_PROCESS_THREADS,
+                 max_batch: int = INFERENCE_PROCESS_BATCH,
+                 max_queue: int = INFERENCE_MAX_QUEUE,
+                 timeout: float = INFERENCE_PROCESS_TIMEOUT_SEC,
+                 backend: str = INFERENCE_BACKEND,
+                 precision: str = INFERENCE_PRECISION):
+        """
+        풀 초기화 (프로세스는 start()에서 시작)
+
+        Args:
+            workers: 워커 프로세스 수
+            threads: 워커당 torch 연산 스레드 수 (0이면 CPU 코어 수 / 워커 수)
+            max_batch: 워커가 한 번에 처리할 최대 이미지 수
+            max_queue: 실행 중인 작업 외에 대기할 수 있는 최대 작업 수
+            timeout: 작업당 최대 대기 시간 (초)
+            backend: 추론 백엔드 이름
+            precision: 추론 정밀도
+        """
+        self.workers = max(0, workers)
+        self.threads = threads if threads > 0 else max(1, (os.cpu_count() or 1) // max(1, self.workers))
+        self.max_batch = max(1, max_batch)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.backend = backend
+        self.precision = precision
+        self.error: Optional[str] = None
+
+        self._processes: list = []
+        self._context = None
+        self._stopping = False
+        self._tasks = None
+        self._results = None
+        self._listener: Optional[threading.Thread] = None
+        self._pending: Dict[int, Tuple[asyncio.Future, asyncio.AbstractEventLoop, shared_memory.SharedMemory, int]] = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._ready_workers: set = set()
+        self._assigned: Dict[int, set] = {}
+        self._restarts: Dict[int, int] = {}
+
+        # 지표 등록
+        self.rejected = metrics.counter("process_pool.rejected")
+        self.timeouts = metrics.counter("process_pool.timeouts")
+        self.worker_deaths = metrics.counter("process_pool.worker_deaths")
+        self.run_time_hist = metrics.histogram("process_pool.run_ms")
+        metrics.register_collector("process_pool", self.stats)
+
+    @property
+    def capacity(self) -> int:
+        """동시에 받을 수 있는 최대 작업 수 (처리 중 + 대기)"""
+        return self.workers * self.max_batch + self.max_queue
+
+    @property
+    def running(self) -> bool:
+        """풀이 작업을 받을 수 있는지 여부 (시작 직후 예열 중이거나 준비된 워커가 하나 이상 있을 때)"""
+        if self._listener is None:
+            return False
+        return not self._ready.is_set() or bool(self._ready_workers)
+
+    def _spawn(self, worker_id: int):
+        """워커 프로세스 하나 시작"""
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self._tasks, self._results, self.backend, self.precision,
+                  self.threads, self.max_batch),
+            name=f"inference-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def start(self) -> None:
+        """워커 프로세스와 결과 수신 스레드 시작 (모델 로드는 워커에서 비동기로 진행)"""
+        if self.running or self.workers == 0:
+            return
+        # torch 스레드 풀이 이미 초기화된 프로세스를 fork하면 교착될 수 있어 spawn 사용
+        self._context = mp.get_context("spawn")
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._stopping = False
+        self._processes = [self._spawn(worker_id) for worker_id in range(self.workers)]
+        self._listener = threading.Thread(target=self._listen, name="process-pool-results", daemon=True)
+        self._listener.start()
+        logger.info(f"ProcessInferencePool started {self.workers} workers x {self.threads} threads")
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """모든 워커가 모델 로드와 예열을 마칠 때까지 대기 (하나라도 실패하면 False)"""
+        self._ready.wait(timeout)
+        return len(self._ready_workers) == self.workers and self.error is None
+
+    def _listen(self) -> None:
+        """워커 결과를 받아 대기 중인 요청의 future에 전달하고, 주기적으로 워커 생존 확인"""
+        last_check = time.monotonic()
+        while True:
+            try:
+                message = self._results.get(timeout=WORKER_CHECK_SEC)
+            except queue.Empty:
+                message = ()
+            if message is None:
+                break
+            if time.monotonic() - last_check >= WORKER_CHECK_SEC:
+                self._check_workers()
+                last_check = time.monotonic()
+            if not message:
+                continue
+            kind = message[0]
+            if kind == "ready":
+                self._ready_workers.add(message[1])
+                logger.info(f"Inference worker {message[1]} ready (pid {message[2]})")
+                if len(self._ready_workers) == self.workers:
+                    self._ready.set()
+            elif kind == "failed":
+                logger.error(f"Inference worker {message[1]} failed to start: {message[2]}")
+                self.error = message[2]
+                self._ready.set()
+            elif kind == "taken":
+                self._assigned[message[1]] = set(message[2])
+            else:
+                # 결과가 전달된 작업은 해당 워커의 처리 중 목록에서 제거
+                assigned = self._assigned.get(message[1])
+                if assigned is not None:
+                    assigned.discard(message[2])
+                    if not assigned:
+                        del self._assigned[message[1]]
+                self._complete(*message[2:])
+
+    def _check_workers(self) -> None:
+        """
+        죽은 워커 처리: 처리 중이던 작업을 실패시키고 재시작 횟수가 남았으면 다시 띄움
+
+        살아 있는 워커가 하나도 없으면 대기열에 남은 작업도 모두 실패시킵니다.
+        """
+        if self._stopping:
+            return
+        for worker_id, process in enumerate(self._processes):
+            if process is None or process.is_alive():
+                continue
+            self.worker_deaths.inc()
+            self._ready_workers.discard(worker_id)
+            error = f"inference worker {worker_id} exited with code {process.exitcode}"
+            logger.error(error)
+            for task_id in self._assigned.pop(worker_id, []):
+                self._complete(task_id, None, 0.0, error)
+
+            restarts = self._restarts.get(worker_id, 0)
+            if restarts < MAX_WORKER_RESTARTS:
+                self._restarts[worker_id] = restarts + 1
+                self._processes[worker_id] = self._spawn(worker_id)
+                logger.warning(f"Restarted inference worker {worker_id} ({restarts + 1}/{MAX_WORKER_RESTARTS})")
+            else:
+                self._processes[worker_id] = None
+                self.error = f"{error}, restart limit reached"
+
+        if not any(process is not None and process.is_alive() for process in self._processes):
+            with self._lock:
+                task_ids = list(self._pending)
+            for task_id in task_ids:
+                self._complete(task_id, None, 0.0, "no inference workers alive")
+            self._ready.set()  # 시작 중이었더라도 대기를 끝내고 웹 프로세스 경로로 전환
+
+    def _complete(self, task_id: int, result: Optional[Dict], score: float, error: Optional[str]) -> None:
+        with self._lock:
+            entry = self._pending.pop(task_id, None)
+        if entry is None:
+            return  # 시간 초과로 이미 포기한 작업
+        future, loop, shm, offset = entry
+        mask = None
+        if error is None:
+            mask = np.frombuffer(shm.buf, dtype=np.uint8, count=MASK_BYTES, offset=offset) \
+                .reshape(MASK_SIDE, MASK_SIDE).astype(bool)
+        _release(shm)
+        loop.call_soon_threadsafe(_resolve, future, result, mask, score, error)
+
+    async def analyze(self, image: DecodedImage) -> Tuple[Dict, np.ndarray, float]:
+        """
+        워커 프로세스에서 SAM_PROMPT_MODE의 프롬프트 점으로 세그멘테이션 후 마스크 영역 분류
+
+        Args:
+            image: 디코딩된 이미지
+
+        Returns:
+            Tuple[Dict, np.ndarray, float]: (분류 결과, 256x256 bool 마스크, IoU 점수)
+
+        Raises:
+            InferenceQueueFullError: 처리 중/대기 작업이 용량을 넘은 경우
+            asyncio.TimeoutError: timeout 안에 결과가 오지 않은 경우
+        """
+        with self._lock:
+            if len(self._pending) >= self.capacity:
+                self.rejected.inc()
+                raise InferenceQueueFullError(
+                    "추론 워커 대기열이 가득 찼습니다",
+                    {"pending": len(self._pending), "capacity": self.capacity}
+                )
+
+        width, height = image.size
+        offset = width * height * 3
+        shm = shared_memory.SharedMemory(create=True, size=offset + MASK_BYTES)
+        np.ndarray((height, width, 3), dtype=np.uint8, buffer=shm.buf)[:] = image.array
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        task_id = next(self._task_ids)
+        with self._lock:
+            self._pending[task_id] = (future, loop, shm, offset)
+        self._tasks.put((task_id, shm.name, (height, width), image.original_size, image.content_hash))
+
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                entry = self._pending.pop(task_id, None)
+            if entry is not None:
+                _release(entry[2])
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts.inc()
+            raise
+        finally:
+            self.run_time_hist.observe((time.perf_counter() - started) * 1000)
+
+    def stats(self) -> dict:
+        """현재 풀 상태 반환"""
+        return {
+            "workers": self.workers,
+            "alive": sum(p is not None and p.is_alive() for p in self._processes),
+            "ready": len(self._ready_workers),
+            "restarts": sum(self._restarts.values()),
+            "threads_per_worker": self.threads,
+            "capacity": self.capacity,
+            "pending": len(self._pending),
+        }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """워커에 종료를 알리고 남은 공유 메모리 블록 정리"""
+        if self._listener is None:
+            return
+        self._stopping = True
+        processes = [process for process in self._processes if process is not None]
+        for _ in processes:
+            self._tasks.put(None)
+        for process in processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._results.put(None)
+        self._listener.join(timeout)
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, loop, shm, _ in pending.values():
+            _release(shm)
+            loop.call_soon_threadsafe(_resolve, future, None, None, 0.0, "inference worker pool shut down")
+        self._processes = []
+        self._listener = None
+        self._ready.clear()
+        self._ready_workers = set()
+        self._assigned = {}
+        self._restarts = {}
+
+def _resolve(future: asyncio.Future, result: Optional[Dict], mask: Optional[np.ndarray],
+             score: float, error: Optional[str]) -> None:
+    """이벤트 루프 스레드에서 작업 결과 전달"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(RuntimeError(error))
+    else:
+        future.set_result((result, mask, score))
+
+# 전역 인스턴스 생성 (프로세스는 INFERENCE_PROCESSES > 0일 때 앱 시작 시 start())
+process_pool = ProcessInferencePool()
@@ -0,0 +1,114 @@
+# app/services/prompt_points.py
+# SAM 마스크 디코딩에 쓸 후보 프롬프트 점 생성 (중앙점, 격자, spectral residual saliency)과 최적 마스크 선택
+
+import logging
+from typing import List, Tuple
+import numpy as np
+from PIL import Image
+from app.config import SAM_PROMPT_MODE, SAM_PROMPT_GRID, SAM_PROMPT_POINTS
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 지원하는 프롬프트 모드
+PROMPT_MODES = ("center", "grid", "saliency")
+
+# 최적 마스크로 고를 수 있는 면적 비율 범위 (배경 조각이나 이미지 전체를 덮는 마스크 제외)
+MIN_MASK_AREA = 0.01
+MAX_MASK_AREA = 0.9
+
+# saliency 계산 해상도
+SALIENCY_SIDE = 64
+
+def _box_blur(array: np.ndarray, size: int) -> np.ndarray:
+    """size x size 평균 필터 (가장자리는 반사 패딩)"""
+    pad = size // 2
+    padded = np.pad(array, pad, mode="reflect")
+    height, width = array.shape
+    total = np.zeros_like(array)
+    for dy in range(size):
+        for dx in range(size):
+            total += padded[dy:dy + height, dx:dx + width]
+    return total / (size * size)
+
+def saliency_map(image: Image.Image, side: int = SALIENCY_SIDE) -> np.ndarray:
+    """
+    spectral residual 방식 saliency 맵 (side x side, 0~1)
+
+    로그 진폭 스펙트럼에서 평활화한 성분을 뺀 나머지가 눈에 띄는 영역에 해당하며,
+    축소한 흑백 이미지의 FFT 두 번이라 디코딩 한 번보다 훨씬 가볍습니다.
+    """
+    gray = np.asarray(image.convert("L").resize((side, side), Image.BILINEAR), dtype=np.float32)
+    spectrum = np.fft.fft2(gray)
+    log_amplitude = np.log(np.abs(spectrum) + 1e-8)
+    residual = log_amplitude - _box_blur(log_amplitude, 3)
+    saliency = np.abs(np.fft.ifft2(np.exp(residual + 1j * np.angle(spectrum)))) ** 2
+    saliency = _box_blur(_box_blur(saliency, 5), 5)
+    peak = saliency.max()
+    return saliency / peak if peak > 0 else saliency
+
+def grid_points(image_size: Tuple[int, int], grid: int = SAM_PROMPT_GRID) -> List[Tuple[int, int]]:
+    """grid x grid 격자 칸의 중심점 (홀수면 이미지 중앙 포함)"""
+    width, height = image_size
+    return [
+        (int((col + 0.5) * width / grid), int((row + 0.5) * height / grid))
+        for row in range(grid) for col in range(grid)
+    ]
+
+def saliency_points(image: Image.Image, count: int = SAM_PROMPT_POINTS) -> List[Tuple[int, int]]:
+    """
+    saliency 맵의 상위 지점 count개 (이미 고른 점 주변은 제외해 서로 떨어진 점을 고름)
+    """
+    saliency = saliency_map(image).copy()
+    side = saliency.shape[0]
+    radius = max(1, side // 8)
+    width, height = image.size
+    points = []
+    for _ in range(count):
+        row, col = np.unravel_index(np.argmax(saliency), saliency.shape)
+        if saliency[row, col] <= 0:
+            break
+        points.append((int((col + 0.5) * width / side), int((row + 0.5) * height / side)))
+        saliency[max(0, row - radius):row + radius + 1, max(0, col - radius):col + radius + 1] = 0
+    return points
+
+def candidate_points(image: Image.Image, mode: str = SAM_PROMPT_MODE) -> List[Tuple[int, int]]:
+    """
+    모드별 후보 프롬프트 점 목록
+
+    Args:
+        image: RGB 이미지
+        mode: "center" (중앙점 하나), "grid" (격자), "saliency" (중앙점 + saliency 상위 지점)
+
+    Returns:
+        List[Tuple[int, int]]: 이미지 좌표계의 점 [(x, y), ...]
+    """
+    width, height = image.size
+    center = (width // 2, height // 2)
+    if mode == "grid":
+        return grid_points(image.size)
+    if mode == "saliency":
+        return [center] + saliency_points(image, max(0, SAM_PROMPT_POINTS - 1))
+    if mode != "center":
+        logger.warning(f"Unknown SAM_PROMPT_MODE {mode}, using center point")
+    return [center]
+
+def select_best_mask(masks: np.ndarray, scores: np.ndarray) -> Tuple[int, int]:
+    """
+    후보 마스크 중 예측 IoU가 가장 높은 마스크 위치
+
+    면적 비율이 [MIN_MASK_AREA, MAX_MASK_AREA] 밖인 마스크는 제외하며,
+    모두 범위 밖이면 전체에서 고릅니다.
+
+    Args:
+        masks: (P, K, H, W) bool 마스크 (점 P개 x 점당 후보 K개)
+        scores: (P, K) 예측 IoU
+
+    Returns:
+        Tuple[int, int]: (점 인덱스, 후보 인덱스)
+    """
+    area = masks.reshape(masks.shape[0], masks.shape[1], -1).mean(axis=-1)
+    valid = (area >= MIN_MASK_AREA) & (area <= MAX_MASK_AREA)
+    ranked = np.where(valid, scores, -np.inf) if valid.any() else scores
+    point_index, mask_index = np.unravel_index(np.argmax(ranked), ranked.shape)
+    return int(point_index), int(mask_index)
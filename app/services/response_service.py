@@ -1,16 +1,15 @@
 from typing import Dict, Optional
-import requests
-from dotenv import load_dotenv
-import os
 import logging
-from functools import lru_cache
+from collections import OrderedDict
 from dataclasses import dataclass
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry  # 변경된 import 문
+from app.services.llm_client import GeminiClient, LLMError, llm_client
 
 # 로거 설정
 logger = logging.getLogger(__name__)
 
+# 프롬프트별 응답 캐시 크기
+RESPONSE_CACHE_SIZE = 100
+
 @dataclass
 class ResponseError(Exception):
     """응답 생성 과정에서 발생하는 예외를 처리하는 클래스"""
@@ -20,28 +19,15 @@ class ResponseError(Exception):
 class ResponseService:
     """Gemini API를 사용한 동물 소개 응답 생성 서비스"""
 
-    def __init__(self):
-        """서비스 초기화 및 API 키 설정"""
+    def __init__(self, client: GeminiClient = llm_client):
+        """서비스 초기화 (공유 비동기 클라이언트 사용)"""
         try:
-            # .env 파일 로드
-            load_dotenv()
-            
             # API 키 검증
-            self.api_key = os.getenv("GEMINI_API_KEY")
-            if not self.api_key:
+            if not client.enabled:
                 raise ValueError("GEMINI_API_KEY가 설정되지 않았습니다.")
 
-            # HTTP 세션 설정
-            self.session = requests.Session()
-            retry_strategy = Retry(
-                total=3,
-                backoff_factor=0.5,
-                status_forcelist=[500, 502, 503, 504]
-            )
-            self.session.mount('https://', HTTPAdapter(max_retries=retry_strategy))
-            
-            # API 엔드포인트 설정
-            self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
+            self.client = client
+            self._cache: "OrderedDict[str, str]" = OrderedDict()
             
             logger.info("ResponseService initialized successfully")
             
@@ -79,10 +65,9 @@ class ResponseService:
             logger.error(f"Failed to generate prompt: {str(e)}")
             raise ResponseError("프롬프트 생성 실패", {"error": str(e)})
 
-    @lru_cache(maxsize=100)
-    def request_gemini(self, prompt: str) -> str:
+    async def request_gemini(self, prompt: str) -> str:
         """
-        Gemini API를 호출해서 답변 생성
+        Gemini API를 호출해서 답변 생성 (같은 프롬프트의 답변은 최근 RESPONSE_CACHE_SIZE개까지 재사용)
         
         Args:
             prompt: API에 전달할 프롬프트
@@ -93,46 +78,31 @@ class ResponseService:
         Raises:
             ResponseError: API 호출 실패 시
         """
-        try:
-            headers = {"Content-Type": "application/json"}
-            params = {"key": self.api_key}
-            body = {
-                "contents": [
-                    {
-                        "parts": [{"text": prompt}]
-                    }
-                ]
-            }
-            
-            response = self.session.post(
-                self.api_url,
-                headers=headers,
-                params=params,
-                json=body,
-                timeout=10
-            )
-            response.raise_for_status()
+        cached = self._cache.get(prompt)
+        if cached is not None:
+            self._cache.move_to_end(prompt)
+            return cached
 
-            data = response.json()
-            candidates = data.get("candidates", [])
-            
-            if not candidates:
-                logger.warning("No response candidates from Gemini API")
+        try:
+            generated_text = await self.client.generate(prompt)
+            if not generated_text:
                 return "답변을 생성하는 데 실패했어요!"
 
-            generated_text = candidates[0]["content"]["parts"][0]["text"]
             logger.info("Successfully generated response from Gemini API")
+            self._cache[prompt] = generated_text
+            while len(self._cache) > RESPONSE_CACHE_SIZE:
+                self._cache.popitem(last=False)
             return generated_text
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {str(e)}")
-            raise ResponseError("API 요청 실패", {"error": str(e)})
+        except LLMError as e:
+            logger.error(f"API request failed: {e.message}")
+            raise ResponseError("API 요청 실패", e.details)
             
         except Exception as e:
             logger.error(f"Unexpected error in API request: {str(e)}")
             raise ResponseError("예기치 않은 오류", {"error": str(e)})
 
-    def generate_response(self, animal_info: Dict[str, str]) -> str:
+    async def generate_response(self, animal_info: Dict[str, str]) -> str:
         """
         전체 과정: 프롬프트 생성 -> Gemini 호출 -> 자연스러운 답변 반환
         
@@ -144,17 +114,9 @@ class ResponseService:
         """
         try:
             prompt = self.generate_prompt(animal_info)
-            response = self.request_gemini(prompt)
+            response = await self.request_gemini(prompt)
             return response
             
         except Exception as e:
             logger.error(f"Failed to generate response: {str(e)}")
             return "죄송해요, 응답을 생성하는 중에 문제가 발생했어요."
-
-    def __del__(self):
-        """리소스 정리"""
-        try:
-            if hasattr(self, 'session'):
-                self.session.close()
-        except Exception as e:
-            logger.error(f"Failed to cleanup resources: {str(e)}")
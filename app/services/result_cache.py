@@ -0,0 +1,199 @@
+# app/services/result_cache.py
+# 업로드 이미지 바이트 + 모델/설정 버전을 키로 전체 분석 결과를 보관하는 TTL + LRU 캐시와 동일 요청 합치기
+
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.config import (
+    RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SEC, RESULT_CACHE_VERSION,
+    INFERENCE_BACKEND, INFERENCE_PRECISION, INGEST_MAX_SIDE,
+    CLIP_CROP_PADDING, CLIP_MASK_BACKGROUND,
+    SPECIES_VOCABULARY, SPECIES_INDEX, CLASSIFIER_HIERARCHICAL, CLASSIFIER_TOP_FAMILIES,
+    ANALYZE_CASCADE, CASCADE_MIN_CONFIDENCE, CASCADE_MIN_MARGIN,
+    SAM_PROMPT_MODE, SAM_PROMPT_GRID, SAM_PROMPT_POINTS
+)
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+def config_version() -> str:
+    """
+    분석 결과에 영향을 주는 설정의 지문
+
+    설정이 바뀌면 키가 달라져 이전 결과를 쓰지 않습니다. 모델 가중치나 DB 내용처럼
+    설정에 드러나지 않는 변경은 RESULT_CACHE_VERSION을 올려 무효화합니다.
+    """
+    settings = (
+        RESULT_CACHE_VERSION, INFERENCE_BACKEND, INFERENCE_PRECISION, INGEST_MAX_SIDE,
+        CLIP_CROP_PADDING, CLIP_MASK_BACKGROUND,
+        SPECIES_VOCABULARY, SPECIES_INDEX, CLASSIFIER_HIERARCHICAL, CLASSIFIER_TOP_FAMILIES,
+        ANALYZE_CASCADE, CASCADE_MIN_CONFIDENCE, CASCADE_MIN_MARGIN,
+        SAM_PROMPT_MODE, SAM_PROMPT_GRID, SAM_PROMPT_POINTS,
+    )
+    return hashlib.sha256(repr(settings).encode()).hexdigest()[:16]
+
+class SingleFlight:
+    """
+    같은 키의 동시 비동기 계산을 하나로 합치는 도우미
+
+    먼저 들어온 요청이 계산을 시작하고, 그동안 들어온 같은 키의 요청은 그 결과를 함께 기다립니다.
+    계산은 별도 태스크로 실행하므로 먼저 들어온 요청의 연결이 끊겨도 기다리는 요청에는 영향이 없습니다.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.leaders = metrics.counter(f"{name}.leaders")
+        self.coalesced = metrics.counter(f"{name}.coalesced")
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        키별로 한 번만 계산
+
+        Args:
+            key: 계산 키
+            compute: 결과를 만드는 코루틴 함수
+
+        Returns:
+            Tuple[Any, bool]: (결과, 다른 요청의 계산을 기다렸는지 여부)
+
+        Raises:
+            Exception: compute가 던진 예외 (기다리던 요청 모두에 전달)
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced.inc()
+        else:
+            self.leaders.inc()
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        """계산이 끝나면 진행 중 목록에서 제거 (기다리던 요청이 모두 취소된 경우에도 예외를 회수)"""
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+class ResultCache:
+    """
+    분석 결과를 저장하는 TTL + LRU 캐시
+
+    저장 후 ttl_seconds가 지나면 만료되고, max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    캐시 미스는 SingleFlight로 합쳐 같은 이미지가 동시에 여러 번 올라와도 분석은 한 번만 실행합니다.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE,
+                 ttl_seconds: float = RESULT_CACHE_TTL_SEC,
+                 version: Optional[str] = None, name: str = "result_cache"):
+        """
+        캐시 초기화
+
+        Args:
+            max_entries: 최대 항목 수 (0이면 저장하지 않고 동시 요청 합치기만 수행)
+            ttl_seconds: 항목 유효 시간 (초)
+            version: 키에 포함할 모델/설정 버전 (기본값: config_version())
+            name: 지표 이름 접두어
+        """
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.version = version or config_version()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight(name)
+
+        # 지표 등록
+        self.hits = metrics.counter(f"{name}.hits")
+        self.misses = metrics.counter(f"{name}.misses")
+        self.evictions = metrics.counter(f"{name}.evictions")
+        self.expired = metrics.counter(f"{name}.expired")
+        metrics.register_collector(name, self.stats)
+
+    def make_key(self, data: bytes) -> str:
+        """업로드 바이트 SHA-256 + 버전으로 캐시 키 생성 (디코딩 전에 계산 가능)"""
+        return f"{hashlib.sha256(data).hexdigest()}:{self.version}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시된 결과 조회 (만료된 항목은 제거 후 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses.inc()
+                return None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                self.expired.inc()
+                self.misses.inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits.inc()
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """결과 저장 (항목 수 초과 시 LRU 항목 제거)"""
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions.inc()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """
+        캐시 조회 후 없으면 계산 (같은 키의 동시 계산은 하나로 합침)
+
+        Args:
+            key: make_key로 만든 키
+            compute: 결과를 만드는 코루틴 함수 (예외가 나면 저장하지 않음)
+
+        Returns:
+            Tuple[Any, str]: (결과, 출처 "hit" / "coalesced" / "computed")
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, "hit"
+
+        async def compute_and_store():
+            result = await compute()
+            self.put(key, result)
+            return result
+
+        value, shared = await self._flight.run(key, compute_and_store)
+        return value, "coalesced" if shared else "computed"
+
+    def clear(self) -> None:
+        """캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 상태 반환"""
+        hits, misses = self.hits.value, self.misses.value
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "version": self.version,
+            "inflight": len(self._flight),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "coalesced": self._flight.coalesced.value,
+            "evictions": self.evictions.value,
+            "expired": self.expired.value,
+        }
+
+# 전역 인스턴스 생성
+result_cache = ResultCache()
@@ -3,12 +3,17 @@ import torch
 import numpy as np
 from torchvision import transforms
 from PIL import Image
-from typing import Tuple, Optional, Union
+from typing import List, Sequence, Tuple, Optional, Union
 from dataclasses import dataclass
 import logging
-from mobile_sam import sam_model_registry
-from mobile_sam.predictor import SamPredictor
-from pathlib import Path
+import torch.nn.functional as F
+from app.config import SAM_EMBEDDING_CACHE_MB, INFERENCE_BACKEND, INFERENCE_PRECISION, SAM_PROMPT_MODE
+from app.services.model_registry import model_registry
+from app.services.inference_backend import get_backend
+from app.services.embedding_cache import EmbeddingCache
+from app.services.image_hashing import image_content_hash
+from app.services.mask_codec import RLE_SUFFIX, BITS_SUFFIX, save_mask_file, load_mask_file
+from app.services.prompt_points import candidate_points, select_best_mask
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -19,30 +24,50 @@ class SegmentationError(Exception):
     message: str
     details: Optional[dict] = None
 
+# SAM 마스크 로짓 이진화 임계값 (Sam.mask_threshold와 동일)
+SAM_MASK_THRESHOLD = 0.0
+
+def _upscale_masks(low_res_masks: torch.Tensor, size: Tuple[int, int]) -> torch.Tensor:
+    """
+    저해상도 마스크 로짓을 원하는 크기로 업샘플 (Sam.postprocess_masks와 동일한 연산)
+    
+    Args:
+        low_res_masks: (B, K, 256, 256) 마스크 로짓
+        size: 출력 크기 (height, width)
+    """
+    with torch.no_grad():
+        masks = F.interpolate(low_res_masks, (1024, 1024), mode="bilinear", align_corners=False)
+        if size != (1024, 1024):
+            masks = F.interpolate(masks, size, mode="bilinear", align_corners=False)
+    return masks
+
 class SamService:
     """MobileSAM을 사용한 이미지 세그멘테이션 서비스"""
     
-    def __init__(self, model_type: str = "vit_t"):
+    def __init__(self, model_name: Optional[str] = None, backend: str = INFERENCE_BACKEND,
+                 precision: str = INFERENCE_PRECISION):
         """
         MobileSAM 서비스 초기화
         
+        모델 가중치는 model_registry가 처음 사용할 때 한 번만 로드하며,
+        같은 프로세스의 다른 서비스(/api/predict)와 같은 인스턴스를 공유합니다.
+        
         Args:
-            model_type: 모델 타입 (기본값: "vit_t")
+            model_name: model_registry에 등록된 모델 이름 (기본값: 백엔드/정밀도에 맞는 MobileSAM)
+            backend: 추론 백엔드 ("torch" 또는 "onnx")
+            precision: 추론 정밀도 ("fp32", "int8" 또는 "bf16")
         """
         try:
-            # 모델 가중치 경로 설정
-            self.model_path = Path(__file__).parent.parent.parent / 'external' / 'MobileSAM' / 'weights' / 'mobile_sam.pt'
-            if not self.model_path.exists():
-                raise FileNotFoundError(f"모델 가중치를 찾을 수 없습니다: {self.model_path}")
-                
-            # 장치 설정
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            logger.info(f"Using device: {self.device}")
+            # 장치 및 추론 백엔드 설정
+            self.backend = get_backend(backend, precision)
+            self.model_name = model_name or self.backend.sam_model_name
+            self.device = self.backend.device
+            logger.info(f"Using device: {self.device}, backend: {self.backend.name}/{self.backend.precision}")
             
-            # 모델 로드
-            self.model = sam_model_registry[model_type](checkpoint=str(self.model_path))
-            self.model.to(device=self.device)
-            self.model.eval()
+            # 이미지 임베딩 캐시 (내용 해시 기준 LRU)
+            self.embedding_cache = EmbeddingCache(
+                SAM_EMBEDDING_CACHE_MB * 1024 ** 2, name="sam_embedding_cache"
+            )
             
             # 이미지 전처리 설정
             self.transform = transforms.Compose([
@@ -51,15 +76,22 @@ class SamService:
                 transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
             ])
             
-            # 프리딕터 초기화
-            self.predictor = SamPredictor(self.model)
-            
-            logger.info(f"SamService initialized with model_type: {model_type}")
+            logger.info(f"SamService initialized with model: {self.model_name}")
             
         except Exception as e:
             logger.error(f"Failed to initialize SamService: {str(e)}")
             raise SegmentationError("서비스 초기화 실패", {"error": str(e)})
 
+    @property
+    def model(self) -> torch.nn.Module:
+        """공유 MobileSAM 모델 (처음 접근 시 로드)"""
+        return model_registry.get(self.model_name)
+
+    @property
+    def required_models(self) -> List[str]:
+        """세그멘테이션에 필요한 model_registry 항목 (예열 대상)"""
+        return list(self.backend.sam_models)
+
     def segment(self, image_path: Union[str, bytes], 
                 input_point: Tuple[int, int], 
                 input_label: int = 1) -> Tuple[Image.Image, np.ndarray, float]:
@@ -86,53 +118,233 @@ class SamService:
             else:
                 image = Image.open(image_path).convert("RGB")
             
-            # 이미지 전처리
-            transformed_image = self.transform(image).unsqueeze(0).to(self.device)
-            
-            # 세그멘테이션 수행
-            with torch.no_grad():
-                # 이미지 임베딩
-                image_embedding = self.model.image_encoder(transformed_image)
-                
-                # 프롬프트 인코딩
-                points = torch.tensor([[[input_point[0], input_point[1]]]], device=self.device)
-                labels = torch.tensor([[input_label]], device=self.device)
-                
-                sparse_embeddings, dense_embeddings = self.model.prompt_encoder(
-                    points=(points, labels),
-                    boxes=None,
-                    masks=None,
-                )
-                
-                # 마스크 디코딩
-                low_res_masks, iou_predictions = self.model.mask_decoder(
-                    image_embeddings=image_embedding,
-                    image_pe=self.model.prompt_encoder.get_dense_pe(),
-                    sparse_prompt_embeddings=sparse_embeddings,
-                    dense_prompt_embeddings=dense_embeddings,
-                    multimask_output=False,
-                )
-                
-                # 마스크 후처리
-                masks = self.model.postprocess_masks(
-                    low_res_masks, (1024, 1024), (1024, 1024)
-                )
-                
-            logger.debug(f"Segmentation completed with IoU: {iou_predictions[0, 0].item():.4f}")
-            return image, masks[0, 0].cpu().numpy(), iou_predictions[0, 0].item()
+            # 이미지 임베딩 후 마스크 디코딩
+            image_embedding = self.encode_images([image])
+            mask, iou = self.predict_mask(image_embedding, image.size, input_point, input_label)
+            return image, mask, iou
             
         except Exception as e:
             logger.error(f"Segmentation failed: {str(e)}")
             raise SegmentationError("세그멘테이션 실패", {"error": str(e)})
 
-    def save_mask(self, mask_array: np.ndarray, save_path: str, save_format: str = 'png') -> None:
+    def encode_images(self, images: List[Image.Image],
+                      keys: Optional[List[str]] = None) -> torch.Tensor:
+        """
+        여러 이미지를 하나의 배치로 묶어 이미지 임베딩 계산
+        
+        이미지 내용 해시로 임베딩 캐시를 먼저 조회하고, 캐시에 없는 이미지만
+        image_encoder에 배치로 전달합니다.
+        
+        Args:
+            images: RGB 이미지 리스트
+            keys: 이미지별 내용 해시 (없으면 직접 계산)
+            
+        Returns:
+            torch.Tensor: (B, 256, 64, 64) 형태의 이미지 임베딩
+            
+        Raises:
+            SegmentationError: 임베딩 계산 실패 시
+        """
+        try:
+            if keys is None:
+                keys = [image_content_hash(image) for image in images]
+            
+            # 캐시 조회
+            embeddings: List[Optional[torch.Tensor]] = [
+                self.embedding_cache.get(key) for key in keys
+            ]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            
+            # 캐시에 없는 이미지만 인코딩
+            if missing:
+                batch = torch.stack([self.transform(images[i]) for i in missing]).to(self.device)
+                encoded = self.backend.sam_encode(batch)
+                for i, embedding in zip(missing, encoded):
+                    embeddings[i] = embedding
+                    self.embedding_cache.put(keys[i], embedding)
+            
+            return torch.stack(embeddings)
+        except Exception as e:
+            logger.error(f"Image encoding failed: {str(e)}")
+            raise SegmentationError("이미지 임베딩 실패", {"error": str(e)})
+
+    def predict_mask(self, image_embedding: torch.Tensor,
+                     image_size: Tuple[int, int],
+                     input_point: Tuple[int, int],
+                     input_label: int = 1) -> Tuple[np.ndarray, float]:
+        """
+        미리 계산된 이미지 임베딩으로 마스크 디코딩
+        
+        Args:
+            image_embedding: (1, 256, 64, 64) 형태의 이미지 임베딩
+            image_size: 원본 이미지 크기 (width, height)
+            input_point: 원본 이미지 좌표계의 세그멘테이션 기준점 (x, y)
+            input_label: 레이블 (기본값: 1, foreground)
+            
+        Returns:
+            Tuple[np.ndarray, float]: (1024x1024 마스크 로짓, IoU 점수)
+        """
+        # 프롬프트 인코딩 및 마스크 디코딩 (기준점은 1024 입력 좌표계로 변환)
+        low_res_masks, iou_predictions = self._decode_prompts(
+            image_embedding, image_size, [input_point], [input_label]
+        )
+        
+        # 마스크 후처리
+        masks = _upscale_masks(low_res_masks, (1024, 1024))
+        
+        logger.debug(f"Segmentation completed with IoU: {iou_predictions[0, 0].item():.4f}")
+        return masks[0, 0].cpu().numpy(), iou_predictions[0, 0].item()
+
+    def _decode_prompts(self, image_embedding: torch.Tensor,
+                        image_size: Tuple[int, int],
+                        points: Optional[Sequence[Tuple[float, float]]] = None,
+                        labels: Optional[Sequence[int]] = None,
+                        box: Optional[Sequence[float]] = None,
+                        multimask_output: bool = False) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        프롬프트 인코딩과 마스크 디코딩 수행
+        
+        Returns:
+            Tuple[torch.Tensor, torch.Tensor]: (저해상도 마스크 로짓 (1, K, 256, 256), IoU 점수 (1, K))
+        """
+        width, height = image_size
+        # 원본 좌표를 1024x1024 입력 좌표계로 변환
+        scale = torch.tensor([1024 / width, 1024 / height], device=self.device)
+        
+        coords, point_labels = None, None
+        if points is not None and len(points) > 0:
+            coords = torch.as_tensor(points, dtype=torch.float, device=self.device)[None] * scale
+            point_labels = torch.as_tensor(labels, dtype=torch.int, device=self.device)[None]
+        
+        box_input = None
+        if box is not None:
+            box_input = (torch.as_tensor(box, dtype=torch.float, device=self.device).reshape(2, 2) * scale).reshape(1, 4)
+        
+        return self.backend.sam_decode(
+            image_embedding, coords, point_labels, box_input, multimask_output
+        )
+
+    def predict_masks(self, image_embedding: torch.Tensor,
+                      image_size: Tuple[int, int],
+                      points: Optional[Sequence[Tuple[float, float]]] = None,
+                      labels: Optional[Sequence[int]] = None,
+                      box: Optional[Sequence[float]] = None,
+                      multimask_output: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        이미지 임베딩과 임의의 프롬프트(점, 박스)로 마스크 디코딩
+        
+        image_encoder를 다시 실행하지 않으므로 같은 이미지에 대한 반복 프롬프트가 빠릅니다.
+        
+        Args:
+            image_embedding: (1, 256, 64, 64) 형태의 이미지 임베딩
+            image_size: 원본 이미지 크기 (width, height)
+            points: 원본 이미지 좌표계의 점 목록 [(x, y), ...]
+            labels: 점별 레이블 (1: foreground, 0: background)
+            box: 원본 이미지 좌표계의 박스 (x1, y1, x2, y2)
+            multimask_output: 여러 후보 마스크 반환 여부
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (원본 크기의 bool 마스크 (K, H, W), IoU 점수 (K,))
+        """
+        low_res_masks, iou_predictions = self._decode_prompts(
+            image_embedding, image_size, points, labels, box, multimask_output
+        )
+        width, height = image_size
+        masks = _upscale_masks(low_res_masks, (height, width))
+        
+        masks = (masks[0] > SAM_MASK_THRESHOLD).cpu().numpy()
+        return masks, iou_predictions[0].cpu().numpy()
+
+    def predict_low_res_masks(self, image_embedding: torch.Tensor,
+                              image_size: Tuple[int, int],
+                              points: Optional[Sequence[Tuple[float, float]]] = None,
+                              labels: Optional[Sequence[int]] = None,
+                              box: Optional[Sequence[float]] = None,
+                              multimask_output: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        원본 크기로 업샘플하지 않은 256x256 저해상도 마스크 반환
+        
+        저해상도 마스크는 이미지 전체를 256x256으로 늘인 좌표계이므로
+        필요한 영역만 원본 좌표로 변환해 사용할 수 있습니다.
+        
+        Args:
+            predict_masks와 동일
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (bool 마스크 (K, 256, 256), IoU 점수 (K,))
+        """
+        low_res_masks, iou_predictions = self._decode_prompts(
+            image_embedding, image_size, points, labels, box, multimask_output
+        )
+        masks = (low_res_masks[0] > SAM_MASK_THRESHOLD).cpu().numpy()
+        return masks, iou_predictions[0].cpu().numpy()
+
+    def predict_best_low_res_mask(self, image_embedding: torch.Tensor,
+                                  image_size: Tuple[int, int],
+                                  points: Sequence[Tuple[float, float]],
+                                  multimask_output: bool = True) -> Tuple[np.ndarray, float, int]:
+        """
+        각 점을 독립된 프롬프트로 한 번의 배치 디코딩 후 예측 IoU가 가장 높은 저해상도 마스크 선택
+        
+        mask_decoder는 프롬프트 배치에 대해 같은 임베딩을 공유하므로
+        점 여러 개의 비용이 점 하나와 거의 같습니다.
+        
+        Args:
+            image_embedding: (1, 256, 64, 64) 형태의 이미지 임베딩
+            image_size: 원본 이미지 크기 (width, height)
+            points: 원본 이미지 좌표계의 후보 점 목록 [(x, y), ...]
+            multimask_output: 점마다 후보 마스크 3개를 디코딩할지 여부
+            
+        Returns:
+            Tuple[np.ndarray, float, int]: (bool 마스크 (256, 256), IoU 점수, 선택된 점 인덱스)
+        """
+        width, height = image_size
+        scale = torch.tensor([1024 / width, 1024 / height], device=self.device)
+        coords = torch.as_tensor(points, dtype=torch.float, device=self.device)[:, None] * scale
+        labels = torch.ones(coords.shape[:2], dtype=torch.int, device=self.device)
+        low_res_masks, iou_predictions = self.backend.sam_decode(
+            image_embedding, coords, labels, None, multimask_output
+        )
+        
+        masks = (low_res_masks > SAM_MASK_THRESHOLD).cpu().numpy()
+        scores = iou_predictions.cpu().numpy()
+        point_index, mask_index = select_best_mask(masks, scores)
+        return masks[point_index, mask_index], float(scores[point_index, mask_index]), point_index
+
+    def segment_low_res(self, image_embedding: torch.Tensor, image: Image.Image,
+                        mode: str = SAM_PROMPT_MODE) -> Tuple[np.ndarray, float]:
+        """
+        프롬프트 모드에 따라 저해상도 마스크 하나를 계산
+        
+        "center" 모드는 기존과 같이 중앙점 하나로 단일 마스크를 디코딩하고,
+        그 외 모드는 후보 점을 배치로 디코딩해 가장 좋은 마스크를 고릅니다.
+        
+        Args:
+            image_embedding: (1, 256, 64, 64) 형태의 이미지 임베딩
+            image: 임베딩을 계산한 RGB 이미지
+            mode: 프롬프트 모드 ("center", "grid", "saliency")
+            
+        Returns:
+            Tuple[np.ndarray, float]: (bool 마스크 (256, 256), IoU 점수)
+        """
+        points = candidate_points(image, mode)
+        if len(points) == 1:
+            masks, scores = self.predict_low_res_masks(image_embedding, image.size, points, [1])
+            return masks[0], float(scores[0])
+        mask, score, _ = self.predict_best_low_res_mask(image_embedding, image.size, points)
+        return mask, score
+
+    def save_mask(self, mask_array: np.ndarray, save_path: str, save_format: str = 'rle') -> str:
         """
         세그멘테이션 마스크 저장
         
         Args:
             mask_array: 마스크 배열
-            save_path: 저장 경로
-            save_format: 저장 형식 ('png' 또는 'npy')
+            save_path: 저장 경로 (rle/bits 형식은 확장자가 없으면 붙여서 저장)
+            save_format: 저장 형식 ('rle': COCO RLE JSON, 'bits': 비트 패킹 npz, 'png', 'npy')
+            
+        Returns:
+            str: 실제 저장된 경로
             
         Raises:
             ValueError: 지원하지 않는 저장 형식
@@ -141,32 +353,42 @@ class SamService:
         try:
             os.makedirs(os.path.dirname(save_path), exist_ok=True)
             
-            if save_format == 'png':
+            if save_format in ('rle', 'bits'):
+                suffix = RLE_SUFFIX if save_format == 'rle' else BITS_SUFFIX
+                if not save_path.endswith(suffix):
+                    save_path += suffix
+                save_mask_file(mask_array, save_path)
+            elif save_format == 'png':
                 mask_img = Image.fromarray((mask_array * 255).astype(np.uint8))
                 mask_img.save(save_path)
             elif save_format == 'npy':
                 np.save(save_path, mask_array)
             else:
-                raise ValueError("지원하지 않는 형식입니다: 'png' 또는 'npy' 중 하나를 선택하세요.")
+                raise ValueError("지원하지 않는 형식입니다: 'rle', 'bits', 'png', 'npy' 중 하나를 선택하세요.")
                 
             logger.info(f"Mask saved successfully: {save_path}")
+            return save_path
             
         except Exception as e:
             logger.error(f"Failed to save mask: {str(e)}")
             raise SegmentationError("마스크 저장 실패", {"error": str(e)})
 
-    def __del__(self):
-        """리소스 정리"""
+    def load_mask(self, path: str) -> np.ndarray:
+        """
+        save_mask로 저장한 마스크를 bool 배열로 로드 (형식은 확장자로 판단)
+        
+        Raises:
+            SegmentationError: 마스크 로드 실패 시
+        """
         try:
-            if hasattr(self, 'model'):
-                del self.model
-            torch.cuda.empty_cache()
+            return load_mask_file(path)
         except Exception as e:
-            logger.error(f"Cleanup failed: {str(e)}")
+            logger.error(f"Failed to load mask: {str(e)}")
+            raise SegmentationError("마스크 로드 실패", {"path": path, "error": str(e)})
 
 # 전역 인스턴스 생성
 try:
-    sam_service = SamService(model_type="vit_t")
+    sam_service = SamService()
     logger.info("Global SAM service instance created successfully")
 except Exception as e:
     logger.critical(f"Failed to create global SAM service instance: {str(e)}")
@@ -0,0 +1,96 @@
+# app/services/segment_session.py
+# 재프롬프트 세그멘테이션을 위해 이미지 임베딩을 보관하는 크기 제한 + TTL 저장소
+
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import torch
+from app.config import SEGMENT_SESSION_MAX, SEGMENT_SESSION_TTL_SEC
+from app.services.metrics import metrics
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SegmentSession:
+    """한 번 인코딩된 이미지의 세그멘테이션 세션"""
+    image_id: str
+    embedding: torch.Tensor          # (1, 256, 64, 64)
+    image_size: Tuple[int, int]      # (width, height)
+    expires_at: float
+
+class SegmentSessionStore:
+    """
+    image_id로 이미지 임베딩을 보관하는 저장소
+
+    마지막 사용 후 ttl_seconds가 지나면 만료되고,
+    max_entries를 넘으면 가장 오래 사용되지 않은 세션부터 제거합니다.
+    """
+
+    def __init__(self, max_entries: int = SEGMENT_SESSION_MAX,
+                 ttl_seconds: int = SEGMENT_SESSION_TTL_SEC):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, SegmentSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        metrics.register_collector("segment_sessions", self.stats)
+
+    def create(self, embedding: torch.Tensor, image_size: Tuple[int, int]) -> SegmentSession:
+        """
+        새 세션 생성
+
+        Args:
+            embedding: 이미지 임베딩
+            image_size: 원본 이미지 크기 (width, height)
+
+        Returns:
+            SegmentSession: 생성된 세션
+        """
+        session = SegmentSession(
+            image_id=uuid.uuid4().hex,
+            embedding=embedding.detach(),
+            image_size=image_size,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._cleanup_locked()
+            self._sessions[session.image_id] = session
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, image_id: str) -> Optional[SegmentSession]:
+        """세션 조회 (조회 시 만료 시간 연장)"""
+        with self._lock:
+            session = self._sessions.get(image_id)
+            if session is None:
+                return None
+            now = time.monotonic()
+            if now > session.expires_at:
+                del self._sessions[image_id]
+                return None
+            session.expires_at = now + self.ttl_seconds
+            self._sessions.move_to_end(image_id)
+            return session
+
+    def delete(self, image_id: str) -> bool:
+        """세션 삭제"""
+        with self._lock:
+            return self._sessions.pop(image_id, None) is not None
+
+    def _cleanup_locked(self) -> None:
+        """만료된 세션 정리 (잠금 보유 상태에서 호출)"""
+        now = time.monotonic()
+        expired = [k for k, v in self._sessions.items() if now > v.expires_at]
+        for key in expired:
+            del self._sessions[key]
+
+    def stats(self) -> dict:
+        return {"sessions": len(self._sessions), "max_entries": self.max_entries}
+
+# 전역 인스턴스 생성
+segment_sessions = SegmentSessionStore()
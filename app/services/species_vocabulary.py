@@ -0,0 +1,215 @@
+# app/services/species_vocabulary.py
+# animals 테이블의 전체 종 이름을 CLIP 텍스트 임베딩 행렬로 미리 계산해 메모리 매핑으로 공유하는 어휘
+
+import json
+import sqlite3
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import torch
+import clip
+from app.config import (
+    DB_PATH, SPECIES_EMBEDDINGS_DIR, SPECIES_VOCABULARY, SPECIES_INDEX, SPECIES_INDEX_CANDIDATES
+)
+from app.services.vector_index import FlatIndex, IVFPQIndex, load_index
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 어휘 파일 이름
+EMBEDDINGS_FILE = "species_text_fp16.npy"
+LABELS_FILE = "species_labels.json"
+INDEX_DIR = "species_index"
+
+# CLIP 텍스트 프롬프트와 로짓 스케일 (학습된 logit_scale.exp() 값)
+PROMPT_TEMPLATE = "a photo of a {}"
+LOGIT_SCALE = 100.0
+
+@dataclass
+class Species:
+    """어휘에 포함된 종 정보"""
+    name_en: str
+    name_ko: Optional[str]
+    conservation_status: Optional[str]
+
+    @property
+    def label(self) -> str:
+        """분류 결과 클래스명 (기존 ANIMAL_CLASSES와 같은 "a dog" 형식)"""
+        return f"a {self.name_en}"
+
+class SpeciesVocabulary:
+    """
+    정규화된 fp16 텍스트 임베딩 행렬 (V, D)과 종 정보
+
+    행렬은 np.load(mmap_mode="r")로 열어 여러 워커 프로세스가 같은 페이지 캐시를 공유하며,
+    분류는 벡터 인덱스로 상위 후보를 찾은 뒤 후보에 대해서만 softmax를 계산합니다.
+    """
+
+    def __init__(self, embeddings: np.ndarray, species: List[Species], index=None):
+        if embeddings.shape[0] != len(species):
+            raise ValueError(f"임베딩 수({embeddings.shape[0]})와 종 수({len(species)})가 다릅니다")
+        self.embeddings = embeddings
+        self.species = species
+        self.labels = [s.label for s in species]
+        self.index = index if index is not None else FlatIndex.from_matrix(embeddings)
+
+    def __len__(self) -> int:
+        return len(self.species)
+
+    @classmethod
+    def load(cls, directory: Path = SPECIES_EMBEDDINGS_DIR,
+             index_kind: str = SPECIES_INDEX) -> "SpeciesVocabulary":
+        """디스크의 어휘 파일을 메모리 매핑으로 열기"""
+        embeddings = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")
+        with open(directory / LABELS_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        species = [Species(**item) for item in meta["species"]]
+
+        # 근사 인덱스는 빌드 단계에서 학습해 둔 경우에만 사용
+        index = None
+        if index_kind == IVFPQIndex.kind:
+            if (directory / INDEX_DIR).exists():
+                index = load_index(directory / INDEX_DIR)
+            else:
+                logger.warning(f"{directory / INDEX_DIR} not found, using flat index")
+        logger.info(f"Species vocabulary loaded: {len(species)} species ({meta.get('model')}, "
+                    f"index: {index.kind if index else FlatIndex.kind})")
+        return cls(embeddings, species, index)
+
+    def subset(self, indices: np.ndarray) -> "SpeciesVocabulary":
+        """일부 종만 포함한 어휘 (행렬은 복사)"""
+        return SpeciesVocabulary(
+            np.ascontiguousarray(self.embeddings[indices]),
+            [self.species[i] for i in indices],
+        )
+
+    def logits(self, image_features: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        이미지 특징과 종 임베딩의 스케일된 코사인 유사도
+
+        Args:
+            image_features: (D,) 또는 (B, D) 이미지 특징 (정규화 전이어도 됨)
+            rows: 점수를 계산할 종 인덱스 (기본값: 전체)
+
+        Returns:
+            np.ndarray: (B, V) 또는 (B, len(rows)) 로짓
+        """
+        features = np.atleast_2d(np.asarray(image_features, dtype=np.float32))
+        features = features / np.linalg.norm(features, axis=-1, keepdims=True)
+        matrix = self.embeddings if rows is None else self.embeddings[rows]
+        return LOGIT_SCALE * (features @ matrix.T.astype(np.float32))
+
+    def top_k(self, image_features: np.ndarray, k: int = 3,
+              candidates: int = SPECIES_INDEX_CANDIDATES) -> List[Tuple[str, float]]:
+        """
+        단일 이미지 특징의 상위 k개 종과 확률
+
+        인덱스로 상위 candidates개 종을 찾고(근사 인덱스면 정확한 점수로 재계산),
+        후보에 대한 softmax를 확률로 사용합니다. 로짓 스케일이 커서 후보 밖 종의 확률은 무시할 만합니다.
+
+        Returns:
+            List[Tuple[str, float]]: [(label, probability), ...] 확률 내림차순
+        """
+        features = np.asarray(image_features, dtype=np.float32).reshape(-1)
+        features = features / np.linalg.norm(features)
+        scores, rows = self.index.search(features, max(k, candidates))
+        rows = rows[0][rows[0] >= 0]
+        if self.index.exact:
+            logits = LOGIT_SCALE * scores[0][:len(rows)]
+        else:
+            logits = self.logits(features, rows)[0]
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        top = np.argsort(-probs)[:k]
+        return [(self.labels[rows[i]], float(probs[i])) for i in top]
+
+def load_species_vocabulary(directory: Path = SPECIES_EMBEDDINGS_DIR) -> Optional[SpeciesVocabulary]:
+    """
+    어휘 파일이 있으면 로드 (비활성화되었거나 파일이 없으면 None)
+    """
+    if not SPECIES_VOCABULARY:
+        return None
+    if not (directory / EMBEDDINGS_FILE).exists():
+        logger.info(f"Species vocabulary not found in {directory}, using built-in classes")
+        return None
+    try:
+        return SpeciesVocabulary.load(directory)
+    except Exception as e:
+        logger.error(f"Failed to load species vocabulary: {str(e)}")
+        return None
+
+def read_species(db_path: Path = DB_PATH) -> List[Species]:
+    """animals 테이블에서 종 목록 조회 (영문명 기준 중복 제거)"""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        rows = conn.execute(
+            "SELECT name_en, name_ko, conservation_status FROM animals ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    species: Dict[str, Species] = {}
+    for name_en, name_ko, status in rows:
+        key = " ".join(name_en.lower().split())
+        if key and key not in species:
+            species[key] = Species(key, name_ko, status)
+    return list(species.values())
+
+def build_species_vocabulary(model: torch.nn.Module, species: List[Species],
+                             directory: Path = SPECIES_EMBEDDINGS_DIR,
+                             model_name: str = "ViT-B/32", batch_size: int = 256) -> Path:
+    """
+    종 이름별 CLIP 텍스트 임베딩을 계산해 정규화된 fp16 행렬로 저장
+
+    Args:
+        model: CLIP 모델
+        species: 어휘에 포함할 종 목록
+        directory: 저장 디렉토리
+        model_name: 메타데이터에 기록할 CLIP 모델 이름
+        batch_size: encode_text 배치 크기
+
+    Returns:
+        Path: 저장된 임베딩 파일 경로
+    """
+    device = next(model.parameters()).device
+    chunks = []
+    with torch.no_grad():
+        for start in range(0, len(species), batch_size):
+            prompts = [PROMPT_TEMPLATE.format(s.name_en) for s in species[start:start + batch_size]]
+            features = model.encode_text(clip.tokenize(prompts).to(device)).float()
+            chunks.append(features / features.norm(dim=-1, keepdim=True))
+    embeddings = torch.cat(chunks).cpu().numpy().astype(np.float16)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / EMBEDDINGS_FILE
+    np.save(path, embeddings)
+    with open(directory / LABELS_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "model": model_name,
+            "prompt": PROMPT_TEMPLATE,
+            "species": [s.__dict__ for s in species],
+        }, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"Species vocabulary saved: {path} {embeddings.shape}")
+    return path
+
+def build_species_index(directory: Path = SPECIES_EMBEDDINGS_DIR, nlist: int = 64,
+                        m: int = 16, nprobe: int = 8) -> IVFPQIndex:
+    """
+    저장된 어휘 행렬로 IVF-PQ 인덱스를 학습해 어휘 디렉토리에 저장
+
+    Args:
+        directory: 어휘 디렉토리
+        nlist: 거친 클러스터 수
+        m: PQ 부분 공간 수
+        nprobe: 질의당 탐색할 클러스터 수
+    """
+    embeddings = np.load(directory / EMBEDDINGS_FILE).astype(np.float32)
+    index = IVFPQIndex(embeddings.shape[1], nlist=nlist, m=m, nprobe=nprobe)
+    index.train(embeddings)
+    index.add(embeddings)
+    index.save(directory / INDEX_DIR)
+    logger.info(f"Species index saved: {directory / INDEX_DIR}")
+    return index
@@ -0,0 +1,315 @@
+# app/services/vector_index.py
+# CLIP 임베딩용 최근접 이웃 인덱스 (NumPy 전수 탐색 / IVF-PQ 근사 탐색, 메모리 매핑 저장)
+
+import json
+import threading
+import logging
+from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+META_FILE = "index.json"
+
+def _as_2d(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """(D,) 또는 (N, D) 입력을 float32 (N, D)로 변환"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if vectors.shape[1] != dim:
+        raise ValueError(f"벡터 차원이 다릅니다: {vectors.shape[1]} (인덱스: {dim})")
+    return vectors
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """행별 상위 k개 열 인덱스 (점수 내림차순)"""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+def _kmeans(x: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """L2 k-means (빈 클러스터는 무작위 점으로 다시 초기화)"""
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    x_norms = (x ** 2).sum(axis=1, keepdims=True)
+    for _ in range(iterations):
+        distances = x_norms - 2 * x @ centroids.T + (centroids ** 2).sum(axis=1)
+        assign = distances.argmin(axis=1)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+    return centroids
+
+def _nearest(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """각 벡터와 L2 거리가 가장 가까운 중심 인덱스"""
+    distances = -2 * x @ centroids.T + (centroids ** 2).sum(axis=1)
+    return distances.argmin(axis=1)
+
+class FlatIndex:
+    """
+    내적 기준 전수 탐색 인덱스
+
+    정규화된 벡터를 넣으면 코사인 유사도 탐색이 됩니다. 결과는 정확하지만
+    질의마다 전체 행렬을 읽으므로 수만 개 이상에서 지연 시간이 중요하면 IVFPQIndex를 사용합니다.
+    fp16 행렬은 첫 탐색 때 fp32 사본을 한 번 만들어 재사용합니다.
+    """
+
+    kind = "flat"
+    exact = True
+
+    def __init__(self, dim: int, dtype=np.float32):
+        self.dim = dim
+        self._vectors = np.empty((0, dim), dtype=dtype)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._search_matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, ids: Optional[np.ndarray] = None) -> "FlatIndex":
+        """기존 행렬(메모리 매핑 포함)을 복사 없이 감싼 인덱스"""
+        index = cls(matrix.shape[1], dtype=matrix.dtype)
+        index._vectors = matrix
+        index._ids = np.arange(len(matrix), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        return index
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        벡터 추가
+
+        Args:
+            vectors: (N, D) 벡터
+            ids: 벡터별 정수 ID (기본값: 이어지는 일련번호)
+
+        Returns:
+            np.ndarray: 추가된 벡터의 ID
+        """
+        vectors = _as_2d(vectors, self.dim).astype(self._vectors.dtype)
+        with self._lock:
+            if ids is None:
+                start = int(self._ids.max()) + 1 if len(self._ids) else 0
+                ids = np.arange(start, start + len(vectors), dtype=np.int64)
+            ids = np.asarray(ids, dtype=np.int64)
+            self._vectors = np.concatenate([self._vectors, vectors])
+            self._ids = np.concatenate([self._ids, ids])
+            self._search_matrix = None
+        return ids
+
+    def search(self, queries: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        내적이 큰 순서로 k개 탐색
+
+        Args:
+            queries: (D,) 또는 (Q, D) 질의 벡터
+            k: 반환할 이웃 수
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (점수 (Q, k), ID (Q, k))
+        """
+        queries = _as_2d(queries, self.dim)
+        vectors, ids = self._search_matrix, self._ids
+        if vectors is None or len(vectors) != len(ids):
+            vectors = np.asarray(self._vectors, dtype=np.float32)
+            self._search_matrix = vectors
+        scores = queries @ vectors.T
+        top = _top_k(scores, k)
+        return np.take_along_axis(scores, top, axis=1), ids[top]
+
+    def save(self, directory: Path) -> None:
+        """디렉토리에 저장 (load에서 메모리 매핑 가능한 .npy 형식)"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "vectors.npy", np.asarray(self._vectors))
+        np.save(directory / "ids.npy", np.asarray(self._ids))
+        with open(directory / META_FILE, "w") as f:
+            json.dump({"kind": self.kind, "dim": self.dim}, f)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "FlatIndex":
+        directory = Path(directory)
+        mode = "r" if mmap else None
+        return cls.from_matrix(
+            np.load(directory / "vectors.npy", mmap_mode=mode),
+            np.load(directory / "ids.npy", mmap_mode=mode),
+        )
+
+class IVFPQIndex:
+    """
+    IVF(역색인) + PQ(곱 양자화) 근사 탐색 인덱스
+
+    벡터를 nlist개 거친 클러스터로 나누고, 클러스터 중심과의 잔차를 m개 부분 공간별
+    256개 코드워드(uint8)로 압축합니다. 질의는 중심 점수가 높은 nprobe개 클러스터만
+    보며, 부분 공간별 내적 표(LUT)를 코드로 조회해 점수를 근사합니다.
+    내적은 <q, c + r> = <q, c> + Σ<q_j, r_j>로 분해되므로 오차는 잔차의 양자화 오차뿐입니다.
+    """
+
+    kind = "ivfpq"
+    exact = False
+
+    def __init__(self, dim: int, nlist: int = 256, m: int = 16, nprobe: int = 8):
+        if dim % m != 0:
+            raise ValueError(f"차원({dim})이 부분 공간 수({m})로 나누어 떨어져야 합니다")
+        self.dim = dim
+        self.nlist = nlist
+        self.m = m
+        self.nprobe = nprobe
+        self.dsub = dim // m
+        self.centroids: Optional[np.ndarray] = None    # (nlist, D)
+        self.codebooks: Optional[np.ndarray] = None    # (m, ksub, dsub)
+        # 클러스터 순으로 정렬된 코드/ID와 클러스터별 시작 위치 (CSR)
+        self._codes = np.empty((0, m), dtype=np.uint8)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lists = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(nlist + 1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray, iterations: int = 20, seed: int = 0) -> None:
+        """
+        거친 클러스터 중심과 PQ 코드북 학습
+
+        Args:
+            vectors: (N, D) 학습용 벡터 (보통 추가할 벡터 전체 또는 표본)
+            iterations: k-means 반복 횟수
+            seed: 난수 시드
+        """
+        vectors = _as_2d(vectors, self.dim)
+        rng = np.random.default_rng(seed)
+        self.nlist = min(self.nlist, len(vectors))
+        self._offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        self.centroids = _kmeans(vectors, self.nlist, iterations, rng)
+
+        residuals = vectors - self.centroids[_nearest(vectors, self.centroids)]
+        ksub = min(256, len(vectors))
+        self.codebooks = np.stack([
+            _kmeans(residuals[:, j * self.dsub:(j + 1) * self.dsub], ksub, iterations, rng)
+            for j in range(self.m)
+        ])
+        logger.info(f"IVF-PQ trained: nlist={self.nlist}, m={self.m}, ksub={ksub}, n={len(vectors)}")
+
+    def _encode(self, residuals: np.ndarray) -> np.ndarray:
+        codes = np.empty((len(residuals), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _nearest(residuals[:, j * self.dsub:(j + 1) * self.dsub], self.codebooks[j])
+        return codes
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        벡터 추가 (train 이후에만 가능)
+
+        Returns:
+            np.ndarray: 추가된 벡터의 ID
+        """
+        if not self.is_trained:
+            raise RuntimeError("IVF-PQ 인덱스는 add 전에 train이 필요합니다")
+        vectors = _as_2d(vectors, self.dim)
+        lists = _nearest(vectors, self.centroids)
+        codes = self._encode(vectors - self.centroids[lists])
+
+        with self._lock:
+            if ids is None:
+                start = int(self._ids.max()) + 1 if len(self._ids) else 0
+                ids = np.arange(start, start + len(vectors), dtype=np.int64)
+            ids = np.asarray(ids, dtype=np.int64)
+
+            # 클러스터 순서를 유지하도록 합친 뒤 안정 정렬
+            all_lists = np.concatenate([self._lists, lists])
+            order = np.argsort(all_lists, kind="stable")
+            self._codes = np.concatenate([self._codes, codes])[order]
+            self._ids = np.concatenate([self._ids, ids])[order]
+            self._lists = all_lists[order]
+            self._offsets = np.concatenate([[0], np.cumsum(np.bincount(self._lists, minlength=self.nlist))])
+        return ids
+
+    def search(self, queries: np.ndarray, k: int = 10,
+               nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        근사 내적 상위 k개 탐색
+
+        Args:
+            queries: (D,) 또는 (Q, D) 질의 벡터
+            k: 반환할 이웃 수
+            nprobe: 탐색할 클러스터 수 (기본값: self.nprobe)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (근사 점수 (Q, k), ID (Q, k)), 후보가 k개보다 적으면 ID -1
+        """
+        queries = _as_2d(queries, self.dim)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        codes, ids, offsets = self._codes, self._ids, self._offsets
+
+        coarse = queries @ self.centroids.T
+        probes = _top_k(coarse, nprobe)
+        # (Q, m, ksub) 부분 공간별 내적 표
+        luts = np.einsum("qmd,mkd->qmk", queries.reshape(len(queries), self.m, self.dsub), self.codebooks)
+        sub = np.arange(self.m)
+
+        out_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        out_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for qi in range(len(queries)):
+            rows = np.concatenate([np.arange(offsets[l], offsets[l + 1]) for l in probes[qi]])
+            if len(rows) == 0:
+                continue
+            row_lists = np.repeat(probes[qi], np.diff(offsets)[probes[qi]])
+            scores = coarse[qi, row_lists] + luts[qi][sub, codes[rows]].sum(axis=1)
+            top = _top_k(scores[None], k)[0]
+            out_scores[qi, :len(top)] = scores[top]
+            out_ids[qi, :len(top)] = ids[rows[top]]
+        return out_scores, out_ids
+
+    def save(self, directory: Path) -> None:
+        """디렉토리에 저장 (코드/ID는 load에서 메모리 매핑 가능)"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "centroids.npy", self.centroids)
+        np.save(directory / "codebooks.npy", self.codebooks)
+        np.save(directory / "codes.npy", np.asarray(self._codes))
+        np.save(directory / "ids.npy", np.asarray(self._ids))
+        np.save(directory / "lists.npy", np.asarray(self._lists))
+        with open(directory / META_FILE, "w") as f:
+            json.dump({"kind": self.kind, "dim": self.dim, "nlist": self.nlist,
+                       "m": self.m, "nprobe": self.nprobe}, f)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "IVFPQIndex":
+        directory = Path(directory)
+        with open(directory / META_FILE) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        index = cls(meta["dim"], meta["nlist"], meta["m"], meta["nprobe"])
+        index.centroids = np.load(directory / "centroids.npy")
+        index.codebooks = np.load(directory / "codebooks.npy")
+        index._codes = np.load(directory / "codes.npy", mmap_mode=mode)
+        index._ids = np.load(directory / "ids.npy", mmap_mode=mode)
+        index._lists = np.load(directory / "lists.npy", mmap_mode=mode)
+        index._offsets = np.concatenate([[0], np.cumsum(np.bincount(index._lists, minlength=index.nlist))])
+        return index
+
+_INDEX_TYPES = {FlatIndex.kind: FlatIndex, IVFPQIndex.kind: IVFPQIndex}
+
+def load_index(directory: Path, mmap: bool = True):
+    """
+    저장된 인덱스 로드 (종류는 메타데이터로 판별)
+
+    Args:
+        directory: save()로 저장한 디렉토리
+        mmap: 큰 배열을 메모리 매핑으로 열지 여부
+    """
+    with open(Path(directory) / META_FILE) as f:
+        kind = json.load(f)["kind"]
+    if kind not in _INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 종류입니다: {kind}")
+    return _INDEX_TYPES[kind].load(directory, mmap)
@@ -0,0 +1,110 @@
+# app/services/warmup.py
+# 서버 시작 후 백그라운드에서 모델을 로드하고 합성 입력으로 예열하는 준비 상태 관리
+
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional
+import numpy as np
+from PIL import Image
+from app.config import MODEL_WARMUP, WARMUP_ITERATIONS
+from app.services.metrics import metrics
+from app.services.model_registry import model_registry
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+class WarmupState:
+    """
+    모델 로드/예열 진행 상태
+
+    status는 pending -> loading -> warming -> ready 순서로 바뀌며,
+    실패하면 failed로 남아 /readyz가 계속 503을 반환합니다.
+    """
+
+    def __init__(self):
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def set(self, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = status
+            self.error = error
+            if status == "loading":
+                self.started_at = time.time()
+            elif status in ("ready", "failed"):
+                self.finished_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            duration = (
+                self.finished_at - self.started_at
+                if self.started_at and self.finished_at else None
+            )
+            return {
+                "status": self.status,
+                "error": self.error,
+                "duration_sec": round(duration, 2) if duration is not None else None,
+            }
+
+def _synthetic_image(width: int = 640, height: int = 480) -> Image.Image:
+    """예열용 무작위 RGB 이미지"""
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+def run_warmup(pipeline, iterations: int = WARMUP_ITERATIONS) -> None:
+    """
+    분석 파이프라인이 쓰는 모델을 로드하고 합성 입력으로 전체 경로를 실행
+
+    임베딩 캐시를 오염시키지 않도록 백엔드 인코더를 직접 호출하며,
+    분류 단계에서 CLIP 텍스트 특징(종 어휘가 없을 때)도 함께 계산됩니다.
+    추론 워커 프로세스 풀을 쓰면 워커들의 예열 완료를 기다립니다.
+
+    Args:
+        pipeline: AnalysisPipeline 인스턴스
+        iterations: 예열 반복 횟수
+    """
+    sam, classifier = pipeline.sam, pipeline.classifier
+    try:
+        warmup_state.set("loading")
+        pool = pipeline.process_pool
+        if pool is not None and pool.running:
+            # 세그멘테이션 경로는 워커 프로세스가 각자 모델을 로드하고 예열하므로 준비만 기다림
+            if not pool.wait_ready():
+                raise RuntimeError(f"Inference workers failed to start: {pool.error}")
+            if pipeline.cascade:
+                model_registry.warmup(classifier.required_models)
+            warmup_state.set("ready")
+            logger.info(f"Inference workers ready in {warmup_state.snapshot()['duration_sec']}s")
+            return
+
+        model_registry.warmup(sam.required_models + classifier.required_models)
+
+        warmup_state.set("warming")
+        image = _synthetic_image()
+        for _ in range(max(1, iterations)):
+            started = time.perf_counter()
+            embedding = sam.backend.sam_encode(sam.transform(image).unsqueeze(0).to(sam.device))
+            mask, _ = sam.segment_low_res(embedding, image)
+            cropped = classifier.crop_animal_region(image, mask)
+            classifier.classify_features(classifier.encode_images([cropped])[0])
+            metrics.histogram("warmup.pass_ms").observe((time.perf_counter() - started) * 1000)
+
+        warmup_state.set("ready")
+        logger.info(f"Model warmup completed in {warmup_state.snapshot()['duration_sec']}s")
+    except Exception as e:
+        logger.error(f"Model warmup failed: {str(e)}")
+        warmup_state.set("failed", str(e))
+
+# 전역 인스턴스 생성 (예열을 끄면 첫 요청 시 지연 로드하며 바로 준비 상태)
+warmup_state = WarmupState()
+if not MODEL_WARMUP:
+    warmup_state.set("ready")
+metrics.register_collector("warmup", warmup_state.snapshot)
@@ -0,0 +1,120 @@
+# scripts/benchmark_hierarchical.py
+# 어휘 크기별로 평면 분류와 2단계(과 -> 종) 분류의 지연 시간과 정확도 비교
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+
+from app.config import CLASSIFIER_TOP_FAMILIES
+from app.services.image_ingest import decode_image
+from app.services.classifier_service import AnimalClassifier
+from app.services.species_vocabulary import SpeciesVocabulary, Species
+from app.services.hierarchical_classifier import HierarchicalVocabulary
+
+# 로깅 설정
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BenchmarkHierarchical")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+def resize_vocabulary(vocabulary: SpeciesVocabulary, size: int, rng: np.random.Generator) -> SpeciesVocabulary:
+    """
+    어휘 크기 조정
+
+    실제 종 수보다 작으면 무작위로 일부 종을 고르고, 크면 무작위 단위 벡터의
+    가상 종(10종씩 가상 과로 묶음)을 덧붙여 큰 어휘에서의 지연 시간을 측정합니다.
+    """
+    if size <= len(vocabulary):
+        return vocabulary.subset(np.sort(rng.choice(len(vocabulary), size, replace=False)))
+
+    extra = size - len(vocabulary)
+    dim = vocabulary.embeddings.shape[1]
+    synthetic = rng.standard_normal((extra, dim)).astype(np.float32)
+    synthetic /= np.linalg.norm(synthetic, axis=-1, keepdims=True)
+    embeddings = np.concatenate([np.asarray(vocabulary.embeddings), synthetic.astype(np.float16)])
+    # family_name()이 마지막 단어를 쓰므로 가상 과 이름을 마지막에 둠
+    species = vocabulary.species + [
+        Species(f"species{i} synthetic{i // 10}", None, None) for i in range(extra)
+    ]
+    return SpeciesVocabulary(embeddings, species)
+
+def expected_label(path: Path, labels: set):
+    """상위 디렉토리 이름이 종 이름과 같으면 정답 레이블로 사용"""
+    label = f"a {' '.join(path.parent.name.replace('_', ' ').lower().split())}"
+    return label if label in labels else None
+
+def _time_top1(scorer, features: np.ndarray):
+    predictions, samples = [], []
+    for feature in features:
+        started = time.perf_counter()
+        predictions.append(scorer.top_k(feature, k=1)[0][0])
+        samples.append((time.perf_counter() - started) * 1000)
+    return predictions, np.array(samples)
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="평면 분류 대비 2단계 분류 지연 시간/정확도 비교")
+    parser.add_argument("images", type=str, help="평가용 이미지 디렉토리 (하위 폴더 이름이 종 이름이면 정확도도 계산)")
+    parser.add_argument("--sizes", type=str, default="50,100,200,full,1000,5000,20000",
+                        help="어휘 크기 목록 (full: 전체 종, 전체보다 크면 가상 종 추가)")
+    parser.add_argument("--top-families", type=int, default=CLASSIFIER_TOP_FAMILIES,
+                        help=f"2단계에서 펼칠 상위 과 수 (기본값: {CLASSIFIER_TOP_FAMILIES})")
+    parser.add_argument("--limit", type=int, default=200, help="사용할 최대 이미지 수 (기본값: 200)")
+    parser.add_argument("--seed", type=int, default=0, help="어휘 샘플링 시드")
+
+    args = parser.parse_args()
+
+    classifier = AnimalClassifier()
+    if classifier.vocabulary is None:
+        logger.error("종 어휘 파일이 없습니다. 먼저 scripts/build_species_embeddings.py를 실행하세요.")
+        sys.exit(1)
+    vocabulary = classifier.vocabulary
+
+    paths = sorted(p for p in Path(args.images).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)[:args.limit]
+    if not paths:
+        logger.error(f"이미지를 찾을 수 없습니다: {args.images}")
+        sys.exit(1)
+
+    # 이미지 특징은 한 번만 계산 (전체 이미지 기준)
+    features = np.concatenate([
+        classifier.encode_images([decode_image(p.read_bytes()).image for p in paths[i:i + 32]]).float().cpu().numpy()
+        for i in range(0, len(paths), 32)
+    ])
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{len(paths)} images, top families: {args.top_families}\n")
+    print(f"{'vocab':>6} | {'families':>8} | {'flat ms':>8} | {'hier ms':>8} | {'speedup':>7} | "
+          f"{'agree':>6} | {'flat acc':>8} | {'hier acc':>8}")
+    for size_arg in args.sizes.split(","):
+        size = len(vocabulary) if size_arg.strip() == "full" else int(size_arg)
+        sized = resize_vocabulary(vocabulary, size, rng)
+        hierarchical = HierarchicalVocabulary(sized, args.top_families)
+
+        flat_pred, flat_ms = _time_top1(sized, features)
+        hier_pred, hier_ms = _time_top1(hierarchical, features)
+        agree = np.mean([a == b for a, b in zip(flat_pred, hier_pred)])
+
+        # 정답 레이블이 있고 현재 어휘에 포함된 이미지만 정확도 계산
+        labels = set(sized.labels)
+        truth = [expected_label(p, labels) for p in paths]
+        scored = [i for i, label in enumerate(truth) if label]
+        if scored:
+            flat_acc = f"{np.mean([flat_pred[i] == truth[i] for i in scored]):>7.1%}"
+            hier_acc = f"{np.mean([hier_pred[i] == truth[i] for i in scored]):>7.1%}"
+        else:
+            flat_acc = hier_acc = "n/a"
+
+        print(f"{size:>6} | {len(hierarchical.families):>8} | {flat_ms.mean():>8.3f} | {hier_ms.mean():>8.3f} | "
+              f"{flat_ms.mean() / hier_ms.mean():>6.2f}x | {agree:>5.1%} | {flat_acc:>8} | {hier_acc:>8}")
+
+if __name__ == "__main__":
+    main()
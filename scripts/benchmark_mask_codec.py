@@ -0,0 +1,102 @@
+# scripts/benchmark_mask_codec.py
+# 마스크 저장/전송 형식별 크기와 인코딩/디코딩 시간 비교 (PNG, npy, COCO RLE, 비트 패킹)
+
+import io
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+
+from app.services.mask_codec import encode_mask, decode_mask, load_mask_file
+
+# 로깅 설정
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BenchmarkMaskCodec")
+
+def synthetic_masks(count: int, width: int, height: int):
+    """동물 형태를 흉내 낸 타원 여러 개를 합친 마스크"""
+    rng = np.random.default_rng(0)
+    ys, xs = np.mgrid[:height, :width]
+    masks = []
+    for _ in range(count):
+        mask = np.zeros((height, width), dtype=bool)
+        for _ in range(rng.integers(1, 5)):
+            cx, cy = rng.uniform(0.2, 0.8) * width, rng.uniform(0.2, 0.8) * height
+            rx, ry = rng.uniform(0.05, 0.3) * width, rng.uniform(0.05, 0.3) * height
+            mask |= ((xs - cx) / rx) ** 2 + ((ys - cy) / ry) ** 2 <= 1
+        masks.append(mask)
+    return masks
+
+def png_bytes(mask: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray((mask * 255).astype(np.uint8)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def npy_bytes(mask: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, mask)
+    return buffer.getvalue()
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="마스크 형식별 크기와 속도 비교")
+    parser.add_argument("--masks", type=str, default="", help="기존 마스크 디렉토리 (.npy/.png, 기본값: 합성 마스크)")
+    parser.add_argument("--count", type=int, default=50, help="합성 마스크 수 (기본값: 50)")
+    parser.add_argument("--size", type=str, default="1024x768", help="합성 마스크 크기 (기본값: 1024x768)")
+
+    args = parser.parse_args()
+
+    if args.masks:
+        paths = sorted(p for p in Path(args.masks).rglob("*") if p.suffix in (".npy", ".png"))
+        masks = [load_mask_file(p) for p in paths]
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        masks = synthetic_masks(args.count, width, height)
+    if not masks:
+        logger.error(f"마스크를 찾을 수 없습니다: {args.masks}")
+        sys.exit(1)
+
+    print(f"{len(masks)} masks, {masks[0].shape[1]}x{masks[0].shape[0]}\n")
+    print(f"{'format':>6} | {'avg size':>10} | {'vs npy':>7} | {'encode ms':>9} | {'decode ms':>9}")
+    baseline = np.mean([len(npy_bytes(m)) for m in masks])
+    for name in ("npy", "png", "rle", "bits"):
+        sizes, encode_ms, decode_ms = [], [], []
+        for mask in masks:
+            started = time.perf_counter()
+            if name == "npy":
+                payload = npy_bytes(mask)
+            elif name == "png":
+                payload = png_bytes(mask)
+            else:
+                encoded = encode_mask(mask, name)
+                payload = (encoded.get("counts") or encoded["bits"]).encode("ascii")
+            encode_ms.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(payload))
+
+            started = time.perf_counter()
+            if name == "npy":
+                decoded = np.load(io.BytesIO(payload))
+            elif name == "png":
+                decoded = np.asarray(Image.open(io.BytesIO(payload))) > 127
+            else:
+                decoded = decode_mask(encoded)
+            decode_ms.append((time.perf_counter() - started) * 1000)
+            if not np.array_equal(decoded, mask):
+                logger.error(f"{name} round trip mismatch")
+                sys.exit(1)
+
+        size = np.mean(sizes)
+        print(f"{name:>6} | {size / 1024:>8.1f}KB | {baseline / size:>6.0f}x | "
+              f"{np.mean(encode_ms):>9.2f} | {np.mean(decode_ms):>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# scripts/benchmark_near_duplicate.py
+# 지각 해시(pHash, dHash)별로 재인코딩된 같은 사진과 다른 사진의 해밍 거리 분포, 임계값별 재현율/오탐률, BK-tree 조회 시간 비교
+
+import io
+import sys
+import time
+import random
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+
+from app.services.image_ingest import decode_image
+from app.services.image_hashing import perceptual_hash, hamming_distance
+from app.services.near_duplicate import BKTree
+
+# 로깅 설정
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BenchmarkNearDuplicate")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+def reencoded_variants(image: Image.Image):
+    """메신저 전송처럼 크기 조정/재압축된 사본"""
+    variants = []
+    for scale, quality in ((0.5, 85), (0.25, 70), (1.0, 50)):
+        resized = image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))), Image.BILINEAR)
+        buffer = io.BytesIO()
+        resized.save(buffer, format="JPEG", quality=quality)
+        variants.append(decode_image(buffer.getvalue()).image)
+    return variants
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="지각 해시 근사 중복 판정 비교")
+    parser.add_argument("images", type=str, help="이미지 디렉토리")
+    parser.add_argument("--limit", type=int, default=200, help="사용할 최대 이미지 수 (기본값: 200)")
+    parser.add_argument("--thresholds", type=str, default="2,4,6,8,10,12", help="비교할 해밍 거리 임계값 (쉼표 구분)")
+    parser.add_argument("--index-size", type=int, default=10000, help="조회 시간 측정용 BK-tree 항목 수 (기본값: 10000)")
+
+    args = parser.parse_args()
+    thresholds = [int(v) for v in args.thresholds.split(",")]
+
+    paths = sorted(p for p in Path(args.images).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)[:args.limit]
+    if len(paths) < 2:
+        logger.error(f"이미지가 두 장 이상 필요합니다: {args.images}")
+        sys.exit(1)
+    images = [decode_image(p.read_bytes()).image for p in paths]
+    variants = [reencoded_variants(image) for image in images]
+
+    print(f"{len(images)} images, {sum(len(v) for v in variants)} re-encoded copies\n")
+    for method in ("phash", "dhash"):
+        started = time.perf_counter()
+        hashes = [perceptual_hash(image, method) for image in images]
+        hash_ms = (time.perf_counter() - started) * 1000 / len(images)
+        same = [hamming_distance(h, perceptual_hash(v, method)) for h, vs in zip(hashes, variants) for v in vs]
+        different = [hamming_distance(a, b) for i, a in enumerate(hashes) for b in hashes[i + 1:]]
+
+        # 실제 해시에 무작위 해시를 섞어 index_size 항목의 트리 구성 후 조회 시간 측정
+        tree = BKTree()
+        for value in hashes + [random.getrandbits(64) for _ in range(max(0, args.index_size - len(hashes)))]:
+            tree.add(value)
+        started = time.perf_counter()
+        for value in hashes:
+            tree.search(value, max(thresholds))
+        lookup_ms = (time.perf_counter() - started) * 1000 / len(hashes)
+
+        print(f"[{method}] hash {hash_ms:.2f}ms/image, lookup {lookup_ms:.3f}ms ({tree.size} nodes, d<={max(thresholds)})")
+        print(f"  same photo distance: mean {np.mean(same):.1f}, p95 {np.percentile(same, 95):.0f}")
+        print(f"  different photo distance: mean {np.mean(different):.1f}, p5 {np.percentile(different, 5):.0f}")
+        print(f"  {'threshold':>9} | {'recall':>7} | {'false match':>11}")
+        for threshold in thresholds:
+            recall = np.mean([d <= threshold for d in same])
+            false_match = np.mean([d <= threshold for d in different])
+            print(f"  {threshold:>9} | {recall:>7.3f} | {false_match:>11.4f}")
+        print()
+
+if __name__ == "__main__":
+    main()
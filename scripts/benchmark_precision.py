@@ -0,0 +1,145 @@
+# scripts/benchmark_precision.py
+# 추론 정밀도(fp32 / int8 / bf16)별 분류 일치율과 지연 시간, 메모리 사용량 비교
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+sys.path.append(str(ROOT_PATH / 'external' / 'MobileSAM'))
+
+from app.services.model_registry import model_registry
+from app.services.inference_backend import PRECISIONS
+from app.services.image_ingest import decode_image
+from app.services.sam_service import SamService
+from app.services.classifier_service import AnimalClassifier
+
+# 로깅 설정
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BenchmarkPrecision")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+def read_rss_mb() -> float:
+    """현재 프로세스의 RSS (MB, /proc를 읽을 수 없으면 nan)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+def run_mode(precision: str, images: list) -> dict:
+    """
+    한 정밀도로 모든 이미지를 분석 (중앙점 세그멘테이션 -> 크롭 -> CLIP 분류)
+
+    Args:
+        precision: "fp32", "int8" 또는 "bf16"
+        images: 디코딩된 이미지 리스트
+
+    Returns:
+        dict: 이미지별 분류/마스크 결과, 단계별 지연 시간, 메모리 사용량
+    """
+    rss_before = read_rss_mb()
+    sam = SamService(backend="torch", precision=precision)
+    classifier = AnimalClassifier(backend="torch", precision=precision)
+    model_registry.warmup([sam.model_name, classifier.model_name])
+    classifier.text_features
+    rss_after = read_rss_mb()
+
+    timings = {"sam_encode": [], "sam_decode": [], "clip": []}
+    classes, masks = [], []
+    for decoded in images:
+        image = decoded.image
+        width, height = image.size
+
+        started = time.perf_counter()
+        embedding = sam.encode_images([image])
+        timings["sam_encode"].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        mask, _ = sam.predict_low_res_masks(embedding, (width, height), points=[(width / 2, height / 2)], labels=[1])
+        timings["sam_decode"].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        result = classifier.classify_animal(image, mask[0])
+        timings["clip"].append((time.perf_counter() - started) * 1000)
+
+        classes.append(result["class"])
+        masks.append(mask[0])
+
+    stats = model_registry.stats()
+    return {
+        "classes": classes,
+        "masks": masks,
+        "timings": {stage: np.array(values) for stage, values in timings.items()},
+        "model_mb": stats[sam.model_name]["memory_mb"] + stats[classifier.model_name]["memory_mb"],
+        "rss_delta_mb": rss_after - rss_before,
+    }
+
+def _mask_iou(a: np.ndarray, b: np.ndarray) -> float:
+    union = np.logical_or(a, b).sum()
+    return float(np.logical_and(a, b).sum() / union) if union else 1.0
+
+def print_report(results: dict) -> None:
+    """fp32 대비 정확도 표와 지연 시간 표 출력"""
+    reference = results["fp32"]
+
+    print("\n[정확도] fp32 대비")
+    print(f"{'mode':>5} | {'top-1 agree':>11} | {'mask IoU':>8}")
+    for mode, result in results.items():
+        agree = np.mean([a == b for a, b in zip(result["classes"], reference["classes"])])
+        iou = np.mean([_mask_iou(a, b) for a, b in zip(result["masks"], reference["masks"])])
+        print(f"{mode:>5} | {agree:>10.1%} | {iou:>8.4f}")
+
+    print("\n[지연 시간] 이미지당 평균 ms (p95)")
+    print(f"{'mode':>5} | {'sam_encode':>16} | {'sam_decode':>16} | {'clip':>16} | {'total':>8} | {'model MB':>8} | {'RSS +MB':>8}")
+    for mode, result in results.items():
+        cells = [
+            f"{values.mean():>7.1f} ({np.percentile(values, 95):>6.1f})"
+            for values in result["timings"].values()
+        ]
+        total = sum(values.mean() for values in result["timings"].values())
+        print(f"{mode:>5} | {' | '.join(f'{cell:>16}' for cell in cells)} | {total:>8.1f} | "
+              f"{result['model_mb']:>8.1f} | {result['rss_delta_mb']:>8.1f}")
+    print("\n* RSS +MB는 앞선 모드가 이미 로드한 모델을 제외한 증가분입니다 (bf16은 fp32 모델을 공유).")
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="추론 정밀도별 정확도/지연 시간 비교")
+    parser.add_argument("images", type=str, help="비교용 이미지 디렉토리")
+    parser.add_argument("--modes", type=str, default=",".join(PRECISIONS),
+                        help="비교할 정밀도 목록 (기본값: fp32,int8,bf16)")
+    parser.add_argument("--limit", type=int, default=100, help="사용할 최대 이미지 수 (기본값: 100)")
+
+    args = parser.parse_args()
+
+    paths = sorted(p for p in Path(args.images).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)[:args.limit]
+    if not paths:
+        logger.error(f"이미지를 찾을 수 없습니다: {args.images}")
+        sys.exit(1)
+    images = [decode_image(p.read_bytes()) for p in paths]
+
+    # 정확도는 항상 fp32 기준으로 비교
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    if "fp32" not in modes:
+        modes.insert(0, "fp32")
+
+    results = {}
+    for mode in modes:
+        print(f"Running {mode} on {len(images)} images...")
+        results[mode] = run_mode(mode, images)
+
+    print_report(results)
+
+if __name__ == "__main__":
+    main()
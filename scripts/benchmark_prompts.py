@@ -0,0 +1,67 @@
+# scripts/benchmark_prompts.py
+# 프롬프트 모드(center, grid, saliency)별 마스크 디코딩 지연 시간과 선택된 마스크의 예측 IoU 비교
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+sys.path.append(str(ROOT_PATH / 'external' / 'MobileSAM'))
+
+from app.services.image_ingest import decode_image
+from app.services.sam_service import SamService
+from app.services.prompt_points import PROMPT_MODES, candidate_points
+
+# 로깅 설정
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BenchmarkPrompts")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="프롬프트 모드별 마스크 디코딩 비교")
+    parser.add_argument("images", type=str, help="이미지 디렉토리")
+    parser.add_argument("--limit", type=int, default=50, help="사용할 최대 이미지 수 (기본값: 50)")
+    parser.add_argument("--runs", type=int, default=5, help="이미지당 디코딩 반복 횟수 (기본값: 5)")
+
+    args = parser.parse_args()
+
+    paths = sorted(p for p in Path(args.images).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)[:args.limit]
+    if not paths:
+        logger.error(f"이미지를 찾을 수 없습니다: {args.images}")
+        sys.exit(1)
+
+    sam = SamService()
+    results = {mode: {"decode_ms": [], "points_ms": [], "iou": [], "points": []} for mode in PROMPT_MODES}
+    for path in paths:
+        decoded = decode_image(path.read_bytes())
+        embedding = sam.encode_images([decoded.image], [decoded.content_hash])
+        for mode in PROMPT_MODES:
+            started = time.perf_counter()
+            points = candidate_points(decoded.image, mode)
+            results[mode]["points_ms"].append((time.perf_counter() - started) * 1000)
+            results[mode]["points"].append(len(points))
+
+            sam.segment_low_res(embedding, decoded.image, mode)  # 첫 실행 제외
+            started = time.perf_counter()
+            for _ in range(args.runs):
+                _, score = sam.segment_low_res(embedding, decoded.image, mode)
+            results[mode]["decode_ms"].append((time.perf_counter() - started) * 1000 / args.runs)
+            results[mode]["iou"].append(score)
+
+    print(f"{len(paths)} images\n")
+    print(f"{'mode':>8} | {'points':>6} | {'points ms':>9} | {'decode ms':>9} | {'pred IoU':>8}")
+    for mode, r in results.items():
+        print(f"{mode:>8} | {np.mean(r['points']):>6.1f} | {np.mean(r['points_ms']):>9.2f} | "
+              f"{np.mean(r['decode_ms']):>9.2f} | {np.mean(r['iou']):>8.3f}")
+
+if __name__ == "__main__":
+    main()
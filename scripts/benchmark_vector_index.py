@@ -0,0 +1,75 @@
+# scripts/benchmark_vector_index.py
+# 벡터 수별 전수 탐색(FlatIndex)과 IVF-PQ 근사 탐색의 질의 지연 시간과 recall 비교
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+import numpy as np
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+
+from app.services.vector_index import FlatIndex, IVFPQIndex, load_index
+
+def _random_unit(rng: np.random.Generator, n: int, dim: int, clusters: int = 200) -> np.ndarray:
+    """군집 구조가 있는 정규화 벡터 (실제 CLIP 임베딩처럼 균일하지 않은 분포)"""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def _time_queries(index, queries: np.ndarray, k: int):
+    ids, samples = [], []
+    for query in queries:
+        started = time.perf_counter()
+        _, found = index.search(query, k)
+        samples.append((time.perf_counter() - started) * 1000)
+        ids.append(found[0])
+    return np.array(ids), np.array(samples)
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="벡터 인덱스 지연 시간/recall 비교")
+    parser.add_argument("--sizes", type=str, default="1000,10000,50000", help="벡터 수 목록")
+    parser.add_argument("--dim", type=int, default=512, help="벡터 차원 (기본값: 512, CLIP ViT-B/32)")
+    parser.add_argument("--queries", type=int, default=200, help="질의 수 (기본값: 200)")
+    parser.add_argument("--k", type=int, default=10, help="반환할 이웃 수 (기본값: 10)")
+    parser.add_argument("--nlist", type=int, default=256, help="IVF 클러스터 수 (기본값: 256)")
+    parser.add_argument("--m", type=int, default=16, help="PQ 부분 공간 수 (기본값: 16)")
+    parser.add_argument("--nprobe", type=int, default=8, help="질의당 탐색할 클러스터 수 (기본값: 8)")
+
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"{'n':>7} | {'index':>6} | {'p50 ms':>7} | {'p95 ms':>7} | {f'recall@{args.k}':>9} | {'MB':>7}")
+    for n in (int(size) for size in args.sizes.split(",")):
+        vectors = _random_unit(rng, n, args.dim)
+        queries = _random_unit(rng, args.queries, args.dim)
+
+        flat = FlatIndex(args.dim)
+        flat.add(vectors)
+        ivfpq = IVFPQIndex(args.dim, nlist=args.nlist, m=args.m, nprobe=args.nprobe)
+        ivfpq.train(vectors[:min(n, 20000)])
+        ivfpq.add(vectors)
+
+        # 저장 후 메모리 매핑으로 다시 열어 측정
+        with tempfile.TemporaryDirectory() as tmp:
+            results = {}
+            for index in (flat, ivfpq):
+                index.save(Path(tmp) / index.kind)
+                loaded = load_index(Path(tmp) / index.kind, mmap=True)
+                loaded.search(queries[0], args.k)  # 첫 탐색 (fp32 사본/페이지 적재) 제외
+                results[index.kind] = _time_queries(loaded, queries, args.k)
+                size_mb = sum(f.stat().st_size for f in (Path(tmp) / index.kind).iterdir()) / 1024 ** 2
+                found, samples = results[index.kind]
+                truth = results["flat"][0]
+                recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, truth)])
+                print(f"{n:>7} | {index.kind:>6} | {np.percentile(samples, 50):>7.3f} | "
+                      f"{np.percentile(samples, 95):>7.3f} | {recall:>9.3f} | {size_mb:>7.1f}")
+
+if __name__ == "__main__":
+    main()
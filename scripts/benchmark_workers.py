@@ -0,0 +1,97 @@
+# scripts/benchmark_workers.py
+# 추론 워커 프로세스 수에 따른 세그멘테이션 + 분류 처리량 측정
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+sys.path.append(str(ROOT_PATH / 'external' / 'MobileSAM'))
+
+from app.services.image_ingest import DecodedImage, decode_image
+from app.services.process_pool import ProcessInferencePool
+
+# 로깅 설정
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BenchmarkWorkers")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+def load_images(directory: str, count: int, width: int, height: int):
+    """측정용 이미지 (디렉토리가 없으면 임베딩 캐시에 걸리지 않도록 서로 다른 무작위 이미지)"""
+    if directory:
+        paths = sorted(p for p in Path(directory).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+        return [decode_image(p.read_bytes()) for p in paths[:count]]
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        image = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+        images.append(DecodedImage(image, image.size))
+    return images
+
+async def run_all(pool: ProcessInferencePool, images) -> float:
+    """모든 이미지를 동시에 제출하고 전체 소요 시간(초) 반환"""
+    started = time.perf_counter()
+    await asyncio.gather(*(pool.analyze(image) for image in images))
+    return time.perf_counter() - started
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="추론 워커 프로세스 수별 처리량 측정")
+    parser.add_argument("--workers", type=str, default="1,2,4", help="비교할 워커 프로세스 수 목록")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="워커당 torch 스레드 수 (기본값: 0, 코어 수 / 워커 수)")
+    parser.add_argument("--batch", type=int, default=4, help="워커가 한 번에 처리할 최대 이미지 수 (기본값: 4)")
+    parser.add_argument("--images", type=int, default=64, help="측정 이미지 수 (기본값: 64)")
+    parser.add_argument("--image-dir", type=str, default="", help="측정에 사용할 이미지 디렉토리 (기본값: 무작위 이미지)")
+    parser.add_argument("--size", type=str, default="640x480", help="무작위 이미지 크기 (기본값: 640x480)")
+    parser.add_argument("--backend", type=str, default="torch", choices=["torch", "onnx"], help="추론 백엔드")
+    parser.add_argument("--precision", type=str, default="fp32", choices=["fp32", "int8", "bf16"], help="추론 정밀도")
+
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    images = load_images(args.image_dir, args.images, width, height)
+    if not images:
+        logger.error(f"이미지를 찾을 수 없습니다: {args.image_dir}")
+        sys.exit(1)
+
+    print(f"{len(images)} images, {os.cpu_count()} CPUs, backend {args.backend}/{args.precision}\n")
+    print(f"{'workers':>7} | {'threads':>7} | {'startup s':>9} | {'img/s':>7} | {'speedup':>7} | {'efficiency':>10}")
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        pool = ProcessInferencePool(
+            workers=workers, threads=args.threads, max_batch=args.batch,
+            max_queue=len(images), backend=args.backend, precision=args.precision,
+        )
+        started = time.perf_counter()
+        pool.start()
+        if not pool.wait_ready():
+            logger.error(f"워커 시작 실패: {pool.error}")
+            pool.shutdown()
+            sys.exit(1)
+        startup = time.perf_counter() - started
+        try:
+            elapsed = asyncio.run(run_all(pool, images))
+        finally:
+            pool.shutdown()
+
+        throughput = len(images) / elapsed
+        if baseline is None:
+            baseline = throughput / workers
+        speedup = throughput / baseline
+        print(f"{workers:>7} | {pool.threads:>7} | {startup:>9.1f} | {throughput:>7.2f} | "
+              f"{speedup:>6.2f}x | {speedup / workers:>9.0%}")
+
+if __name__ == "__main__":
+    main()
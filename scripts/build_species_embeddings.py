@@ -0,0 +1,49 @@
+# scripts/build_species_embeddings.py
+# animals 테이블의 전체 종 이름을 CLIP 텍스트 임베딩 행렬(fp16)로 미리 계산하여 저장
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+
+from app.config import DB_PATH, SPECIES_EMBEDDINGS_DIR
+from app.services.model_registry import model_registry
+from app.services.species_vocabulary import read_species, build_species_vocabulary, build_species_index
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("SpeciesEmbeddings")
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="전체 종 어휘 CLIP 텍스트 임베딩 생성")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="동물 데이터베이스 경로")
+    parser.add_argument("--output", type=Path, default=SPECIES_EMBEDDINGS_DIR, help="저장 디렉토리")
+    parser.add_argument("--batch-size", type=int, default=256, help="텍스트 인코딩 배치 크기 (기본값: 256)")
+    parser.add_argument("--ivfpq", action="store_true", help="IVF-PQ 근사 인덱스도 학습하여 저장 (SPECIES_INDEX=ivfpq에서 사용)")
+    parser.add_argument("--nlist", type=int, default=64, help="IVF 클러스터 수 (기본값: 64)")
+    parser.add_argument("--m", type=int, default=16, help="PQ 부분 공간 수 (기본값: 16)")
+    parser.add_argument("--nprobe", type=int, default=8, help="질의당 탐색할 클러스터 수 (기본값: 8)")
+
+    args = parser.parse_args()
+
+    species = read_species(args.db)
+    if not species:
+        logger.error(f"animals 테이블에 종이 없습니다: {args.db}")
+        sys.exit(1)
+    logger.info(f"{len(species)}개 종의 텍스트 임베딩 계산 중...")
+
+    model = model_registry.get("clip")[0]
+    build_species_vocabulary(model, species, args.output, batch_size=args.batch_size)
+
+    if args.ivfpq:
+        build_species_index(args.output, nlist=args.nlist, m=args.m, nprobe=args.nprobe)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# scripts/convert_weights.py
+# MobileSAM/CLIP 가중치를 메모리 매핑용 체크포인트로 변환하고, 워커 수별 로드 시간과 메모리(RSS/PSS) 측정
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import subprocess
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+sys.path.append(str(ROOT_PATH / 'external' / 'MobileSAM'))
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ConvertWeights")
+
+def read_memory(pid: int) -> dict:
+    """/proc/<pid>/smaps_rollup의 RSS, PSS(공유 페이지를 공유 프로세스 수로 나눈 값), 공유/전용 페이지 (MB)"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(fields.get("Rss", 0), 1),
+        "pss_mb": round(fields.get("Pss", 0), 1),
+        "shared_mb": round(fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0), 1),
+        "private_mb": round(fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), 1),
+    }
+
+def run_convert(args: argparse.Namespace) -> None:
+    """원본 가중치를 로드해 fp32 연속 텐서 체크포인트로 저장"""
+    os.environ["MODEL_MMAP_WEIGHTS"] = "false"  # 원본 가중치에서 로드
+    from app.services.model_registry import model_registry
+    from app.services.mmap_weights import SAM_MMAP_WEIGHTS, CLIP_MMAP_WEIGHTS, save_mmap_checkpoint
+
+    output = Path(args.output) if args.output else None
+    sam = model_registry.get("mobile_sam")
+    save_mmap_checkpoint(sam, output / SAM_MMAP_WEIGHTS.name if output else SAM_MMAP_WEIGHTS, "mobile_sam_vit_t")
+    clip_model = model_registry.get("clip")[0]
+    save_mmap_checkpoint(clip_model, output / CLIP_MMAP_WEIGHTS.name if output else CLIP_MMAP_WEIGHTS, "clip_ViT-B/32")
+
+def run_probe(args: argparse.Namespace) -> None:
+    """
+    (benchmark에서 실행하는 하위 프로세스) 모델을 로드하고 가중치 페이지를 모두 읽은 뒤 대기
+
+    mmap은 읽은 페이지만 올라가므로 추론과 같은 조건으로 비교하려고 모든 텐서를 한 번 훑습니다.
+    표준 입력이 닫히면 종료합니다.
+    """
+    started = time.perf_counter()
+    import torch
+    from app.services.model_registry import model_registry
+    import_sec = time.perf_counter() - started
+
+    started = time.perf_counter()
+    models = [model_registry.get("mobile_sam"), model_registry.get("clip")[0]]
+    load_sec = time.perf_counter() - started
+
+    with torch.no_grad():
+        for model in models:
+            for tensor in model.state_dict().values():
+                if isinstance(tensor, torch.Tensor):
+                    tensor.sum()
+    print(json.dumps({"import_sec": round(import_sec, 2), "load_sec": round(load_sec, 2)}), flush=True)
+    sys.stdin.read()
+
+def run_benchmark(args: argparse.Namespace) -> None:
+    """원본 로드와 mmap 로드 각각 N개 프로세스를 동시에 띄워 로드 시간과 메모리 비교"""
+    from app.services.mmap_weights import SAM_MMAP_WEIGHTS, CLIP_MMAP_WEIGHTS
+    if not (SAM_MMAP_WEIGHTS.exists() and CLIP_MMAP_WEIGHTS.exists()):
+        logger.error("변환된 가중치가 없습니다. 먼저 python scripts/convert_weights.py convert를 실행하세요.")
+        sys.exit(1)
+
+    print(f"{'mode':>8} | {'workers':>7} | {'load s':>7} | {'RSS/worker':>10} | {'PSS total':>9} | "
+          f"{'shared':>8} | {'private':>8}")
+    for mode in ("copy", "mmap"):
+        env = dict(os.environ, MODEL_MMAP_WEIGHTS="true" if mode == "mmap" else "false")
+        probes = [
+            subprocess.Popen([sys.executable, __file__, "probe"], env=env,
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            for _ in range(args.workers)
+        ]
+        try:
+            timings = [json.loads(probe.stdout.readline()) for probe in probes]
+            memory = [read_memory(probe.pid) for probe in probes]
+        finally:
+            for probe in probes:
+                probe.stdin.close()
+                probe.wait()
+
+        load_sec = sum(t["load_sec"] for t in timings) / len(timings)
+        rss = sum(m["rss_mb"] for m in memory) / len(memory)
+        pss = sum(m["pss_mb"] for m in memory)
+        shared = sum(m["shared_mb"] for m in memory) / len(memory)
+        private = sum(m["private_mb"] for m in memory) / len(memory)
+        print(f"{mode:>8} | {args.workers:>7} | {load_sec:>7.2f} | {rss:>8.0f}MB | {pss:>7.0f}MB | "
+              f"{shared:>6.0f}MB | {private:>6.0f}MB")
+    print("\nPSS total: 공유 페이지를 나눠 센 실제 물리 메모리 합계, shared/private: 워커당 평균")
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="메모리 매핑 가중치 변환 및 측정")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="원본 가중치를 메모리 매핑용 체크포인트로 변환")
+    convert_parser.add_argument("--output", type=str, default="", help="저장 디렉토리 (기본값: MODEL_WEIGHTS_DIR)")
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="원본 로드와 mmap 로드의 시작 시간, RSS/PSS 비교")
+    benchmark_parser.add_argument("--workers", type=int, default=4, help="동시에 띄울 프로세스 수 (기본값: 4)")
+
+    subparsers.add_parser("probe", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    if args.command == "convert":
+        run_convert(args)
+    elif args.command == "benchmark":
+        run_benchmark(args)
+    else:
+        run_probe(args)
+
+if __name__ == "__main__":
+    main()
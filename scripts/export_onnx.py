@@ -0,0 +1,258 @@
+# scripts/export_onnx.py
+# MobileSAM 인코더/디코더와 CLIP 이미지 인코더를 ONNX로 내보내고, eager PyTorch와 정합성/지연 시간을 비교
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+import torch
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+sys.path.append(str(ROOT_PATH / 'external' / 'MobileSAM'))
+
+from PIL import Image
+from mobile_sam.utils.onnx import SamOnnxModel
+from app.config import ONNX_MODEL_DIR
+from app.services.model_registry import model_registry
+from app.services.inference_backend import (
+    get_backend, SAM_ENCODER_ONNX, SAM_DECODER_ONNX, CLIP_VISUAL_ONNX
+)
+from app.services.image_ingest import decode_image
+from app.services.sam_service import sam_service
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ExportOnnx")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+class _SamEncoder(torch.nn.Module):
+    """MobileSAM image_encoder 내보내기용 래퍼"""
+
+    def __init__(self, sam):
+        super().__init__()
+        self.image_encoder = sam.image_encoder
+
+    def forward(self, images):
+        return self.image_encoder(images)
+
+class _ClipVisual(torch.nn.Module):
+    """CLIP encode_image 내보내기용 래퍼"""
+
+    def __init__(self, clip_model):
+        super().__init__()
+        self.clip_model = clip_model
+
+    def forward(self, images):
+        return self.clip_model.encode_image(images)
+
+def export_models(output_dir: Path, opset: int) -> None:
+    """
+    세 모델을 ONNX 파일로 내보내기
+
+    Args:
+        output_dir (Path): 저장 디렉토리
+        opset (int): ONNX opset 버전
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    sam = model_registry.get("mobile_sam").cpu().eval()
+    clip_model = model_registry.get("clip")[0].cpu().float().eval()
+
+    with torch.no_grad():
+        # MobileSAM 이미지 인코더 (배치 크기 가변)
+        torch.onnx.export(
+            _SamEncoder(sam),
+            torch.randn(1, 3, 1024, 1024),
+            str(output_dir / SAM_ENCODER_ONNX),
+            input_names=["images"],
+            output_names=["image_embeddings"],
+            dynamic_axes={"images": {0: "batch"}, "image_embeddings": {0: "batch"}},
+            opset_version=opset,
+        )
+        logger.info(f"Exported {SAM_ENCODER_ONNX}")
+
+        # MobileSAM 프롬프트 인코더 + 마스크 디코더 (SAM 공식 ONNX 규약)
+        decoder = SamOnnxModel(sam, return_single_mask=False)
+        embed_dim = sam.prompt_encoder.embed_dim
+        embed_size = sam.prompt_encoder.image_embedding_size
+        mask_input_size = [4 * x for x in embed_size]
+        dummy_inputs = {
+            "image_embeddings": torch.randn(1, embed_dim, *embed_size, dtype=torch.float),
+            "point_coords": torch.randint(low=0, high=1024, size=(1, 5, 2), dtype=torch.float),
+            "point_labels": torch.randint(low=0, high=4, size=(1, 5), dtype=torch.float),
+            "mask_input": torch.randn(1, 1, *mask_input_size, dtype=torch.float),
+            "has_mask_input": torch.tensor([1], dtype=torch.float),
+            "orig_im_size": torch.tensor([1024, 1024], dtype=torch.float),
+        }
+        torch.onnx.export(
+            decoder,
+            tuple(dummy_inputs.values()),
+            str(output_dir / SAM_DECODER_ONNX),
+            input_names=list(dummy_inputs.keys()),
+            output_names=["masks", "iou_predictions", "low_res_masks"],
+            dynamic_axes={
+                "point_coords": {0: "batch", 1: "num_points"},
+                "point_labels": {0: "batch", 1: "num_points"},
+            },
+            opset_version=opset,
+        )
+        logger.info(f"Exported {SAM_DECODER_ONNX}")
+
+        # CLIP 이미지 인코더 (배치 크기 가변)
+        torch.onnx.export(
+            _ClipVisual(clip_model),
+            torch.randn(1, 3, 224, 224),
+            str(output_dir / CLIP_VISUAL_ONNX),
+            input_names=["images"],
+            output_names=["image_features"],
+            dynamic_axes={"images": {0: "batch"}, "image_features": {0: "batch"}},
+            opset_version=opset,
+        )
+        logger.info(f"Exported {CLIP_VISUAL_ONNX}")
+
+def load_sample_images(image_dir, count: int):
+    """
+    비교용 이미지 로드 (디렉토리가 없으면 무작위 이미지 생성)
+
+    Returns:
+        list: PIL 이미지 리스트
+    """
+    if image_dir:
+        paths = sorted(p for p in Path(image_dir).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+        return [decode_image(p.read_bytes()).image for p in paths[:count]]
+
+    rng = np.random.default_rng(0)
+    return [
+        Image.fromarray(rng.integers(0, 256, (768, 1024, 3), dtype=np.uint8))
+        for _ in range(count)
+    ]
+
+def _run_backend(backend, image):
+    """한 백엔드로 SAM 인코딩, 중앙점 디코딩, CLIP 인코딩 실행"""
+    sam_input = sam_service.transform(image).unsqueeze(0)
+    embedding = backend.sam_encode(sam_input)
+    point = torch.tensor([[[512.0, 512.0]]])
+    label = torch.tensor([[1]], dtype=torch.int)
+    low_res, scores = backend.sam_decode(embedding, point, label, None, False)
+    clip_input = backend.clip_preprocess(image).unsqueeze(0)
+    features = backend.clip_encode(clip_input)
+    return embedding, low_res, scores, features
+
+def _cosine(a: torch.Tensor, b: torch.Tensor) -> float:
+    a, b = a.flatten().float(), b.flatten().float()
+    return float(torch.nn.functional.cosine_similarity(a, b, dim=0))
+
+def parity_check(images, tolerance: float) -> bool:
+    """
+    eager PyTorch와 ONNX Runtime 출력 비교
+
+    Args:
+        images (list): 비교용 이미지
+        tolerance (float): 허용하는 최소 코사인 유사도
+
+    Returns:
+        bool: 모든 이미지가 허용 범위 안인지 여부
+    """
+    torch_backend, onnx_backend = get_backend("torch"), get_backend("onnx")
+    passed = True
+
+    print(f"{'image':>5} | {'sam emb cos':>11} | {'sam emb max|d|':>14} | {'mask IoU':>8} | {'clip cos':>8}")
+    for idx, image in enumerate(images):
+        t_emb, t_mask, _, t_feat = _run_backend(torch_backend, image)
+        o_emb, o_mask, _, o_feat = _run_backend(onnx_backend, image)
+
+        t_bin, o_bin = (t_mask > 0), (o_mask > 0)
+        union = (t_bin | o_bin).sum().item()
+        mask_iou = (t_bin & o_bin).sum().item() / union if union else 1.0
+        emb_cos = _cosine(t_emb, o_emb)
+        clip_cos = _cosine(t_feat, o_feat)
+        max_diff = float((t_emb - o_emb).abs().max())
+
+        ok = emb_cos >= tolerance and clip_cos >= tolerance and mask_iou >= tolerance
+        passed = passed and ok
+        print(f"{idx:>5} | {emb_cos:>11.6f} | {max_diff:>14.6f} | {mask_iou:>8.4f} | {clip_cos:>8.6f}"
+              f"{'' if ok else '  <- FAIL'}")
+
+    print("Parity check", "PASSED" if passed else "FAILED")
+    return passed
+
+def _time_ms(fn, runs: int):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return np.array(samples)
+
+def benchmark(images, runs: int, warmup: int) -> None:
+    """
+    백엔드별 이미지당 지연 시간 비교
+
+    Args:
+        images (list): 측정용 이미지
+        runs (int): 단계별 측정 반복 횟수
+        warmup (int): 측정 전 예열 횟수
+    """
+    image = images[0]
+    sam_input = sam_service.transform(image).unsqueeze(0)
+    point = torch.tensor([[[512.0, 512.0]]])
+    label = torch.tensor([[1]], dtype=torch.int)
+
+    print(f"{'backend':>7} | {'stage':>12} | {'mean ms':>8} | {'p50 ms':>8} | {'p95 ms':>8}")
+    for name in ("torch", "onnx"):
+        backend = get_backend(name)
+        embedding = backend.sam_encode(sam_input)
+        clip_input = backend.clip_preprocess(image).unsqueeze(0)
+        stages = {
+            "sam_encode": lambda: backend.sam_encode(sam_input),
+            "sam_decode": lambda: backend.sam_decode(embedding, point, label, None, False),
+            "clip_encode": lambda: backend.clip_encode(clip_input),
+        }
+        total = 0.0
+        for stage, fn in stages.items():
+            _time_ms(fn, warmup)
+            samples = _time_ms(fn, runs)
+            total += samples.mean()
+            print(f"{name:>7} | {stage:>12} | {samples.mean():>8.2f} | "
+                  f"{np.percentile(samples, 50):>8.2f} | {np.percentile(samples, 95):>8.2f}")
+        print(f"{name:>7} | {'total':>12} | {total:>8.2f} |")
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="ONNX 모델 내보내기 및 PyTorch 대비 정합성/지연 시간 비교")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="ONNX 모델 내보내기")
+    export_parser.add_argument("--output", type=Path, default=ONNX_MODEL_DIR, help="저장 디렉토리")
+    export_parser.add_argument("--opset", type=int, default=17, help="ONNX opset 버전 (기본값: 17)")
+
+    parity_parser = subparsers.add_parser("parity", help="eager 출력과 ONNX 출력 비교")
+    parity_parser.add_argument("--images", type=str, help="비교용 이미지 디렉토리 (없으면 무작위 이미지)")
+    parity_parser.add_argument("--count", type=int, default=8, help="비교할 이미지 수 (기본값: 8)")
+    parity_parser.add_argument("--tolerance", type=float, default=0.99, help="최소 코사인 유사도/IoU (기본값: 0.99)")
+
+    bench_parser = subparsers.add_parser("benchmark", help="백엔드별 지연 시간 비교")
+    bench_parser.add_argument("--images", type=str, help="측정용 이미지 디렉토리 (없으면 무작위 이미지)")
+    bench_parser.add_argument("--runs", type=int, default=20, help="측정 반복 횟수 (기본값: 20)")
+    bench_parser.add_argument("--warmup", type=int, default=3, help="예열 횟수 (기본값: 3)")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_models(args.output, args.opset)
+    elif args.command == "parity":
+        images = load_sample_images(args.images, args.count)
+        sys.exit(0 if parity_check(images, args.tolerance) else 1)
+    elif args.command == "benchmark":
+        images = load_sample_images(args.images, 1)
+        benchmark(images, args.runs, args.warmup)
+
+if __name__ == "__main__":
+    main()
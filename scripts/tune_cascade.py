@@ -0,0 +1,113 @@
+# scripts/tune_cascade.py
+# 레이블된 이미지 폴더로 조기 종료 캐스케이드 임계값(신뢰도, top-1/top-2 차이)별 정확도와 지연 시간 추정
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+
+# 프로젝트 루트 경로 설정
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.append(str(ROOT_PATH))
+sys.path.append(str(ROOT_PATH / 'external' / 'MobileSAM'))
+
+from app.config import CASCADE_MIN_CONFIDENCE, CASCADE_MIN_MARGIN
+from app.services.image_ingest import decode_image
+from app.services.sam_service import SamService
+from app.services.classifier_service import AnimalClassifier
+
+# 로깅 설정
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("TuneCascade")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+def folder_label(path: Path) -> str:
+    """상위 폴더 이름을 분류 결과 형식의 정답 레이블로 변환 (예: red_fox -> "a red fox")"""
+    return f"a {' '.join(path.parent.name.replace('_', ' ').lower().split())}"
+
+def evaluate_paths(sam: SamService, classifier: AnimalClassifier, decoded) -> dict:
+    """한 이미지에 대해 전체 이미지 경로와 세그멘테이션 경로를 모두 실행하고 결과/지연 시간 기록"""
+    image = decoded.image
+    width, height = image.size
+
+    started = time.perf_counter()
+    full = classifier.classify_features(classifier.encode_images([image])[0])
+    full_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    embedding = sam.encode_images([image], [decoded.content_hash])
+    mask, _ = sam.predict_low_res_masks(embedding, (width, height), [(width // 2, height // 2)], [1])
+    segmented = classifier.classify_animal(image, mask[0])
+    segmented_ms = (time.perf_counter() - started) * 1000
+
+    probs = [prob for _, prob in full["top3"]]
+    return {
+        "full_class": full["class"],
+        "confidence": probs[0],
+        "margin": probs[0] - probs[1] if len(probs) > 1 else probs[0],
+        "segmented_class": segmented["class"],
+        "full_ms": full_ms,
+        "segmented_ms": segmented_ms,
+    }
+
+def main():
+    """
+    메인 실행 함수
+    """
+    parser = argparse.ArgumentParser(description="조기 종료 캐스케이드 임계값 조정")
+    parser.add_argument("images", type=str, help="레이블된 이미지 디렉토리 (하위 폴더 이름 = 종 영문명)")
+    parser.add_argument("--confidences", type=str, default="0.3,0.4,0.5,0.6,0.7,0.8,0.9",
+                        help="비교할 최소 신뢰도 목록")
+    parser.add_argument("--margins", type=str, default="0.0,0.1,0.2,0.3,0.5",
+                        help="비교할 최소 top-1/top-2 차이 목록")
+    parser.add_argument("--limit", type=int, default=500, help="사용할 최대 이미지 수 (기본값: 500)")
+
+    args = parser.parse_args()
+
+    paths = sorted(p for p in Path(args.images).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)[:args.limit]
+    if not paths:
+        logger.error(f"이미지를 찾을 수 없습니다: {args.images}")
+        sys.exit(1)
+
+    sam = SamService()
+    classifier = AnimalClassifier()
+    labels = set(classifier.labels)
+
+    rows, truth = [], []
+    for path in paths:
+        rows.append(evaluate_paths(sam, classifier, decode_image(path.read_bytes())))
+        truth.append(folder_label(path))
+    # 첫 이미지는 모델 로드 시간이 섞이므로 지연 시간 평균에서 제외
+    full_ms = np.mean([r["full_ms"] for r in rows[1:]] or [rows[0]["full_ms"]])
+    segmented_ms = np.mean([r["segmented_ms"] for r in rows[1:]] or [rows[0]["segmented_ms"]])
+
+    labelled = [i for i, label in enumerate(truth) if label in labels]
+    def accuracy(predictions):
+        if not labelled:
+            return float("nan")
+        return np.mean([predictions[i] == truth[i] for i in labelled])
+
+    print(f"{len(paths)} images ({len(labelled)} with labels in vocabulary)")
+    print(f"full-image CLIP: {full_ms:.1f} ms, SAM + masked CLIP: {segmented_ms:.1f} ms\n")
+    print(f"{'always segmented':>24} | acc {accuracy([r['segmented_class'] for r in rows]):>6.1%} | "
+          f"{segmented_ms:>7.1f} ms")
+    print(f"{'always full image':>24} | acc {accuracy([r['full_class'] for r in rows]):>6.1%} | "
+          f"{full_ms:>7.1f} ms\n")
+
+    print(f"{'min conf':>8} | {'min margin':>10} | {'early exit':>10} | {'accuracy':>8} | {'avg ms':>7}")
+    for min_confidence in (float(c) for c in args.confidences.split(",")):
+        for min_margin in (float(m) for m in args.margins.split(",")):
+            exits = [r["confidence"] >= min_confidence and r["margin"] >= min_margin for r in rows]
+            predictions = [r["full_class"] if e else r["segmented_class"] for r, e in zip(rows, exits)]
+            exit_rate = np.mean(exits)
+            # 캐스케이드는 항상 전체 이미지 CLIP을 먼저 실행
+            avg_ms = full_ms + (1 - exit_rate) * segmented_ms
+            marker = "  <- current" if (min_confidence, min_margin) == (CASCADE_MIN_CONFIDENCE, CASCADE_MIN_MARGIN) else ""
+            print(f"{min_confidence:>8.2f} | {min_margin:>10.2f} | {exit_rate:>9.1%} | "
+                  f"{accuracy(predictions):>7.1%} | {avg_ms:>7.1f}{marker}")
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,14 @@ document.addEventListener('DOMContentLoaded', function() {
         isAnalyzing: false,
         currentFileId: 'file', // 현재 활성화된 파일 입력 ID
         uploadCount: 0,        // 총 업로드 횟수 추적
-        currentLoadingId: null // 현재 로딩 메시지 ID
+        currentLoadingId: null, // 현재 로딩 메시지 ID
+        segment: {             // 클릭 보정(재프롬프트) 세그멘테이션 상태
+            imageId: null,
+            width: 0,
+            height: 0,
+            points: [],
+            labels: []
+        }
     };
     
     // ==========================================
@@ -52,6 +59,11 @@ document.addEventListener('DOMContentLoaded', function() {
             event.preventDefault();
         }
         
+        // 미리보기 이미지 클릭 감지 (클릭 위치로 세그멘테이션 보정)
+        if (event.target.classList.contains('preview-image')) {
+            refineSegmentation(event);
+        }
+        
         // 파일 입력 라벨 클릭 감지 (업로드 영역)
         if (event.target.tagName === 'LABEL' && 
             event.target.classList.contains('upload-button')) {
@@ -102,6 +114,9 @@ document.addEventListener('DOMContentLoaded', function() {
             
             // 메시지 입력창 설정 및 보내기 버튼 활성화
             updateUIForAnalysis();
+            
+            // 클릭 보정을 위해 이미지를 미리 인코딩
+            encodeForRefinement(file);
         };
         
         reader.onerror = function() {
@@ -517,6 +532,9 @@ document.addEventListener('DOMContentLoaded', function() {
         // 파일 입력 초기화
         elements.fileInput.value = '';
         
+        // 세그멘테이션 보정 세션 정리
+        resetSegmentState();
+        
         // 로딩 메시지 제거
         removeLoadingIndicators();
         
@@ -700,6 +718,114 @@ document.addEventListener('DOMContentLoaded', function() {
         e.stopPropagation();
     }
     
+    // ==========================================
+    // 6. 클릭 보정 세그멘테이션
+    // ==========================================
+    
+    /**
+     * 이미지를 한 번 인코딩하고 image_id 저장
+     * @param {File} file - 선택된 이미지 파일
+     */
+    function encodeForRefinement(file) {
+        resetSegmentState();
+        
+        const formData = new FormData();
+        formData.append('file', file);
+        
+        fetch('/api/segment/encode', {
+            method: 'POST',
+            body: formData
+        })
+        .then(response => response.ok ? response.json() : null)
+        .then(result => {
+            if (!result) return;
+            appState.segment.imageId = result.image_id;
+            appState.segment.width = result.width;
+            appState.segment.height = result.height;
+        })
+        .catch(error => console.error('Encode error:', error));
+    }
+    
+    /**
+     * 미리보기 이미지 클릭 위치를 프롬프트로 마스크 재계산
+     * (일반 클릭: 동물 영역, Shift + 클릭: 배경)
+     * @param {MouseEvent} event - 클릭 이벤트
+     */
+    function refineSegmentation(event) {
+        const segment = appState.segment;
+        if (!segment.imageId) return;
+        
+        const image = event.target;
+        const rect = image.getBoundingClientRect();
+        const x = (event.clientX - rect.left) * segment.width / rect.width;
+        const y = (event.clientY - rect.top) * segment.height / rect.height;
+        
+        segment.points.push([x, y]);
+        segment.labels.push(event.shiftKey ? 0 : 1);
+        
+        fetch(`/api/segment/${segment.imageId}/prompt`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                points: segment.points,
+                labels: segment.labels,
+                multimask_output: segment.points.length === 1
+            })
+        })
+        .then(response => {
+            if (response.status === 404) {
+                // 세션 만료 시 보정 비활성화
+                resetSegmentState();
+                return null;
+            }
+            return response.ok ? response.json() : null;
+        })
+        .then(result => {
+            if (result) showMaskOverlay(image, result.mask_png);
+        })
+        .catch(error => console.error('Prompt error:', error));
+    }
+    
+    /**
+     * 미리보기 이미지 위에 마스크 오버레이 표시
+     * @param {HTMLImageElement} image - 미리보기 이미지
+     * @param {string} maskUrl - 마스크 PNG data URL
+     */
+    function showMaskOverlay(image, maskUrl) {
+        const container = image.parentElement;
+        let overlay = container.querySelector('.mask-overlay');
+        
+        if (!overlay) {
+            overlay = document.createElement('img');
+            overlay.className = 'mask-overlay';
+            overlay.alt = '';
+            container.classList.add('has-mask-overlay');
+            container.appendChild(overlay);
+        }
+        
+        overlay.style.width = `${image.clientWidth}px`;
+        overlay.style.height = `${image.clientHeight}px`;
+        overlay.style.left = `${image.offsetLeft}px`;
+        overlay.style.top = `${image.offsetTop}px`;
+        overlay.src = maskUrl;
+    }
+    
+    /**
+     * 세그멘테이션 보정 상태 초기화 (서버 세션 삭제 포함)
+     */
+    function resetSegmentState() {
+        const segment = appState.segment;
+        if (segment.imageId) {
+            fetch(`/api/segment/${segment.imageId}`, { method: 'DELETE' })
+                .catch(() => {});
+        }
+        segment.imageId = null;
+        segment.width = 0;
+        segment.height = 0;
+        segment.points = [];
+        segment.labels = [];
+    }
+    
     // ==========================================
     // 7. 초기화 작업
     // ==========================================